@@ -1,27 +1,43 @@
+import contextlib
+import hashlib
 import json
 import os
-import re
 import subprocess
 import sys
+import threading
+from functools import cached_property
 from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import spacy
-import math
+from circuit_calculations import (
+    calculate, find_circuit_spec, fold_turkish_text, normalize_turkish_text, parse_numeric_value
+)
+from design_result import format_capacitance, format_latex_parameters, format_resistance
+from extraction import analyze_query, extract_inputs
+from async_compile import AsyncLatexCompiler, CompileResult, run_pdflatex
+from latex_validator import template_placeholders, validate_latex
+from instrumentation import configure_from_argv, get_instrumentation, timed
  # varsa modül ismini senin dosya adına göre ayarla
 
+# Çıktıyı etkileyen ayarlar; değişirlerse önbellekteki tasarımlar kullanılmaz
+MEMO_SETTINGS = (
+    "default_resistor", "default_capacitor", "default_voltage",
+    "analysis_plots", "analysis_model", "render_mode",
+)
+
 
 class CircuitDesigner:
     def __init__(self):
-        try:
-            self.nlp = spacy.load("en_core_web_sm")  # NLP modeli
-        except OSError:
-            print("Spacy modeli yüklenemedi. Basit moda geçiliyor...")
-            self.nlp = None
-        
+        self.instrumentation = get_instrumentation()
         self.config = self.load_config()
         self.ensure_directories()
-        self.dataset = self.load_dataset()
+        self.match_index = None
+        self.template_cache = {}
+        self.async_compiler = None
+        self.layered_renderer = None
+        self.last_result = None
+        self.last_query = None
+        self.memo = None
+        self.artifacts = None
+        self.store_lock = threading.Lock()  # memo/artifacts iş parçacıkları arasında bir kez kurulur
         
     def load_config(self):
         """Yapılandırma ayarlarını yükler"""
@@ -32,8 +48,28 @@ class CircuitDesigner:
             "default_gain": "10",
             "default_cutoff": "1000",  # 1 kHz default
             "default_time_constant": "1ms",  # Türev/integral alıcılar için
+            "dataset_file": "dataset.json",
+            "index_dir": "corpus_index",  # corpus.py build ile üretilen sürümlü indeks
             "output_dir": "circuit_outputs",
-            "latex_templates_dir": "latex_codes"
+            "latex_templates_dir": "latex_codes",
+            "compile_timeout": 30,
+            "max_concurrent_compiles": 4,
+            "analysis_plots": True,  # Bode ve geçici rejim grafikleri
+            "analysis_model": "uA741",
+            "render_backend": "latex",  # "svg": TeX olmadan doğrudan SVG şema
+            "render_mode": "full",  # "layered": önbellekli statik çizim + istek başına etiketler
+            "memo_dir": "design_cache",  # süreçler arası tasarım önbelleği; boş ise kapalı
+            "memo_ttl": 7 * 86400,  # saniye
+            "memo_max_entries": 500,
+            "memo_max_mb": 200,
+            "artifact_dir": "artifact_cache",  # derlenmiş PDF'lerin süreçler arası paylaşılan deposu
+            "artifact_max_mb": 500,
+            "parts_file": "opamp_parts.json",  # gerçek op-amp kütüphanesi; boş ise kontrol kapalı
+            "signal_bandwidth": 20e3,  # Hz
+            "signal_amplitude": 1.0,  # V tepe
+            "gbw_margin": 10.0,
+            "max_bias_offset": 0.01,  # V
+            "opamp_suggestions": 5
         }
         
         try:
@@ -42,67 +78,110 @@ class CircuitDesigner:
         except FileNotFoundError:
             return default_config
 
+    @cached_property
+    def nlp(self):
+        """NLP modeli; spaCy yalnızca eşleştirme gerektiğinde (ilk erişimde) içe aktarılır"""
+        from corpus import load_nlp
+
+        nlp = load_nlp()
+        if nlp is None:
+            print("Spacy modeli yüklenemedi. Basit moda geçiliyor...")
+        return nlp
+
+    @cached_property
+    def dataset(self):
+        """Devre kayıtları; hesaplama veya derleme yapan komutlar dataseti hiç yüklemez"""
+        return self.load_dataset()
+
     def ensure_directories(self):
         """Gerekli dizinleri oluşturur"""
         Path(self.config["output_dir"]).mkdir(exist_ok=True)
         Path(self.config["latex_templates_dir"]).mkdir(exist_ok=True)
 
     def load_dataset(self):
-        """Devre datasetini yükler"""
+        """Devre datasetini yükler; güncel bir sürümlü indeks varsa kayıtları ve bellek eşlemeli indeksi ondan alır"""
+        from corpus import clean_corpus, load_index, preprocess_mode
+
+        try:
+            loaded = load_index(self.config["index_dir"], preprocess_mode(self.nlp), self.config["dataset_file"])
+            if loaded is not None:
+                records, self.match_index = loaded
+                return records
+        except (OSError, ValueError, KeyError) as e:
+            print(f"İndeks yüklenemedi, dataset kullanılıyor: {e}")
         try:
-            with open("dataset2.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(self.config["dataset_file"], "r", encoding="utf-8") as f:
+                return clean_corpus(json.load(f)).records
         except Exception as e:
             print(f"Dataset yükleme hatası: {e}")
             return []
 
     def normalize_turkish_text(self, text):
         """Türkçe karakterleri standartlaştır ve küçük harfe çevir"""
-        if not text:
-            return ""
-        
-        # Türkçe karakter dönüşüm tablosu
-        tr_map = {
-            'İ': 'i', 'I': 'ı', 'Ü': 'ü', 'Ö': 'ö', 'Ç': 'ç', 'Ş': 'ş', 'Ğ': 'ğ',
-            'i': 'i', 'ı': 'ı', 'ü': 'ü', 'ö': 'ö', 'ç': 'ç', 'ş': 'ş', 'ğ': 'ğ'
-        }
-        
-        # Metni küçült ve Türkçe karakterleri standartlaştır
-        result = ''
-        for char in text.lower():
-            result += tr_map.get(char, char)
-        
-        return result
+        return normalize_turkish_text(text)
 
+    @timed("nlp")
     def preprocess_text(self, text):
         """Metni NLP için hazırlar"""
-        if self.nlp:
-            doc = self.nlp(text.lower())
-            return " ".join([token.lemma_ for token in doc if not token.is_stop])
-        else:
-            return text.lower()
+        from corpus import preprocess_text
 
-    def find_best_match(self, user_input):
-        """Kullanıcı girdisine en uygun devreyi bulur"""
-        if not self.dataset:
-            return None
+        return preprocess_text(text, self.nlp)
+
+    @timed("nlp")
+    def analyze_query(self, text):
+        """Sorguyu tek NLP geçişiyle işler; eşleştirme metni ve token akışı birlikte döner"""
+        return analyze_query(text, self.nlp)
+
+    @timed("index_build")
+    def build_match_index(self):
+        """Dataset girdilerini bir kez işleyip TF-IDF indeksini hazırlar"""
+        from corpus import MatchIndex
 
-        processed_input = self.preprocess_text(user_input)
         inputs = [self.preprocess_text(item["input"]) for item in self.dataset]
-        
+        exact = {}
         for i, item in enumerate(inputs):
-         if processed_input.strip().lower() == item.strip().lower():
-             return self.dataset[i]
+            exact.setdefault(item.strip().lower(), i)
+
+        self.match_index = MatchIndex.build(exact, inputs)
+        return self.match_index
+
+    @timed("match")
+    def match_query(self, user_input):
+        """En uygun devre kaydı ve değer çıkarımında yeniden kullanılacak işlenmiş sorgu"""
+        query = self.analyze_query(user_input)
+        if not self.dataset:
+            return None, query
+
+        index = self.match_index or self.build_match_index()
+        processed_input = query.processed
+
+        exact_idx = index.exact.get(processed_input.strip().lower())
+        if exact_idx is not None:
+            return self.dataset[exact_idx], query
 
-        vectorizer = TfidfVectorizer()
-        vectors = vectorizer.fit_transform([processed_input] + inputs)
-        similarities = cosine_similarity(vectors[0], vectors[1:])
-        best_match_idx = similarities.argmax()
+        with self.instrumentation.stage("tfidf"):
+            query_vector = index.vectorizer.vectorize(processed_input)
+            best_match_idx, score = index.best(query_vector)
         
-        if similarities[0][best_match_idx] < 0.3:
+        if score < 0.3:
             print("Uyarı: Düşük benzerlik skoru, en yakın eşleşme kullanılıyor")
         
-        return self.dataset[best_match_idx]
+        return self.dataset[best_match_idx], query
+
+    def find_best_match(self, user_input):
+        """Kullanıcı girdisine en uygun devreyi bulur"""
+        circuit, self.last_query = self.match_query(user_input)
+        return circuit
+
+    def extract_inputs(self, circuit_type, query=None):
+        """Sorgudaki değerleri devrenin girdilerine eşler (ör. "10 kat kazançlı" → gain=10).
+
+        Verilmezse son eşleştirmenin sorgusu kullanılır; NLP modeli yeniden çalışmaz.
+        """
+        query = query if query is not None else self.last_query
+        if query is None:
+            return {}, []
+        return extract_inputs(circuit_type, query)
 
     def check_circuit_type(self, circuit_type, search_term):
         """Türkçe karakter duyarsız devre tipi kontrolü"""
@@ -113,132 +192,50 @@ class CircuitDesigner:
 
     def parse_numeric_value(self, value_str):
         """Kullanıcı girdisini sayısal değere çevirir"""
-        value_str = re.sub(r'[^0-9kKMuμnp.]', '', value_str.strip())
-        
-        multipliers = {
-            'k': 1e3, 'K': 1e3, 
-            'M': 1e6, 
-            'u': 1e-6, 'μ': 1e-6, 
-            'n': 1e-9, 
-            'p': 1e-12
-        }
-        
-        match = re.match(r"([\d.]+)([kKMuμnp]?)", value_str)
-        if not match:
-            raise ValueError(f"Geçersiz değer formatı: {value_str}")
-        
-        number, unit = match.groups()
-        number = float(number)
-        return number * multipliers.get(unit, 1)
+        return parse_numeric_value(value_str)
 
-    def get_circuit_parameters(self, circuit_type):
-        """İstenen parametre değerlerini kullanıcıdan alır ve hesaplamalar yapar"""
+    def prompt_inputs(self, circuit_type, known=None):
+        """Devrenin hesaplama girdilerini kullanıcıdan sorar; known içindekiler sorulmaz"""
+        spec = find_circuit_spec(circuit_type)
+        values = dict(known or {})
+        for input_spec in spec.inputs if spec else ():
+            if input_spec.name in values:
+                continue
+            default = input_spec.default(self.config)
+            values[input_spec.name] = input(input_spec.prompt.format(default=default)).strip() or default
+        return values
+
+    def calculate(self, circuit_type, spec=None):
+        """Saf hesaplama API'si: girdi sözlüğünden DesignResult döndürür"""
+        return calculate(circuit_type, spec, self.config)
+
+    @timed("calculate")
+    def get_circuit_parameters(self, circuit_type, values=None, known=None):
+        """İstenen parametre değerlerini kullanıcıdan (veya values sözlüğünden) alır ve hesaplamalar yapar.
+
+        known verilirse (ör. sorgudan çıkarılan değerler) yalnızca eksik girdiler sorulur.
+        """
         params = {}
+        self.last_result = None
         print(f"\n[{circuit_type} Parametreleri]")
         
         try:
-            if self.check_circuit_type(circuit_type, "tersleyici"):
-                gain_str = input(f"İstenen kazanç değeri [{self.config['default_gain']}x]: ").strip() or self.config['default_gain']
-                gain = float(gain_str)
-                params["R1"] = self.parse_numeric_value(self.config["default_resistor"])
-                params["R2"] = params["R1"] * abs(gain)
-                params["GainFormula"] = r"-\frac{R_2}{R_1}"
-                params["GainValue"] = f"{-gain:.2f}"
-                print(f"Hesaplanan R1: {self.format_resistance(params['R1'])}")
-                print(f"Hesaplanan R2: {self.format_resistance(params['R2'])}")
-                print(f"Kazanç: {-gain:.2f}x")
-                
-            elif self.check_circuit_type(circuit_type, "terslemeyen"):
-                gain_str = input(f"İstenen kazanç değeri [{self.config['default_gain']}x]: ").strip() or self.config['default_gain']
-                gain = float(gain_str)
-                params["R1"] = self.parse_numeric_value(self.config["default_resistor"])
-                params["R2"] = params["R1"] * (gain - 1)
-                params["GainFormula"] = r"1 + \frac{R_2}{R_1}"
-                params["GainValue"] = f"{gain:.2f}"
-                print(f"Hesaplanan R1: {self.format_resistance(params['R1'])}")
-                print(f"Hesaplanan R2: {self.format_resistance(params['R2'])}")
-                print(f"Kazanç: {gain:.2f}x")
-
-            elif self.check_circuit_type(circuit_type, "alçak geçiren filtre") or self.check_circuit_type(circuit_type, "yüksek geçiren filtre"):
-                cutoff_str = input(f"İstenen kesim frekansı [{self.config['default_cutoff']} Hz]: ").strip() or self.config['default_cutoff']
-                cutoff = float(cutoff_str)
-                params["C"] = self.parse_numeric_value(self.config["default_capacitor"])
-                params["R"] = 1 / (2 * math.pi * cutoff * params["C"])
-                params["Cutoff"] = f"{cutoff:.2f} Hz"
-                print(f"Hesaplanan R: {self.format_resistance(params['R'])}")
-                print(f"Hesaplanan C: {self.format_capacitance(params['C'])}")
-                print(f"Kesim Frekansı: {cutoff:.2f} Hz")
-                
-            elif self.check_circuit_type(circuit_type, "toplayıcı"):
-                gain1_str = input(f"Birinci giriş için kazanç [-{self.config['default_gain']}]: ").strip() or f"-{self.config['default_gain']}"
-                gain2_str = input(f"İkinci giriş için kazanç [-{self.config['default_gain']}]: ").strip() or f"-{self.config['default_gain']}"
-                gain1 = float(gain1_str)
-                gain2 = float(gain2_str)
-                params["Rf"] = self.parse_numeric_value(self.config["default_resistor"])
-                params["R1"] = params["Rf"] / abs(gain1)
-                params["R2"] = params["Rf"] / abs(gain2)
-                gain_formula = r"-\left(\frac{R_f}{R_1}V_1 + \frac{R_f}{R_2}V_2\right)"
-                params["GainFormula"] = gain_formula
-                print(f"Hesaplanan Rf: {self.format_resistance(params['Rf'])}")
-                print(f"Hesaplanan R1: {self.format_resistance(params['R1'])}")
-                print(f"Hesaplanan R2: {self.format_resistance(params['R2'])}")
-                print(f"Çıkış formülü: Vout = {gain_formula}")
-
-            elif self.check_circuit_type(circuit_type, "schmitt"):
-                vut_str = input(f"İstenen üst eşik değeri [5 V]: ").strip() or "5"
-                vut = float(vut_str)
-                params["Vcc"] = self.parse_numeric_value(self.config["default_voltage"])
-                params["R1"] = self.parse_numeric_value(self.config["default_resistor"])
-                params["R2"] = params["R1"] * (vut / (params["Vcc"] - vut))
-                params["Vut"] = f"{vut:.2f} V"
-                params["Vlt"] = f"{-vut:.2f} V"
-                print(f"Hesaplanan R1: {self.format_resistance(params['R1'])}")
-                print(f"Hesaplanan R2: {self.format_resistance(params['R2'])}")
-                print(f"Üst Eşik: {vut:.2f} V, Alt Eşik: {-vut:.2f} V")
-
-            elif self.check_circuit_type(circuit_type, "gerilim izleyici"):
-                params["GainFormula"] = "1"
-                params["GainValue"] = "1.00"
-                print("Gerilim İzleyici için kazanç: 1.00")
-
-            elif self.check_circuit_type(circuit_type, "türev alıcı"):
-                tau_str = input(f"İstenen zaman sabiti (RC) [{self.config['default_time_constant']}]: ").strip() or self.config['default_time_constant']
-                tau = self.parse_numeric_value(tau_str)
-                params["R"] = self.parse_numeric_value(self.config["default_resistor"])
-                params["C"] = tau / params["R"]
-                params["Formula"] = r"V_{out} = -RC\frac{dV_{in}}{dt}"
-                print(f"Hesaplanan R: {self.format_resistance(params['R'])}")
-                print(f"Hesaplanan C: {self.format_capacitance(params['C'])}")
-                print(f"Zaman Sabiti (τ): {tau*1000:.2f} ms")
-                
-            elif self.check_circuit_type(circuit_type, "integral alıcı") or self.check_circuit_type(circuit_type, "İntegral alıcı"):
-                tau_str = input(f"İstenen zaman sabiti (RC) [{self.config['default_time_constant']}]: ").strip() or self.config['default_time_constant']
-                tau = self.parse_numeric_value(tau_str)
-                params["R"] = self.parse_numeric_value(self.config["default_resistor"])
-                params["C"] = tau / params["R"]
-                params["Rf"] = params["R"] * 10  # DC ofset için
-                params["Formula"] = r"V_{out} = -\frac{1}{RC}\int V_{in}dt"
-                print(f"Hesaplanan R: {self.format_resistance(params['R'])}")
-                print(f"Hesaplanan C: {self.format_capacitance(params['C'])}")
-                print(f"Hesaplanan Rf: {self.format_resistance(params['Rf'])}")
-                print(f"Zaman Sabiti (τ): {tau*1000:.2f} ms")
-                
-            elif self.check_circuit_type(circuit_type, "fark yükselteci"):
-                gain_str = input(f"İstenen kazanç değeri [{self.config['default_gain']}x]: ").strip() or self.config['default_gain']
-                gain = float(gain_str)
-                params["R1"] = self.parse_numeric_value(self.config["default_resistor"])
-                params["R3"] = params["R1"] * gain
-                params["R2"] = params["R1"]
-                params["R4"] = params["R3"]
-                params["GainFormula"] = r"\frac{R3}{R1}"
-                params["GainValue"] = f"{gain:.2f}"
-                print(f"Hesaplanan R1: {self.format_resistance(params['R1'])}")
-                print(f"Hesaplanan R2: {self.format_resistance(params['R2'])}")
-                print(f"Hesaplanan R3: {self.format_resistance(params['R3'])}")
-                print(f"Hesaplanan R4: {self.format_resistance(params['R4'])}")
-                print(f"Kazanç: {gain:.2f}x")
-
-            params = self.format_parameters(params)
+            if values is None:
+                values = self.prompt_inputs(circuit_type, known)
+            result = self.calculate(circuit_type, values)
+            for line in result.summary_lines():
+                print(line)
+            check = self.suggest_opamps(result)
+            if check is not None:
+                if check["parts"]:
+                    print("Uygun op-amp'lar: " + ", ".join(
+                        f"{item['part']} (pay {item['margin']:g})" for item in check["parts"]
+                    ))
+                else:
+                    print(f"Uyarı: Kütüphanede uygun op-amp yok (gereken GBW {check['required_gbw'] / 1e6:.2f} MHz, "
+                          f"slew rate {check['required_slew_rate'] / 1e6:.2f} V/µs)")
+            params = self.template_parameters(result)
+            self.last_result = result
             
         except Exception as e:
             print(f"Parametre hesaplama hatası: {e}")
@@ -247,60 +244,54 @@ class CircuitDesigner:
 
     def format_resistance(self, value):
         """Direnç değerini okunaklı formata çevirir"""
-        if value >= 1e6:
-            return f"{value/1e6:.2f} MΩ"
-        elif value >= 1e3:
-            return f"{value/1e3:.2f} kΩ"
-        else:
-            return f"{value:.2f} Ω"
+        return format_resistance(value)
             
     def format_capacitance(self, value):
         """Kapasitans değerini okunaklı formata çevirir"""
-        if value >= 1e-3:
-            return f"{value*1e3:.2f} mF"
-        elif value >= 1e-6:
-            return f"{value*1e6:.2f} μF"
-        elif value >= 1e-9:
-            return f"{value*1e9:.2f} nF"
-        else:
-            return f"{value*1e12:.2f} pF"
+        return format_capacitance(value)
 
     def format_parameters(self, params):
         """Parametreleri LaTeX formatına dönüştürür"""
-        formatted = {}
-        for key, value in params.items():
-            if isinstance(value, (int, float)):
-                if key.startswith('R'):
-                    if value >= 1e6:
-                        formatted[key] = f"{value/1e6:.1f}\\\\ M\\\\Ohm"
-                    elif value >= 1e3:
-                        formatted[key] = f"{value/1e3:.1f}\\\\ k\\\\Ohm"
-                    else:
-                        formatted[key] = f"{value:.1f}\\\\ \\\\Ohm"
-                elif key.startswith('C'):
-                    if value >= 1e-3:
-                        formatted[key] = f"{value*1e3:.1f}\\\\ mF"
-                    elif value >= 1e-6:
-                        formatted[key] = f"{value*1e6:.1f}\\\\ \\\\mu F"
-                    elif value >= 1e-9:
-                        formatted[key] = f"{value*1e9:.1f}\\\\ nF"
-                    else:
-                        formatted[key] = f"{value*1e12:.1f}\\\\ pF"
-                elif key.startswith('V'):
-                    formatted[key] = f"{value:.1f}\\\\ V"
-            else:
-                formatted[key] = str(value)
-        return formatted
+        return format_latex_parameters(params)
 
-    def generate_latex_code(self, circuit_type, parameters):
-        """LaTeX devre şeması kodunu oluşturur"""
-        filename = circuit_type.lower().replace(' ', '_')
+    def circuit_filename(self, circuit_type):
+        """Devre tipinden Türkçe karaktersiz dosya adı (uzantısız) üretir"""
+        # 'İ'.lower() noktalı iki karakter üretir, önce düz 'i'ye çevrilir
+        filename = circuit_type.replace('İ', 'i').lower().replace(' ', '_')
         tr_chars = {'ü':'u', 'ğ':'g', 'ş':'s', 'ı':'i', 'ö':'o', 'ç':'c'}
         for char, replacement in tr_chars.items():
             filename = filename.replace(char, replacement)
-        filename += '.tex'
-        
-        template_file = Path(self.config["latex_templates_dir"]) / filename
+        return filename
+
+    def load_template(self, template_file):
+        """Şablon dosyasını okur, değişmediği sürece önbellekten döndürür"""
+        mtime = template_file.stat().st_mtime_ns
+        cached = self.template_cache.get(template_file)
+        if cached and cached[0] == mtime:
+            self.instrumentation.count("template_cache.hit")
+            return cached[1]
+
+        self.instrumentation.count("template_cache.miss")
+        with open(template_file, "r", encoding="utf-8") as f:
+            latex_code = f.read()
+        self.template_cache[template_file] = (mtime, latex_code)
+        return latex_code
+
+    def template_path(self, circuit_type):
+        """Devre tipine ait şablon dosyasının yolu"""
+        return Path(self.config["latex_templates_dir"]) / (self.circuit_filename(circuit_type) + '.tex')
+
+    def template_parameters(self, result):
+        """Tasarımın şablon parametreleri; şablon varsa yalnızca yer tutucularına karşılık gelenler"""
+        template_file = self.template_path(result.circuit_type)
+        if not template_file.exists():
+            return result.to_template_parameters()
+        return result.to_template_parameters(template_placeholders(self.load_template(template_file)))
+
+    @timed("render")
+    def generate_latex_code(self, circuit_type, parameters, result=None):
+        """LaTeX devre şeması kodunu oluşturur; result verilirse analiz grafiklerini ekler"""
+        template_file = self.template_path(circuit_type)
         
         if not template_file.exists():
             print(f"\nHATA: Şu konumda şablon dosyası bulunamadı: {template_file}")
@@ -309,42 +300,364 @@ class CircuitDesigner:
                 print(f" - {f.name}")
             return None
         
-        with open(template_file, "r", encoding="utf-8") as f:
-            latex_code = f.read()
+        latex_code = self.load_template(template_file)
         
         for param, value in parameters.items():
             latex_code = latex_code.replace(f"<<{param}>>", value)
         
+        if result is not None and self.config["analysis_plots"]:
+            latex_code = self.add_analysis(latex_code, result)
         return latex_code
 
-    def compile_latex(self, latex_code, filename):
+    @timed("analysis")
+    def add_analysis(self, latex_code, result):
+        """Tasarımın frekans/zaman analiz grafiklerini LaTeX koduna ekler"""
+        from circuit_analysis import MODELS, add_analysis_plots, pgfplots_figures
+
+        model = MODELS.get(self.config["analysis_model"])
+        if model is None:
+            print(f"Bilinmeyen op-amp modeli: {self.config['analysis_model']}")
+            return latex_code
+        try:
+            figures = pgfplots_figures(result, model)
+        except ValueError as e:
+            print(f"Analiz grafikleri eklenemedi: {e}")
+            return latex_code
+        return add_analysis_plots(latex_code, figures)
+
+    @timed("validate")
+    def validate_latex_code(self, circuit_type, latex_code, parameters):
+        """Üretilen kodu şablonun yer tutucu kümesine göre derlemeden önce kontrol eder"""
+        template_file = self.template_path(circuit_type)
+        template_text = self.load_template(template_file) if template_file.exists() else None
+        return validate_latex(latex_code, template_text, parameters)
+
+    @timed("parts")
+    def suggest_opamps(self, result, top=None):
+        """Tasarımı kütüphanedeki op-amp'larla karşılaştırır; kütüphane yoksa None"""
+        if result is None or not self.config.get("parts_file"):
+            return None
+        from parts import check_design, load_library
+
+        try:
+            library = load_library(self.config["parts_file"])
+        except (OSError, ValueError, KeyError) as e:
+            self.instrumentation.count("parts.unavailable")
+            print(f"Uyarı: Op-amp kütüphanesi okunamadı: {e}", file=sys.stderr)
+            return None
+        return check_design(result, library, self.config, top)
+
+    def get_artifacts(self):
+        from artifacts import ArtifactStore
+
+        with self.store_lock:
+            if self.artifacts is None:
+                self.artifacts = ArtifactStore(
+                    self.config["artifact_dir"], max_bytes=int(self.config["artifact_max_mb"] * (1 << 20))
+                )
+        return self.artifacts
+
+    def compile_document(self, latex_code):
+        """Belgeyi paylaşılan depodan getirir veya derler; (depodaki PDF yolu, hata metni) döndürür.
+
+        Aynı kaynağı derleyen süreçler tek bir pdflatex çalıştırır; derleme özel bir
+        klasörde yapıldığından sabit dosya adları üzerinde yarış olmaz.
+        """
+        from artifacts import JOB_NAME, content_digest
+
+        store = self.get_artifacts()
+        failure = []
+
+        def build(directory):
+            self.instrumentation.count("compile.count")
+            tex_file = directory / f"{JOB_NAME}.tex"
+            tex_file.write_text(latex_code, encoding="utf-8")
+            returncode, diagnostics, timed_out = run_pdflatex(
+                ["pdflatex", "-interaction=nonstopmode", f"-output-directory={directory}", str(tex_file)],
+                timeout=float(self.config["compile_timeout"])
+            )
+            if returncode == 0 and not diagnostics.fatal:
+                return directory / f"{JOB_NAME}.pdf"
+            if timed_out:
+                failure.append("Derleme zaman aşımına uğradı.")
+            failure.append(diagnostics.summary() or "\n".join(diagnostics.tail))
+            return None
+
+        path, compiled = store.build(content_digest("pdflatex", latex_code), build)
+        if path is not None and not compiled:
+            self.instrumentation.count("artifact.hit")
+        return path, "\n".join(failure)
+
+    @timed("compile")
+    def compile_latex(self, latex_code, filename, open_result=True):
         """LaTeX kodunu PDF'e derler"""
+        from artifacts import publish_text
+
         output_dir = Path(self.config["output_dir"])
         tex_file = output_dir / f"{filename}.tex"
         
+        validation = validate_latex(latex_code)
+        if not validation.ok:
+            self.instrumentation.count("compile.preflight_rejected")
+            print("\nLaTeX ön kontrolü başarısız, derleme atlandı:")
+            print(validation.summary())
+            return False
+        
         try:
-            with open(tex_file, "w", encoding="utf-8") as f:
-                f.write(latex_code)
+            publish_text(tex_file, latex_code)
+            artifact, error = self.compile_document(latex_code)
             
-            result = subprocess.run(
-                ["pdflatex", "-interaction=nonstopmode", f"-output-directory={output_dir}", tex_file],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
+            if artifact is not None:
                 pdf_path = output_dir / f"{filename}.pdf"
+                self.get_artifacts().publish(artifact, pdf_path)
                 print(f"\nPDF başarıyla oluşturuldu: {pdf_path}")
-                self.open_pdf(pdf_path)
+                if open_result:
+                    self.open_pdf(pdf_path)
                 return True
             else:
+                self.instrumentation.count("compile.failed")
                 print("\nLaTeX derleme hatası:")
-                print(result.stderr)
+                print(error)
                 return False
         except Exception as e:
             print(f"\nPDF oluşturma hatası: {e}")
             return False
 
+    @timed("compile_async")
+    async def compile_latex_async(self, latex_code, filename=None):
+        """LaTeX kodunu olay döngüsünü bloklamadan derler ve CompileResult döndürür.
+
+        Paylaşılan depoda aynı belge varsa derlenmez. Bu yol özet kilidini beklemez
+        (olay döngüsü bloklanmasın diye); eşzamanlı iki süreç aynı belgeyi iki kez
+        derleyebilir, ancak yayın atomik olduğundan sonuç tutarlı kalır. filename
+        verilmezse çıktı klasörüne bir şey yazılmaz; pdf_path depodaki yoldur.
+        """
+        from artifacts import JOB_NAME, content_digest, publish_text
+
+        validation = validate_latex(latex_code)
+        if not validation.ok:
+            self.instrumentation.count("compile.preflight_rejected")
+            return CompileResult(success=False, log_excerpt=validation.summary())
+        output_dir = Path(self.config["output_dir"])
+        if filename is not None:
+            publish_text(output_dir / f"{filename}.tex", latex_code)
+        result = await self.compile_stored_async(
+            content_digest("pdflatex", latex_code),
+            lambda directory: self.get_async_compiler().compile(latex_code, JOB_NAME, output_dir=directory)
+        )
+        if result.success and filename is not None:
+            pdf_path = output_dir / f"{filename}.pdf"
+            self.get_artifacts().publish(result.pdf_path, pdf_path)
+            result.pdf_path = pdf_path
+        return result
+
+    async def compile_stored_async(self, digest, compile):
+        """Depoda yoksa compile(klasör) eş yordamıyla derleyip depoya ekler; pdf_path depodaki yoldur"""
+        store = self.get_artifacts()
+        artifact = store.get(digest)
+        if artifact is not None:
+            self.instrumentation.count("artifact.hit")
+            return CompileResult(success=True, pdf_path=artifact)
+
+        self.instrumentation.count("compile.count")
+        with store.workdir() as directory:
+            result = await compile(directory)
+            if result.success:
+                result.pdf_path = store.add(digest, result.pdf_path, move=True)
+        if result.success:
+            store.prune()
+        else:
+            self.instrumentation.count("compile.failed")
+        return result
+
+    def get_async_compiler(self):
+        if self.async_compiler is None:
+            self.async_compiler = AsyncLatexCompiler(
+                self.config["output_dir"],
+                max_concurrent=int(self.config["max_concurrent_compiles"]),
+                timeout=float(self.config["compile_timeout"])
+            )
+        return self.async_compiler
+
+    @timed("compile_layered")
+    async def compile_layered_async(self, circuit_type, parameters, filename=None):
+        """Şablonun önbellekteki statik katmanı üzerine yalnızca etiketleri derler (analiz grafikleri eklenmez).
+
+        filename verilmezse sonuç paylaşılan depoya derlenir; pdf_path depodaki yoldur.
+        """
+        from artifacts import JOB_NAME, content_digest
+        from template_layers import LayeredRenderer
+
+        template_file = self.template_path(circuit_type)
+        if not template_file.exists():
+            return CompileResult(success=False, log_excerpt=f"Şablon bulunamadı: {template_file}")
+        if self.layered_renderer is None:
+            self.layered_renderer = LayeredRenderer(
+                Path(self.config["output_dir"]) / "layers",
+                max_concurrent=int(self.config["max_concurrent_compiles"]),
+                timeout=float(self.config["compile_timeout"])
+            )
+        template_text = self.load_template(template_file)
+        if filename is None:
+            digest = content_digest("layered", template_text, json.dumps(parameters, sort_keys=True, ensure_ascii=False))
+            return await self.compile_stored_async(digest, lambda directory: self.layered_renderer.compile(
+                template_text, parameters, JOB_NAME, self.get_async_compiler(), output_dir=directory
+            ))
+        self.instrumentation.count("compile.count")
+        result = await self.layered_renderer.compile(template_text, parameters, filename, self.get_async_compiler())
+        if not result.success:
+            self.instrumentation.count("compile.failed")
+        return result
+
+    @timed("render_svg")
+    def export_svg(self, result, filename, pdf=False):
+        """Tasarımı SVG olarak (istenirse dönüştürücüyle PDF olarak da) çıktı klasörüne yazar"""
+        from svg_renderer import render_svg, svg_to_pdf
+
+        output_dir = Path(self.config["output_dir"])
+        svg_text = render_svg(result)
+        svg_path = output_dir / f"{filename}.svg"
+        svg_path.write_text(svg_text, encoding="utf-8")
+        if not pdf:
+            return svg_path
+        try:
+            pdf_bytes = svg_to_pdf(svg_text)
+        except RuntimeError as e:
+            print(f"Uyarı: PDF oluşturulamadı, yalnızca SVG yazıldı: {e}")
+            return svg_path
+        pdf_path = output_dir / f"{filename}.pdf"
+        pdf_path.write_bytes(pdf_bytes)
+        return pdf_path
+
+    @timed("compose")
+    def compose(self, text, composite=None):
+        """Çok katlı istekten (ör. "terslemeyen 10x -> alçak geçiren 1kHz") Composition üretir"""
+        from cascade import compose
+
+        return compose(text, self.config, composite)
+
+    def composition_filename(self, composition):
+        from cascade import COMPOSITES
+
+        if composition.name in COMPOSITES:
+            return self.circuit_filename(composition.name)
+        return "-".join(self.circuit_filename(stage.circuit_type) for stage in composition.stages)
+
+    def run_composition(self, user_input, composite=None):
+        """Çok katlı isteği tasarlar ve birleşik şemayı derler"""
+        from cascade import composition_latex
+
+        try:
+            composition = self.compose(user_input, composite)
+        except ValueError as e:
+            print(f"Kompozisyon hatası: {e}")
+            return
+        print()
+        for line in composition.summary_lines():
+            print(line)
+
+        latex_code = composition_latex(composition)
+        if input("\nLaTeX kodunu görmek ister misiniz? (e/h): ").lower() == 'e':
+            print("\n" + "="*50)
+            print(latex_code)
+            print("="*50 + "\n")
+        if self.compile_latex(latex_code, self.composition_filename(composition)):
+            print("\nBaşarıyla tamamlandı!")
+
+    # --- Tasarım önbelleği -------------------------------------------------
+
+    def get_memo(self):
+        """Disk üzerindeki tasarım önbelleği; memo_dir boşsa None"""
+        from memo import MemoStore
+
+        with self.store_lock:
+            if self.memo is None and self.config["memo_dir"]:
+                self.memo = MemoStore(
+                    self.config["memo_dir"], ttl=self.config["memo_ttl"],
+                    max_entries=self.config["memo_max_entries"], max_bytes=int(self.config["memo_max_mb"] * (1 << 20))
+                )
+        return self.memo
+
+    def design_key(self, result):
+        """Tasarım değerleri, şablon içeriği ve çıktıyı etkileyen ayarlardan önbellek anahtarı"""
+        from memo import canonical_key, canonical_values
+
+        template_file = self.template_path(result.circuit_type)
+        template_hash = None
+        if template_file.exists():
+            template_hash = hashlib.sha256(self.load_template(template_file).encode("utf-8")).hexdigest()
+        return canonical_key(
+            "design", result.circuit_type, result.kind, canonical_values(result.components),
+            canonical_values(result.targets), result.formula, template_hash,
+            {key: self.config[key] for key in MEMO_SETTINGS}
+        )
+
+    def query_key(self, user_input):
+        from corpus import preprocess_mode
+        from memo import canonical_key
+
+        return canonical_key("query", fold_turkish_text(user_input), preprocess_mode(self.nlp))
+
+    def cached_design(self, result):
+        """Aynı tasarımın önbellekteki kaydı (parametreler, LaTeX, pdf_path) veya None"""
+        memo = self.get_memo()
+        if memo is None or result is None:
+            return None
+        entry = memo.get(self.design_key(result))
+        self.instrumentation.count("memo.hit" if entry else "memo.miss")
+        return entry
+
+    def store_design(self, result, parameters, latex_code, pdf_path):
+        memo = self.get_memo()
+        if memo is None or result is None or not Path(pdf_path).exists():
+            return None
+        data = {"circuit_type": result.circuit_type, "result": result.to_json(), "parameters": parameters, "latex": latex_code}
+        return memo.put(self.design_key(result), data, pdf_path)
+
+    def computing(self, result):
+        """Aynı tasarımı derleyen süreçleri sıraya sokan kilit; önbellek kapalıysa etkisiz"""
+        memo = self.get_memo()
+        if memo is None or result is None:
+            return contextlib.nullcontext()
+        return memo.computing(self.design_key(result))
+
+    def cached_query(self, user_input):
+        """Tüm girdileri içeren bir sorgu daha önce tasarlandıysa eşleştirme ve soru sormadan kaydı döndürür.
+
+        Sorgu kaydı yalnızca devre tipi ve girdileri tutar; tasarım anahtarı yeniden
+        hesaplanır, böylece şablon veya ayar değişince eski PDF kullanılmaz.
+        """
+        memo = self.get_memo()
+        alias = memo.get(self.query_key(user_input)) if memo is not None else None
+        if alias is None:
+            return None
+        try:
+            result = self.calculate(alias["circuit_type"], alias["values"])
+        except ValueError:
+            return None
+        entry = self.cached_design(result)
+        if entry is not None:
+            self.last_result = result
+        return entry
+
+    def store_query(self, user_input, circuit_type, values):
+        memo = self.get_memo()
+        if memo is not None:
+            memo.put(self.query_key(user_input), {"circuit_type": circuit_type, "values": values})
+
+    def restore_cached(self, entry, filename, open_result=True):
+        """Önbellekteki PDF'i çıktı dizinine kopyalar"""
+        from artifacts import publish_file
+
+        pdf_path = Path(self.config["output_dir"]) / f"{filename}.pdf"
+        publish_file(entry["pdf_path"], pdf_path)
+        print(f"\n{entry['circuit_type']} önbellekten alındı: {pdf_path}")
+        for key, value in entry["parameters"].items():
+            print(f"  {key}: {value}")
+        if open_result:
+            self.open_pdf(pdf_path)
+        return pdf_path
+
     def open_pdf(self, pdf_path):
         """Oluşturulan PDF'i açar"""
         if sys.platform == "win32":
@@ -356,17 +669,32 @@ class CircuitDesigner:
 
     def run(self):
         """Ana uygulama akışını çalıştırır"""
+        with self.instrumentation.trace("cli"):
+            self.run_once()
+
+    def run_once(self):
+        """Tek bir tasarım isteğini baştan sona işler"""
+        from cascade import COMPOSITES, is_multi_stage
+
         print("\nOPAMP DEVRE TASARIM SİSTEMİ")
         print("===========================")
         print("Desteklenen Devreler: Tersleyici Yükselteç, Terslemeyen Yükselteç,")
         print("Toplayıcı Yükselteç, Alçak Geçiren Filtre, Yüksek Geçiren Filtre,")
         print("Schmitt Trigger, Gerilim İzleyici, Türev Alıcı, Integral Alıcı,")
-        print("Fark Yükselteci\n")
+        print("Fark Yükselteci; çok katlı istekler için katları '->' ile ayırın")
+        print("(ör. terslemeyen 10x -> alçak geçiren 1kHz, 100Hz-10kHz band geçiren)\n")
         
         user_input = input("Hangi opamp devresini oluşturmak istersiniz? ").strip()
         if not user_input:
             print("Geçersiz giriş!")
             return
+        if is_multi_stage(user_input):
+            self.run_composition(user_input)
+            return
+        cached = self.cached_query(user_input)
+        if cached is not None:
+            self.restore_cached(cached, self.circuit_filename(cached["circuit_type"]))
+            return
         
         circuit = self.find_best_match(user_input)
         if not circuit:
@@ -374,25 +702,68 @@ class CircuitDesigner:
             return
         
         print(f"\nSeçilen Devre: {circuit['circuit_type']}")
-        params = self.get_circuit_parameters(circuit["circuit_type"])
+        if circuit["circuit_type"] in COMPOSITES:
+            self.run_composition(user_input, circuit["circuit_type"])
+            return
+        known, unused = self.extract_inputs(circuit["circuit_type"])
+        if known:
+            print("Sorgudan alınan değerler: " + ", ".join(f"{name}={value:g}" for name, value in known.items()))
+        for item in unused:
+            print(f"Uyarı: bu devre için kullanılmayan değer: {item.value:g}{item.unit}")
+        params = self.get_circuit_parameters(circuit["circuit_type"], known=known)
+        spec = find_circuit_spec(circuit["circuit_type"])
+        complete = spec is not None and all(item.name in known for item in spec.inputs)
+        
+        if self.config["render_backend"] == "svg":
+            if self.last_result is None:
+                print("\nHATA: Parametreler hesaplanamadığı için SVG şema oluşturulamadı")
+                return
+            filename = self.circuit_filename(circuit["circuit_type"])
+            try:
+                path = self.export_svg(self.last_result, filename)
+            except ValueError as e:
+                print(e)
+                return
+            print(f"\nSVG şema oluşturuldu: {path}")
+            return
         
-        latex_code = self.generate_latex_code(circuit["circuit_type"], params)
+        filename = self.circuit_filename(circuit["circuit_type"])
+        cached = self.cached_design(self.last_result)
+        if cached is not None:
+            self.restore_cached(cached, filename)
+            if complete:
+                self.store_query(user_input, circuit["circuit_type"], known)
+            return
+
+        latex_code = self.generate_latex_code(circuit["circuit_type"], params, self.last_result)
         if not latex_code:
             return
         
+        validation = self.validate_latex_code(circuit["circuit_type"], latex_code, params)
+        if validation.issues:
+            print("\nLaTeX ön kontrol sonuçları:")
+            print(validation.summary())
+        
         if input("\nLaTeX kodunu görmek ister misiniz? (e/h): ").lower() == 'e':
             print("\n" + "="*50)
             print(latex_code)
             print("="*50 + "\n")
         
-        filename = circuit["circuit_type"].lower().replace(' ', '_')
-        tr_chars = {'ü':'u', 'ğ':'g', 'ş':'s', 'ı':'i', 'ö':'o', 'ç':'c'}
-        for char, replacement in tr_chars.items():
-            filename = filename.replace(char, replacement)
-        
-        if self.compile_latex(latex_code, filename):
-            print("\nBaşarıyla tamamlandı!")
+        result = self.last_result
+        with self.computing(result):
+            # Başka bir süreç aynı tasarımı bu arada derlemiş olabilir
+            cached = self.cached_design(result)
+            if cached is not None:
+                self.restore_cached(cached, filename)
+                return
+            if not self.compile_latex(latex_code, filename):
+                return
+            self.store_design(result, params, latex_code, Path(self.config["output_dir"]) / f"{filename}.pdf")
+        if complete:
+            self.store_query(user_input, circuit["circuit_type"], known)
+        print("\nBaşarıyla tamamlandı!")
 
 if __name__ == "__main__":
+    configure_from_argv()
     designer = CircuitDesigner()
     designer.run()
\ No newline at end of file
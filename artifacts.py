@@ -0,0 +1,143 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from memo import LOCK_FILE, file_lock, replace_atomic
+
+# Derleme klasöründeki belge adı; PDF içeriği dosya adına değil yalnızca kaynağa bağlı kalır
+JOB_NAME = "document"
+
+
+def content_digest(*parts):
+    """Kaynak metin ve derleyici kimliğinden içerik özeti"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8") if isinstance(part, str) else part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def publish_text(path, text):
+    """Metni geçici dosyaya yazıp os.replace ile yayımlar; okuyan yarım dosya görmez"""
+    replace_atomic(path, lambda tmp: tmp.write_text(text, encoding="utf-8"))
+
+
+def publish_file(source, path):
+    """Dosyanın kopyasını hedef adla atomik olarak yayımlar"""
+    replace_atomic(path, lambda tmp: shutil.copyfile(source, tmp))
+
+
+class ArtifactStore:
+    """Birden çok sürecin paylaştığı, içerik özetine göre adreslenen derleme çıktıları.
+
+    Her çıktı objects/<ilk iki hane>/<özet><uzantı> olarak bir kez saklanır. Derleme
+    özel bir geçici klasörde yapılır ve sonuç os.replace ile yayımlanır; aynı özeti
+    derleyen süreçler özet kilidinde sıraya girer ve ikincisi ilkinin sonucunu kullanır.
+    Kullanıcıya görünen sabit adlı dosyalar (latex_codes/, pdf_outputs/...) deponun
+    kopyalarıdır ve onlar da atomik olarak değiştirilir.
+    """
+
+    def __init__(self, directory, max_bytes=500 << 20):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        for name in ("objects", "locks", "tmp"):
+            (self.directory / name).mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest, suffix=".pdf"):
+        return self.directory / "objects" / digest[:2] / f"{digest}{suffix}"
+
+    def get(self, digest, suffix=".pdf"):
+        """Depodaki çıktının yolu veya None"""
+        path = self.path(digest, suffix)
+        try:
+            os.utime(path)  # Boyut sınırı aşılınca en uzun süredir kullanılmayan silinir
+        except FileNotFoundError:
+            return None
+        return path
+
+    def add(self, digest, source, suffix=".pdf", move=False):
+        """Dosyayı depoya ekler; move True ise (aynı dosya sisteminde) kopyalamadan taşır"""
+        path = self.path(digest, suffix)
+        path.parent.mkdir(exist_ok=True)
+        with file_lock(self.directory / LOCK_FILE, shared=True):
+            if move:
+                os.replace(source, path)
+            else:
+                replace_atomic(path, lambda tmp: shutil.copyfile(source, tmp))
+        return path
+
+    @contextmanager
+    def workdir(self):
+        """Depoyla aynı dosya sisteminde, yalnızca bu sürecin kullandığı derleme klasörü"""
+        with tempfile.TemporaryDirectory(dir=self.directory / "tmp") as directory:
+            yield Path(directory)
+
+    def publish(self, path, target):
+        """Depodaki çıktıyı hedef adla yayımlar (temizlik sırasında silinmesin diye paylaşımlı kilitle)"""
+        with file_lock(self.directory / LOCK_FILE, shared=True):
+            publish_file(path, target)
+
+    def read_bytes(self, path):
+        """Depodaki çıktının içeriği (temizlik sırasında silinmesin diye paylaşımlı kilitle)"""
+        with file_lock(self.directory / LOCK_FILE, shared=True):
+            return Path(path).read_bytes()
+
+    @contextmanager
+    def locked(self, digest):
+        # Kilit dosyaları özetin ilk iki hanesine göre paylaşılır; sayıları 256 ile sınırlı kalır
+        with file_lock(self.directory / "locks" / f"{digest[:2]}.lock"):
+            yield
+
+    def build(self, digest, build, suffix=".pdf"):
+        """Çıktı depoda yoksa build(klasör) ile üretir; (yol veya None, derlendi mi) döndürür.
+
+        build üretilen dosyanın yolunu ya da başarısızlıkta None döndürmelidir. Kilit
+        alındıktan sonra depo yeniden kontrol edilir; başka bir süreç aynı belgeyi
+        derlemişse build çağrılmaz.
+        """
+        path = self.get(digest, suffix)
+        if path is not None:
+            return path, False
+        with self.locked(digest):
+            path = self.get(digest, suffix)
+            if path is not None:
+                return path, False
+            with self.workdir() as directory:
+                produced = build(directory)
+                if produced is None or not Path(produced).exists():
+                    return None, True
+                path = self.add(digest, produced, suffix, move=True)
+        self.prune()
+        return path, True
+
+    def objects(self):
+        """(son kullanım, bayt, yol) listesi"""
+        found = []
+        for path in (self.directory / "objects").glob("*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            found.append((stat.st_mtime, stat.st_size, path))
+        return found
+
+    def prune(self):
+        """Toplam boyut sınırı aşılırsa en uzun süredir kullanılmayan çıktıları siler"""
+        with file_lock(self.directory / LOCK_FILE):
+            objects = sorted(self.objects())
+            total = sum(size for _, size, _ in objects)
+            removed = 0
+            while objects and total > self.max_bytes:
+                _, size, path = objects.pop(0)
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+        return removed
+
+    def clear(self):
+        with file_lock(self.directory / LOCK_FILE):
+            for _, _, path in self.objects():
+                path.unlink(missing_ok=True)
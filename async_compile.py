@@ -0,0 +1,185 @@
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from latex_log import LatexLogAnalyzer
+
+
+@dataclass
+class CompileResult:
+    """Tek bir pdflatex derlemesinin yapılandırılmış sonucu"""
+    success: bool
+    pdf_path: Path = None
+    duration: float = 0.0
+    returncode: int = None
+    log_excerpt: str = ""
+    timed_out: bool = False
+    diagnostics: object = None
+
+    def to_dict(self):
+        return {
+            "success": self.success,
+            "pdf_path": str(self.pdf_path) if self.pdf_path else None,
+            "duration": round(self.duration, 4),
+            "returncode": self.returncode,
+            "log_excerpt": self.log_excerpt,
+            "timed_out": self.timed_out,
+            "diagnostics": self.diagnostics.to_dict() if self.diagnostics else None,
+        }
+
+
+def kill_process_tree(proc):
+    """pdflatex'i ve başlattığı alt süreçleri (mktexpk vb.) sonlandırır"""
+    if proc.returncode is not None:
+        return
+    try:
+        if sys.platform == "win32":
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError, OSError):
+        proc.kill()
+
+
+def spawn_kwargs():
+    """TeX'i ayrı bir süreç grubunda başlatmak için Popen/exec argümanları"""
+    if sys.platform == "win32":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def log_excerpt(diagnostics):
+    """Teşhis özeti ve son birkaç çıktı satırından kısa bir günlük parçası oluşturur"""
+    summary = diagnostics.summary()
+    tail = "\n".join(diagnostics.tail)
+    return f"{summary}\n---\n{tail}" if summary else tail
+
+
+def run_pdflatex(args, timeout=30.0, analyzer=None):
+    """pdflatex'i bloklayarak çalıştırır, çıktıyı akış halinde analiz eder.
+
+    İlk ölümcül hatada veya zaman aşımında süreç ağacı öldürülür.
+    (returncode, diagnostics, timed_out) döndürür.
+    """
+    analyzer = analyzer or LatexLogAnalyzer()
+    proc = subprocess.Popen(
+        args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, encoding="utf-8", errors="replace", **spawn_kwargs()
+    )
+    timed_out = threading.Event()
+
+    def on_timeout():
+        timed_out.set()
+        kill_process_tree(proc)
+
+    timer = threading.Timer(timeout, on_timeout)
+    timer.start()
+    try:
+        with proc.stdout:
+            for line in proc.stdout:
+                if analyzer.feed(line):
+                    kill_process_tree(proc)
+                    break
+        returncode = proc.wait()
+    finally:
+        timer.cancel()
+    return returncode, analyzer.finish(), timed_out.is_set()
+
+
+class AsyncLatexCompiler:
+    """asyncio.create_subprocess_exec üzerine kurulu, eşzamanlılığı sınırlı LaTeX derleyicisi"""
+
+    def __init__(self, output_dir, max_concurrent=4, timeout=30.0, command="pdflatex"):
+        self.output_dir = Path(output_dir)
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self.command = command
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # Semafor ilk kullanıldığı olay döngüsüne bağlanır
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def read_output(self, proc, analyzer):
+        async for raw_line in proc.stdout:
+            if analyzer.feed(raw_line.decode("utf-8", errors="replace")):
+                # İlk ölümcül hatada zaman aşımını beklemeden durdur
+                kill_process_tree(proc)
+                break
+        return await proc.wait()
+
+    async def compile(self, latex_code, filename, timeout=None, output_dir=None):
+        """LaTeX kodunu PDF'e derler; iptal edilirse TeX süreç ağacını öldürür.
+
+        output_dir verilirse derleme varsayılan çıktı klasörü yerine orada yapılır.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        output_dir = Path(output_dir or self.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        tex_file = output_dir / f"{filename}.tex"
+        pdf_path = output_dir / f"{filename}.pdf"
+        tex_file.write_text(latex_code, encoding="utf-8")
+
+        async with self.semaphore:
+            started = time.perf_counter()
+            analyzer = LatexLogAnalyzer()
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    self.command, "-interaction=nonstopmode", f"-output-directory={output_dir}", str(tex_file),
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                    **spawn_kwargs()
+                )
+            except FileNotFoundError:
+                return CompileResult(
+                    success=False,
+                    duration=time.perf_counter() - started,
+                    log_excerpt=f"{self.command} komutu bulunamadı"
+                )
+
+            try:
+                returncode = await asyncio.wait_for(self.read_output(proc, analyzer), timeout)
+            except asyncio.TimeoutError:
+                kill_process_tree(proc)
+                await proc.wait()
+                diagnostics = analyzer.finish()
+                return CompileResult(
+                    success=False,
+                    duration=time.perf_counter() - started,
+                    returncode=proc.returncode,
+                    log_excerpt=log_excerpt(diagnostics),
+                    timed_out=True,
+                    diagnostics=diagnostics
+                )
+            except asyncio.CancelledError:
+                kill_process_tree(proc)
+                await asyncio.shield(proc.wait())
+                raise
+
+            diagnostics = analyzer.finish()
+            success = returncode == 0 and not diagnostics.fatal and pdf_path.exists()
+            return CompileResult(
+                success=success,
+                pdf_path=pdf_path if success else None,
+                duration=time.perf_counter() - started,
+                returncode=returncode,
+                log_excerpt="" if success else log_excerpt(diagnostics),
+                diagnostics=diagnostics
+            )
+
+    async def compile_many(self, jobs):
+        """(latex_code, filename) çiftlerini semafor sınırı içinde eşzamanlı derler"""
+        return await asyncio.gather(*(self.compile(code, name) for code, name in jobs))
@@ -0,0 +1,365 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from anakod5 import CircuitDesigner
+from cascade import clear_cache as clear_composition_cache, compose, composition_latex
+from circuit_analysis import analyze, clear_cache, pgfplots_figures
+from corpus import build_index, load_index
+from parts import check_designs, load_library
+from quantity import parse_column, parse_quantity
+from report import ReportBuilder
+from svg_renderer import render_svg
+
+# Her şablon için (devre tipi, hesaplama girdileri)
+CIRCUITS = [
+    ("Tersleyici Yükselteç", {"gain": "10"}),
+    ("Terslemeyen Yükselteç", {"gain": "10"}),
+    ("Toplayıcı", {"gain1": "-2", "gain2": "-5"}),
+    ("Alçak Geçiren Filtre", {"cutoff": "1000"}),
+    ("Yüksek Geçiren Filtre", {"cutoff": "1000"}),
+    ("Schmitt Trigger", {"vut": "5"}),
+    ("Gerilim İzleyici", {}),
+    ("Türev Alıcı", {"tau": "1m"}),
+    ("Integral Alıcı", {"tau": "1m"}),
+    ("Fark Yükselteci", {"gain": "10"}),
+]
+# Çok katlı istekler; katlar kompozisyonlar arasında paylaşılır
+COMPOSITIONS = [
+    "terslemeyen 10x -> alçak geçiren 1kHz",
+    "100Hz - 10kHz band geçiren",
+    "band durduran 50Hz ve 5kHz",
+    "hpf 100Hz -> tersleyici 5 -> lpf 10kHz -> izleyici",
+]
+
+# Toplu çalıştırmalarda CSV sütunu çözme hedefi: 1M hücre 1 s'nin altında
+PARSE_CELLS = 1_000_000
+PARSE_TARGET = 1.0
+PARSE_VALUES = ["10k", "4.7k", "1ms", "2.2uF", "100n", "47", "1MΩ", "3k3", "-5 V", "1,5kHz"]
+# Op-amp sıralama ölçümündeki tarama noktası sayısı
+PARTS_SWEEP = 1000
+
+PHRASES = [
+    "Bana bir {} devresi çiz.",
+    "{} tasarla",
+    "{} devresi lazım",
+    "Opamp ile {} istiyorum",
+    "{} için şema hazırla",
+]
+
+STUB_PDFLATEX = r'''#!/usr/bin/env python3
+"""Benchmark için pdflatex yerine geçen sahte derleyici: sabit küçük bir PDF yazar."""
+import os, sys
+out_dir, tex = ".", None
+for arg in sys.argv[1:]:
+    if arg.startswith("-output-directory="):
+        out_dir = arg.split("=", 1)[1]
+    elif arg.endswith(".tex"):
+        tex = arg
+name = os.path.splitext(os.path.basename(tex))[0]
+with open(os.path.join(out_dir, name + ".pdf"), "wb") as f:
+    f.write(b"%PDF-1.4\n%%EOF\n")
+print("Output written on " + name + ".pdf")
+'''
+
+
+class BenchmarkRunner:
+    """pyperf tarzı ısınma + kalibre edilmiş döngü + tekrarlı ölçüm"""
+
+    def __init__(self, repeats=5, min_time=0.1, warmups=1):
+        self.repeats = repeats
+        self.min_time = min_time
+        self.warmups = warmups
+        self.results = {}
+
+    def calibrate(self, func):
+        loops = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(loops):
+                func()
+            if time.perf_counter() - started >= self.min_time or loops >= 1 << 20:
+                return loops
+            loops *= 2
+
+    def bench(self, name, func, setup=None, loops=None, repeats=None):
+        """func'ı ölçer; setup verilirse her tekrardan önce (ölçüm dışında) çağrılır"""
+        repeats = repeats or self.repeats
+        for _ in range(self.warmups):
+            if setup:
+                setup()
+            func()
+        if loops is None:
+            loops = 1 if setup else self.calibrate(func)
+
+        values = []
+        for _ in range(repeats):
+            if setup:
+                setup()
+            started = time.perf_counter()
+            for _ in range(loops):
+                func()
+            values.append((time.perf_counter() - started) / loops)
+
+        result = {
+            "loops": loops,
+            "values": values,
+            "mean": statistics.fmean(values),
+            "median": statistics.median(values),
+            "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+            "min": min(values),
+        }
+        self.results[name] = result
+        print(f"{name:<48} {format_seconds(result['mean'])} ± {format_seconds(result['stdev'])}", file=sys.stderr)
+        return result
+
+
+def format_seconds(value):
+    if value >= 1:
+        return f"{value:8.3f} s "
+    if value >= 1e-3:
+        return f"{value * 1e3:8.3f} ms"
+    return f"{value * 1e6:8.3f} us"
+
+
+def synthetic_corpus(dataset, size, seed=0):
+    """Dataset'teki devre tiplerinden istenen boyutta sentetik eşleşme korpusu üretir"""
+    rng = random.Random(seed)
+    circuit_types = sorted({item["circuit_type"] for item in dataset})
+    return [
+        {"input": rng.choice(PHRASES).format(circuit_type), "circuit_type": circuit_type}
+        for circuit_type in (rng.choice(circuit_types) for _ in range(size))
+    ]
+
+
+@contextlib.contextmanager
+def pdflatex_available():
+    """pdflatex kurulu değilse PATH'e geçici bir sahte derleyici ekler"""
+    if shutil.which("pdflatex"):
+        yield "pdflatex"
+        return
+
+    stub_dir = Path(tempfile.mkdtemp(prefix="pdflatex_stub_"))
+    script = stub_dir / "pdflatex"
+    script.write_text(STUB_PDFLATEX, encoding="utf-8")
+    script.chmod(0o755)
+    if sys.platform == "win32":
+        (stub_dir / "pdflatex.cmd").write_text(f'@"{sys.executable}" "{script}" %*\r\n', encoding="utf-8")
+    old_path = os.environ.get("PATH", "")
+    os.environ["PATH"] = str(stub_dir) + os.pathsep + old_path
+    try:
+        yield "stub"
+    finally:
+        os.environ["PATH"] = old_path
+        shutil.rmtree(stub_dir, ignore_errors=True)
+
+
+def run_benchmarks(args):
+    runner = BenchmarkRunner(repeats=args.repeats, min_time=args.min_time)
+    designer = CircuitDesigner()
+    with open(args.dataset, "r", encoding="utf-8") as f:
+        dataset = json.load(f)
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    query = "Bana bir tersleyici yükselteç devresi tasarla"
+
+    corpora = [("dataset", dataset)]
+    corpora += [(f"synthetic_{size}", synthetic_corpus(dataset, size)) for size in args.sizes]
+    for label, corpus in corpora:
+        designer.dataset = corpus
+        designer.match_index = None
+        with quiet:
+            runner.bench(
+                f"match.cold[{label}]",
+                lambda: designer.find_best_match(query),
+                setup=lambda: setattr(designer, "match_index", None),
+                repeats=1 if len(corpus) >= 100000 else None
+            )
+            runner.bench(f"match.warm[{label}]", lambda: designer.find_best_match(query))
+
+    # Kalıcı indeks tek bir .npz üzerinde bellek eşlenir; yükleme korpus boyutundan bağımsız olmalı
+    with tempfile.TemporaryDirectory() as index_dir:
+        build_index(args.dataset, index_dir, workers=1, use_spacy=False)
+        runner.bench("index.load[dataset]", lambda: load_index(index_dir))
+
+    # Değer çıkarımı eşleştirmenin token akışını kullanır; ek NLP geçişi yapmaz
+    spec_query = "kazancı 10 ve kesim frekansı 2 kHz olan alçak geçiren filtre"
+    with quiet:
+        designer.find_best_match(spec_query)
+    runner.bench("extract[Alçak Geçiren Filtre]", lambda: designer.extract_inputs("Alçak Geçiren Filtre"))
+
+    parameters = {}
+    for circuit_type, values in CIRCUITS:
+        with quiet:
+            runner.bench(
+                f"calculate[{circuit_type}]",
+                lambda: designer.get_circuit_parameters(circuit_type, values)
+            )
+            parameters[circuit_type] = designer.get_circuit_parameters(circuit_type, values)
+
+    rng = random.Random(0)
+    cells = [rng.choice(PARSE_VALUES) for _ in range(PARSE_CELLS)]
+    distinct = [f"{i},{i % 10} kΩ" for i in range(1000)]
+    runner.bench("parse.scalar[1000]", lambda: [parse_quantity(text) for text in distinct], setup=parse_quantity.cache_clear)
+    column = runner.bench(f"parse.column[{PARSE_CELLS}]", lambda: parse_column(cells), loops=1)
+    if column["mean"] > PARSE_TARGET:
+        print(f"Uyarı: sütun çözme hedefin ({PARSE_TARGET:.1f} s / {PARSE_CELLS} hücre) altında", file=sys.stderr)
+
+    for circuit_type, values in CIRCUITS:
+        result = designer.calculate(circuit_type, values)
+        runner.bench(
+            f"analysis.cold[{circuit_type}]",
+            lambda: (analyze(result), pgfplots_figures(result)),
+            setup=clear_cache
+        )
+        runner.bench(f"analysis.warm[{circuit_type}]", lambda: (analyze(result), pgfplots_figures(result)))
+        runner.bench(f"render_svg[{circuit_type}]", lambda: render_svg(result), setup=render_svg.cache_clear)
+
+    for request in COMPOSITIONS:
+        runner.bench(
+            f"compose.cold[{request}]",
+            lambda: compose(request).frequency_response(),
+            setup=clear_composition_cache
+        )
+        runner.bench(f"compose.warm[{request}]", lambda: compose(request).frequency_response())
+        runner.bench(f"compose.render[{request}]", lambda: composition_latex(compose(request)))
+
+    # Op-amp kontrolü: tarama grubu tek vektörel adımda (tasarım × parça) sıralanır
+    library = load_library(designer.config["parts_file"])
+    sweep = [designer.calculate("Terslemeyen Yükselteç", {"gain": str(gain)}) for gain in range(1, PARTS_SWEEP + 1)]
+    runner.bench(f"parts.rank[{PARTS_SWEEP}]", lambda: check_designs(sweep, library, designer.config))
+
+    # Önbellek isabeti: anahtar (şablon özeti dahil) + kilitli okuma; derlemenin yerini alır
+    with tempfile.TemporaryDirectory() as memo_dir:
+        designer.config["memo_dir"], designer.memo = memo_dir, None
+        result = designer.calculate("Terslemeyen Yükselteç", {"gain": "10"})
+        pdf_path = Path(memo_dir) / "bench.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4\n%%EOF\n")
+        designer.store_design(result, {}, "", pdf_path)
+        runner.bench("memo.hit[Terslemeyen Yükselteç]", lambda: designer.cached_design(result))
+        designer.memo = None
+
+    for circuit_type, _ in CIRCUITS:
+        if not designer.template_path(circuit_type).exists():
+            print(f"Şablon yok, atlanıyor: {circuit_type}", file=sys.stderr)
+            continue
+        runner.bench(
+            f"render[{circuit_type}]",
+            lambda: designer.generate_latex_code(circuit_type, parameters[circuit_type])
+        )
+
+    compiler = None
+    if not args.skip_compile:
+        output_dir = Path(tempfile.mkdtemp(prefix="bench_compile_"))
+        designer.config["output_dir"] = str(output_dir)
+        designer.config["artifact_dir"], designer.artifacts = str(output_dir / "artifacts"), None
+        with pdflatex_available() as compiler:
+            for circuit_type, _ in CIRCUITS:
+                latex_code = designer.generate_latex_code(circuit_type, parameters[circuit_type])
+                if latex_code is None:
+                    continue
+                filename = designer.circuit_filename(circuit_type)
+                with quiet:
+                    runner.bench(
+                        f"compile[{circuit_type}]",
+                        lambda: designer.compile_latex(latex_code, filename, open_result=False),
+                        setup=designer.get_artifacts().clear,
+                        loops=1, repeats=args.compile_repeats
+                    )
+                    # Paylaşılan depoda bulunan belge: yalnızca özet, kilit ve atomik kopya
+                    runner.bench(
+                        f"compile.shared[{circuit_type}]",
+                        lambda: designer.compile_latex(latex_code, filename, open_result=False)
+                    )
+                    # İlk çağrı statik katmanı derler; ölçülen süre yalnızca etiket katmanıdır
+                    asyncio.run(designer.compile_layered_async(circuit_type, parameters[circuit_type], filename))
+                    runner.bench(
+                        f"compile.layered[{circuit_type}]",
+                        lambda: asyncio.run(
+                            designer.compile_layered_async(circuit_type, parameters[circuit_type], filename)
+                        ),
+                        loops=1, repeats=args.compile_repeats
+                    )
+
+            # 50 devrelik paket: tek belge ve paralel parçalar
+            builder = ReportBuilder(designer)
+            packet = [designer.calculate(circuit_type, values) for circuit_type, values in CIRCUITS] * 5
+            for chunks in (1, 4):
+                with quiet:
+                    runner.bench(
+                        f"report[{len(packet)}, chunks={chunks}]",
+                        lambda: builder.build(packet, "bench_report", chunks),
+                        loops=1, repeats=args.compile_repeats
+                    )
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "pdflatex": compiler,
+            "repeats": args.repeats,
+        },
+        "benchmarks": runner.results,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Ortalama süreleri taban çizgisiyle karşılaştırır; gerilemeleri döndürür"""
+    regressions = []
+    print(f"\n{'Benchmark':<48}{'Taban':>12}{'Şimdi':>12}{'Oran':>8}")
+    for name, current in sorted(results["benchmarks"].items()):
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            print(f"{name:<48}{'-':>12}{format_seconds(current['mean']):>12}{'yeni':>8}")
+            continue
+        ratio = current["mean"] / base["mean"] if base["mean"] else float("inf")
+        flag = " !" if ratio > threshold else ""
+        print(f"{name:<48}{format_seconds(base['mean']):>12}{format_seconds(current['mean']):>12}{ratio:>7.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eşleşme, hesaplama, şablon ve derleme benchmarkları")
+    parser.add_argument("--dataset", default="dataset.json")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10000, 100000, 1000000],
+                        help="Sentetik korpus boyutları")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--compile-repeats", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.1, help="Bir tekrarın en az süresi (s)")
+    parser.add_argument("--skip-compile", action="store_true")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Karşılaştırılacak taban çizgisi JSON dosyası")
+    parser.add_argument("--threshold", type=float, default=1.10, help="Gerileme sayılacak süre oranı")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\nSonuçlar yazıldı: {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark eşik değerini ({args.threshold:.2f}x) aştı.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,438 @@
+import math
+import re
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+
+import numpy as np
+
+from circuit_analysis import IDEAL, FrequencyResponse, characteristic_frequency, transfer_function
+from circuit_calculations import DEFAULT_CONFIG, SPECS_BY_KIND, calculate, find_circuit_spec, fold_turkish_text
+from design_result import DesignResult, format_latex_parameters
+from extraction import extract_values
+from quantity import find_quantities
+
+# Bir kata girişi ve çıkışı tek uçlu olan, art arda bağlanabilen devreler
+CASCADE_KINDS = (
+    "inverting", "non_inverting", "voltage_follower", "low_pass", "high_pass",
+    "differentiator", "integrator",
+)
+# "kazanç 10 -> alçak geçiren 1kHz", "hpf 100Hz + lpf 10kHz", "... ve ardından ..."
+# Ondalık virgül ("4,7 nF") ve işaretli sayılar ("+5 V") ayırıcı sayılmaz
+STAGE_SEPARATOR = re.compile(
+    r"\s*(?:->|→|=>|>>|\+(?!\d)|,(?!\d)|;|\bve\b|\bsonra(?:sında)?\b|\bardından\b)\s*", re.IGNORECASE
+)
+# Tam devre adının yanında kabul edilen kısa kat adları (katlanmış yazım)
+STAGE_TERMS = {
+    "alcak geciren": "low_pass", "lpf": "low_pass",
+    "yuksek geciren": "high_pass", "hpf": "high_pass",
+    "izleyici": "voltage_follower", "takipci": "voltage_follower", "buffer": "voltage_follower",
+    "turev": "differentiator", "integral": "integrator",
+}
+BAND_PASS = "Band Geçiren Filtre"
+BAND_STOP = "Band Durduran Filtre"
+COMPOSITE_TERMS = {"band geciren": BAND_PASS, "band durduran": BAND_STOP, "centik": BAND_STOP}
+BAND_DEFAULTS = (100.0, 10e3)  # Hz; band kenarı verilmezse
+
+# Tüm katların cevabı aynı sabit ızgarada hesaplanır; böylece bir katın cevabı
+# farklı kompozisyonlarda ve farklı görüntüleme aralıklarında yeniden kullanılır
+GRID_DECADES = (-3, 9)
+STAGE_PITCH = 7.5  # cm, ardışık katların yatay aralığı
+BRANCH_OFFSET = 4.5  # cm, paralel dalların eksenden düşey uzaklığı
+
+
+@lru_cache(maxsize=512)
+def design_stage(circuit_type, values, config=()):
+    """Tek katın tasarımı; aynı (tip, girdiler) farklı kompozisyonlarda yeniden kullanılır"""
+    return calculate(circuit_type, dict(values), dict(config))
+
+
+def _config_key(config):
+    # Yalnızca hesaplamayı etkileyen anahtarlar önbellek anahtarına girer
+    return tuple(sorted((key, value) for key, value in (config or {}).items() if key in DEFAULT_CONFIG))
+
+
+def _stage(circuit_type, values=None, config=None):
+    spec = find_circuit_spec(circuit_type)
+    if spec is None or spec.kind not in CASCADE_KINDS:
+        raise ValueError(f"Çok katlı tasarımda kullanılamayan devre: {circuit_type}")
+    return design_stage(spec.circuit_type, tuple(sorted((values or {}).items())), _config_key(config))
+
+
+@dataclass(frozen=True)
+class Composition:
+    """Çok katlı tasarım: katlar art arda (cascade) ya da paralel dallar ve toplayıcı olarak bağlanır"""
+    name: str
+    stages: tuple
+    topology: str = "cascade"  # "cascade" veya "parallel_sum"
+    summer: DesignResult = None
+
+    @property
+    def circuit_type(self):
+        return self.name
+
+    def branch_inputs(self):
+        """Paralel topolojide her dalın toplayıcıdaki (R1, R2) girişine göre toplayıcı bileşenleri"""
+        c = self.summer.components
+        resistors = [c["R1"], c["R2"]]
+        return [
+            {"R1": resistors[i], "R2": resistors[1 - i], "Rf": c["Rf"]}
+            for i in range(len(self.stages))
+        ]
+
+    def transfer_function(self, model=IDEAL):
+        """Toplam H(s) için (pay, payda) polinom katsayıları"""
+        parts = [transfer_function(stage.kind, stage.components, model) for stage in self.stages]
+        if self.topology == "cascade":
+            return reduce(np.polymul, [num for num, _ in parts]), reduce(np.polymul, [den for _, den in parts])
+        branches = []
+        for (num, den), summer in zip(parts, self.branch_inputs()):
+            s_num, s_den = transfer_function("summing", summer, model)
+            branches.append((np.polymul(num, s_num), np.polymul(den, s_den)))
+        den = reduce(np.polymul, [d for _, d in branches])
+        num = np.zeros(1)
+        for i, (n, _) in enumerate(branches):
+            others = [d for j, (_, d) in enumerate(branches) if j != i]
+            num = np.polyadd(num, reduce(np.polymul, others, n))
+        return num, den
+
+    def frequency_response(self, model=IDEAL, f_start=None, f_stop=None, points_per_decade=50):
+        return composite_response(self, model, f_start, f_stop, points_per_decade)
+
+    def summary_lines(self):
+        lines = [f"{self.name} ({len(self.stages)} kat, {self.topology})"]
+        for index, stage in enumerate(self.stages, 1):
+            lines.append(f"  {index}. {stage.circuit_type}")
+            lines += [f"    {line}" for line in stage.summary_lines()]
+        if self.summer is not None:
+            lines.append("  Toplayıcı")
+            lines += [f"    {line}" for line in self.summer.summary_lines()]
+        return lines
+
+    def to_dict(self):
+        data = {
+            "name": self.name,
+            "topology": self.topology,
+            "stages": [stage.to_json() for stage in self.stages],
+        }
+        if self.summer is not None:
+            data["summer"] = self.summer.to_json()
+        return data
+
+
+def cascade(stages, name=None, config=None):
+    """[(devre tipi, girdiler)] listesinden art arda bağlı kompozisyon"""
+    designed = tuple(_stage(circuit_type, values, config) for circuit_type, values in stages)
+    if not designed:
+        raise ValueError("Kompozisyonda en az bir kat olmalı")
+    return Composition(name or " → ".join(stage.circuit_type for stage in designed), designed)
+
+
+def _band_edges(f_low, f_high):
+    f_low, f_high = float(f_low), float(f_high)
+    if not 0 < f_low < f_high:
+        raise ValueError(f"Band kenarları 0 < f_alt < f_üst olmalı (girilen: {f_low:g} Hz, {f_high:g} Hz)")
+    return f_low, f_high
+
+
+def band_pass(f_low=BAND_DEFAULTS[0], f_high=BAND_DEFAULTS[1], gain=None, config=None):
+    """Yüksek geçiren (f_alt) ve alçak geçiren (f_üst) katların art arda bağlanması"""
+    f_low, f_high = _band_edges(f_low, f_high)
+    stages = _gain_stages(gain) + [("high_pass", {"cutoff": f_low}), ("low_pass", {"cutoff": f_high})]
+    return cascade(stages, BAND_PASS, config)
+
+
+def band_stop(f_low=BAND_DEFAULTS[0], f_high=BAND_DEFAULTS[1], gain=None, config=None):
+    """Alçak geçiren (f_alt) ve yüksek geçiren (f_üst) dalların toplayıcıda birleştirilmesi.
+
+    Tek katlı RC dallar art arda bağlanınca band durduran cevap vermez; bu yüzden
+    dallar paralel çalışır ve toplayıcı (kazanç -|gain|) çıkışları toplar.
+    """
+    f_low, f_high = _band_edges(f_low, f_high)
+    branches = (_stage("low_pass", {"cutoff": f_low}, config), _stage("high_pass", {"cutoff": f_high}, config))
+    gain = abs(gain) if gain else 1.0
+    summer = design_stage(
+        SPECS_BY_KIND["summing"].circuit_type, (("gain1", -gain), ("gain2", -gain)), _config_key(config)
+    )
+    return Composition(BAND_STOP, branches, "parallel_sum", summer)
+
+
+def _gain_stages(gain):
+    if gain is None or gain == 1:
+        return []
+    return [("inverting", {"gain": -gain}) if gain < 0 else ("non_inverting", {"gain": gain})]
+
+
+COMPOSITES = {BAND_PASS: band_pass, BAND_STOP: band_stop}
+
+
+# --- İstek çözümleme -----------------------------------------------------------
+
+def composite_type(text):
+    """Metin bir bileşik devre (band filtresi) istiyorsa adını döndürür"""
+    folded = fold_turkish_text(text)
+    return next((name for term, name in COMPOSITE_TERMS.items() if term in folded), None)
+
+
+def stage_spec(text):
+    """Kat metnini devre tanımına eşler (tam ad veya kısa ad)"""
+    spec = find_circuit_spec(text)
+    if spec is None:
+        folded = fold_turkish_text(text)
+        kind = next((kind for term, kind in STAGE_TERMS.items() if re.search(rf"\b{term}", folded)), None)
+        spec = SPECS_BY_KIND.get(kind)
+    return spec
+
+
+def assign_values(spec, text):
+    """Kat metnindeki değerleri rollerine göre girdilere dağıtır (rolsüz birimsiz değer ilk boş girdiye)"""
+    values, unused = extract_values(text).for_spec(spec, positional=True)
+    if unused:
+        raise ValueError(f"{spec.circuit_type} katı için uygun olmayan değer: {text}")
+    return values
+
+
+def split_stages(text):
+    return [segment for segment in STAGE_SEPARATOR.split(text) if segment.strip()]
+
+
+def is_multi_stage(text):
+    """Metin birden çok kat ya da bileşik bir devre tarif ediyor mu"""
+    return composite_type(text) is not None or sum(stage_spec(s) is not None for s in split_stages(text)) > 1
+
+
+def compose(text, config=None, composite=None):
+    """Serbest metin isteğinden kompozisyon üretir.
+
+    "terslemeyen 10x -> alçak geçiren 1kHz" gibi katlar sırayla bağlanır;
+    "100 Hz - 10 kHz band geçiren" gibi bileşik adlar kendi topolojisine açılır.
+    composite verilirse (ör. veri setinden eşleşen tip) metindeki ad yerine o kullanılır.
+    Çözülemeyen istekler için ValueError fırlatır.
+    """
+    composite = composite or composite_type(text)
+    if composite is not None:
+        quantities = [q for q, _ in find_quantities(text)]
+        edges = sorted(q.value for q in quantities if q.unit in ("Hz", ""))
+        gains = [q.value for q in quantities if q.unit == "x"]
+        if len(edges) == 1:
+            raise ValueError(f"{composite} için iki band kenarı gerekli (ör. 100Hz - 10kHz)")
+        return COMPOSITES[composite](*(edges[:2] or BAND_DEFAULTS), gain=gains[0] if gains else None, config=config)
+
+    stages = []
+    for segment in split_stages(text):
+        spec = stage_spec(segment)
+        if spec is None:
+            raise ValueError(f"Tanınmayan kat: {segment.strip()}")
+        stages.append((spec.circuit_type, assign_values(spec, segment)))
+    return cascade(stages, config=config)
+
+
+# --- Toplam frekans cevabı -------------------------------------------------------
+
+@lru_cache(maxsize=16)
+def _grid(points_per_decade):
+    start, stop = GRID_DECADES
+    frequency = np.logspace(start, stop, (stop - start) * points_per_decade + 1)
+    frequency.flags.writeable = False
+    return frequency
+
+
+@lru_cache(maxsize=1024)
+def _complex_response(kind, names, values, model, points_per_decade):
+    """Tek katın karmaşık H(j2πf) değerleri sabit ızgarada (kat ve model başına önbellekli)"""
+    num, den = transfer_function(kind, dict(zip(names, values)), model)
+    s = 2j * math.pi * _grid(points_per_decade)
+    response = np.polyval(num, s) / np.polyval(den, s)
+    response.flags.writeable = False
+    return response
+
+
+def _response(result, model, points_per_decade, components=None):
+    names, values = result.component_names, result.component_values
+    if components is not None:
+        names, values = tuple(components), tuple(components.values())
+    return _complex_response(result.kind, names, values, model, points_per_decade)
+
+
+def composite_response(composition, model=IDEAL, f_start=None, f_stop=None, points_per_decade=50):
+    """Kompozisyonun Bode eğrisi; katların önbellekli cevapları tek bir dizi işlemiyle birleştirilir.
+
+    Izgara verilmezse en düşük karakteristik frekansın üç dekat altından en yükseğin
+    üç dekat üstüne uzanır.
+    """
+    responses = np.stack([_response(stage, model, points_per_decade) for stage in composition.stages])
+    if composition.topology == "cascade":
+        total = responses.prod(axis=0)
+    else:
+        summers = np.stack([
+            _response(composition.summer, model, points_per_decade, inputs)
+            for inputs in composition.branch_inputs()
+        ])
+        total = (responses * summers).sum(axis=0)
+
+    frequency = _grid(points_per_decade)
+    f0 = [characteristic_frequency(stage.kind, stage.components, stage.targets) for stage in composition.stages]
+    lo = np.searchsorted(frequency, (f_start or min(f0) / 1e3) * (1 - 1e-9))
+    hi = np.searchsorted(frequency, (f_stop or max(f0) * 1e3) * (1 + 1e-9))
+    frequency, total = frequency[lo:hi], total[lo:hi]
+    magnitude = 20 * np.log10(np.maximum(np.abs(total), 1e-300))
+    phase = np.degrees(np.unwrap(np.angle(total)))
+    for array in (magnitude, phase):
+        array.flags.writeable = False
+    return FrequencyResponse(frequency, magnitude, phase, model.name)
+
+
+def clear_cache():
+    design_stage.cache_clear()
+    _complex_response.cache_clear()
+
+
+# --- Birleşik şema -------------------------------------------------------------
+
+def _feedback(p, component):
+    return f"\\draw ({p}.-) -- ++(0,1.5) coordinate ({p}fb) to[{component}] ({p}fb -| {p}.out) -- ({p}.out);"
+
+
+def _follower(p):
+    return f"\\draw ({p}.-) -- ++(0,1.2) coordinate ({p}fb) -- ({p}fb -| {p}.out) -- ({p}.out);"
+
+
+def _inverting_stage(p, v):
+    return [
+        f"\\draw ({p}.-) to[R, l_=R1:{v['R1']}] ++(-2.5,0) coordinate ({p}in);",
+        _feedback(p, f"R, l=R2:{v['R2']}"),
+        f"\\draw ({p}.+) -- ++(0,-0.5) node[ground] {{}};",
+    ]
+
+
+def _non_inverting_stage(p, v):
+    return [
+        f"\\draw ({p}.+) -- ++(-2.5,0) coordinate ({p}in);",
+        _feedback(p, f"R, l=R2:{v['R2']}"),
+        f"\\draw ({p}fb) to[R, l_=R1:{v['R1']}] ++(-2,0) node[ground] {{}};",
+    ]
+
+
+def _follower_stage(p, v):
+    return [f"\\draw ({p}.+) -- ++(-2.5,0) coordinate ({p}in);", _follower(p)]
+
+
+def _rc_stage(series, shunt):
+    def stage(p, v):
+        return [
+            f"\\draw ({p}.+) -- ++(-0.5,0) coordinate ({p}n) to[{series.format(**v)}] ++(-2,0) coordinate ({p}in);",
+            f"\\draw ({p}n) to[{shunt.format(**v)}, *-] ++(0,-1.5) node[ground] {{}};",
+            _follower(p),
+        ]
+    return stage
+
+
+def _differentiator_stage(p, v):
+    return [
+        f"\\draw ({p}.-) to[C, l_=C:{v['C']}] ++(-2.5,0) coordinate ({p}in);",
+        _feedback(p, f"R, l=R:{v['R']}"),
+        f"\\draw ({p}.+) -- ++(0,-0.5) node[ground] {{}};",
+    ]
+
+
+def _integrator_stage(p, v):
+    return [
+        f"\\draw ({p}.-) to[R, l_=R:{v['R']}] ++(-2.5,0) coordinate ({p}in);",
+        _feedback(p, f"C, l=C:{v['C']}"),
+        f"\\draw ({p}fb) -- ++(0,1.2) coordinate ({p}rf) to[R, l=Rf:{v['Rf']}] ({p}rf -| {p}.out) -- ({p}fb -| {p}.out);",
+        f"\\draw ({p}.+) -- ++(0,-0.5) node[ground] {{}};",
+    ]
+
+
+def _summer_stage(p, v):
+    return [
+        f"\\draw ({p}.-) -- ++(-0.6,0) coordinate ({p}j);",
+        f"\\draw ({p}j) -- ++(0,0.8) to[R, l=R1:{v['R1']}] ++(-2,0) coordinate ({p}in1);",
+        f"\\draw ({p}j) -- ++(0,-0.8) to[R, l_=R2:{v['R2']}] ++(-2,0) coordinate ({p}in2);",
+        _feedback(p, f"R, l=Rf:{v['Rf']}"),
+        f"\\draw ({p}.+) -- ++(0,-0.5) node[ground] {{}};",
+    ]
+
+
+STAGE_DRAWINGS = {
+    "inverting": _inverting_stage,
+    "non_inverting": _non_inverting_stage,
+    "voltage_follower": _follower_stage,
+    "low_pass": _rc_stage("R, l=R:{R}", "C, l=C:{C}"),
+    "high_pass": _rc_stage("C, l=C:{C}", "R, l=R:{R}"),
+    "differentiator": _differentiator_stage,
+    "integrator": _integrator_stage,
+    "summing": _summer_stage,
+}
+
+
+def _stage_caption(index, stage):
+    targets = stage.targets
+    if "cutoff" in targets:
+        detail = f"$f_c = {targets['cutoff']:.2f}$~Hz"
+    elif "tau" in targets:
+        detail = f"$\\tau = {targets['tau'] * 1e3:.2f}$~ms"
+    elif "gain" in targets:
+        detail = f"$A_v = {targets['gain']:.2f}$"
+    else:
+        detail = ""
+    return f"{index}. {stage.circuit_type}\\\\ {detail}"
+
+
+def _draw_stage(lines, prefix, stage, x, y, caption):
+    lines.append(f"\\begin{{scope}}[shift={{({x:g},{y:g})}}]")
+    lines.append(f"\\draw (0,0) node[op amp] ({prefix}) {{}};")
+    lines += STAGE_DRAWINGS[stage.kind](prefix, format_latex_parameters(stage.components))
+    lines.append(f"\\draw ({prefix}.out) -- ++(0.6,0) coordinate ({prefix}out);")
+    lines.append(f"\\node[align=center, font=\\small] at (0,3.2) {{{caption}}};")
+    lines.append("\\end{scope}")
+
+
+def composition_latex(composition, model=IDEAL):
+    """Tüm katları tek bir circuitikz şemasında birleştiren bağımsız LaTeX belgesi"""
+    lines = []
+    stages = composition.stages
+    if composition.topology == "cascade":
+        for i, stage in enumerate(stages):
+            _draw_stage(lines, f"s{i}", stage, i * STAGE_PITCH, 0, _stage_caption(i + 1, stage))
+        for i in range(len(stages) - 1):
+            lines.append(f"\\draw (s{i}out) -- ++(0.4,0) |- (s{i + 1}in);")
+        lines.append("\\draw (s0in) to[short, -o] ++(-0.6,0) node[left] {Giriş};")
+        last, title_x = f"s{len(stages) - 1}", (len(stages) - 1) * STAGE_PITCH / 2
+    else:
+        for i, stage in enumerate(stages):
+            y = BRANCH_OFFSET * (1 - 2 * i)
+            _draw_stage(lines, f"s{i}", stage, 0, y, _stage_caption(i + 1, stage))
+        last = f"s{len(stages)}"
+        _draw_stage(lines, last, composition.summer, STAGE_PITCH, 0, f"{len(stages) + 1}. Toplayıcı")
+        for i in range(len(stages)):
+            lines.append(f"\\draw (s{i}out) -- ++(0.4,0) |- ({last}in{i + 1});")
+        lines.append(f"\\coordinate (vin) at ({-STAGE_PITCH / 2:g},0);")
+        lines.append("\\draw (s0in) -| (vin) |- (s1in);")
+        lines.append("\\draw (vin) to[short, *-o] ++(-0.6,0) node[left] {Giriş};")
+        title_x = STAGE_PITCH / 2
+    lines.append(f"\\draw ({last}out) to[short, -o] ++(0.6,0) node[right] {{Çıkış}};")
+
+    response = composition.frequency_response(model)
+    corners = ", ".join(_format_frequency(f) for f in response.corner_frequencies())
+    summary = f"Tepe kazanç: {response.peak_db:.1f}~dB" + (f", köşe frekansları: {corners}" if corners else "")
+    title = composition.name.replace("→", "$\\rightarrow$")
+    top = 5.0 + (BRANCH_OFFSET if composition.topology != "cascade" else 0)
+    lines.append(
+        f"\\node[align=center] at ({title_x:g},{top:g}) {{\\textbf{{{title}}}\\\\ {summary}}};"
+    )
+    return "\n".join([
+        "\\documentclass[border=10pt]{standalone}",
+        "\\usepackage{circuitikz}",
+        "\\usepackage{siunitx}",
+        "\\begin{document}",
+        "\\begin{circuitikz}[american voltages]",
+        *(f"    {line}" for line in lines),
+        "\\end{circuitikz}",
+        "\\end{document}",
+    ]) + "\n"
+
+
+def _format_frequency(frequency):
+    if frequency >= 1e3:
+        return f"{frequency / 1e3:.2f}~kHz"
+    return f"{frequency:.2f}~Hz"
@@ -0,0 +1,469 @@
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class OpAmpModel:
+    """Tek kutuplu op-amp modeli; gbw None ise ideal (sonsuz kazançlı) kabul edilir"""
+    name: str
+    gbw: float = None   # Kazanç-bant genişliği çarpımı (Hz)
+    a0: float = 2e5     # Açık çevrim DC kazancı
+    vsat: float = None  # Çıkış doyumu (V); None ise besleme gerilimi
+
+    @property
+    def ideal(self):
+        return self.gbw is None
+
+    def open_loop(self):
+        """A(s) = A0·ωa / (s + ωa) payı ve paydası"""
+        wa = 2 * math.pi * self.gbw / self.a0
+        return np.array([self.a0 * wa]), np.array([1.0, wa])
+
+
+IDEAL = OpAmpModel("ideal")
+UA741 = OpAmpModel("uA741", gbw=1e6, a0=2e5)
+MODELS = {model.name: model for model in (IDEAL, UA741)}
+
+
+@dataclass(frozen=True)
+class FrequencyResponse:
+    """Logaritmik frekans ızgarasında genlik (dB) ve faz (derece)"""
+    frequency: np.ndarray
+    magnitude_db: np.ndarray
+    phase_deg: np.ndarray
+    model: str
+
+    @property
+    def dc_gain_db(self):
+        return float(self.magnitude_db[0])
+
+    @property
+    def peak_db(self):
+        return float(self.magnitude_db.max())
+
+    def corner_frequencies(self, drop_db=10 * math.log10(2), flat_slope_db=1.0):
+        """Genliğin tepe değerinin drop_db altına indiği/çıktığı frekanslar.
+
+        Tepe ızgaranın ucunda ve eğri orada hâlâ flat_slope_db (dB/dekat) üzerinde
+        yükseliyorsa (ör. ideal türev alıcı) tepe ızgara sınırıdır; köşe raporlanmaz.
+        """
+        peak = int(self.magnitude_db.argmax())
+        last = self.magnitude_db.size - 1
+        if last > 0 and peak in (0, last):
+            edge = slice(0, 2) if peak == 0 else slice(last - 1, last + 1)
+            rise = np.diff(self.magnitude_db[edge])[0]
+            run = np.diff(np.log10(self.frequency[edge]))[0]
+            if abs(rise / run) > flat_slope_db:
+                return []
+        level = self.peak_db - drop_db
+        above = self.magnitude_db >= level
+        crossings = np.flatnonzero(above[1:] != above[:-1])
+        if crossings.size == 0:
+            return []
+        m0, m1 = self.magnitude_db[crossings], self.magnitude_db[crossings + 1]
+        f0, f1 = np.log10(self.frequency[crossings]), np.log10(self.frequency[crossings + 1])
+        return (10 ** (f0 + (level - m0) * (f1 - f0) / (m1 - m0))).tolist()
+
+    def to_dict(self):
+        return {
+            "model": self.model,
+            "frequency": self.frequency.tolist(),
+            "magnitude_db": self.magnitude_db.tolist(),
+            "phase_deg": self.phase_deg.tolist(),
+            "corner_frequencies": self.corner_frequencies(),
+        }
+
+
+@dataclass(frozen=True)
+class TransientResponse:
+    """Zaman ekseninde giriş ve çıkış dalga biçimleri"""
+    time: np.ndarray
+    input: np.ndarray
+    output: np.ndarray
+    signal: str
+    model: str
+
+    @property
+    def final_value(self):
+        return float(self.output[-1])
+
+    def to_dict(self):
+        return {
+            "model": self.model,
+            "signal": self.signal,
+            "time": self.time.tolist(),
+            "input": self.input.tolist(),
+            "output": self.output.tolist(),
+        }
+
+
+# --- Transfer fonksiyonları --------------------------------------------------
+#
+# Her devre, ideal sinyal kazancı G(s) ve gürültü kazancı NG(s) = 1 + Zf/Zin olarak
+# tanımlanır. Sonlu kazançlı op-amp için kapalı çevrim H = G · A / (A + NG) olur.
+
+def _ratio(num, den):
+    return np.atleast_1d(np.asarray(num, dtype=float)), np.atleast_1d(np.asarray(den, dtype=float))
+
+
+def _inverting_network(c):
+    return _ratio([-c["R2"]], [c["R1"]]), _ratio([c["R1"] + c["R2"]], [c["R1"]])
+
+
+def _non_inverting_network(c):
+    gain = _ratio([c["R1"] + c["R2"]], [c["R1"]])
+    return gain, gain
+
+
+def _follower_network(c):
+    unity = _ratio([1.0], [1.0])
+    return unity, unity
+
+
+def _low_pass_network(c):
+    # Pasif RC ve arkasında gerilim izleyici
+    return _ratio([1.0], [c["R"] * c["C"], 1.0]), _ratio([1.0], [1.0])
+
+
+def _high_pass_network(c):
+    rc = c["R"] * c["C"]
+    return _ratio([rc, 0.0], [rc, 1.0]), _ratio([1.0], [1.0])
+
+
+def _summing_network(c):
+    # V1 girişinden çıkışa; gürültü kazancı iki giriş direncinin paralelini görür
+    r1, r2, rf = c["R1"], c["R2"], c["Rf"]
+    return _ratio([-rf], [r1]), _ratio([r1 * r2 + rf * (r1 + r2)], [r1 * r2])
+
+
+def _differentiator_network(c):
+    rc = c["R"] * c["C"]
+    return _ratio([-rc, 0.0], [1.0]), _ratio([rc, 1.0], [1.0])
+
+
+def _integrator_network(c):
+    r, rf, cap = c["R"], c["Rf"], c["C"]
+    den = [r * rf * cap, r]
+    return _ratio([-rf], den), _ratio([r * rf * cap, r + rf], den)
+
+
+def _difference_network(c):
+    # Fark girişi (V2 - V1) için, R4/R2 = R3/R1 eşleşmesi varsayılır
+    return _ratio([c["R3"]], [c["R1"]]), _ratio([c["R1"] + c["R3"]], [c["R1"]])
+
+
+NETWORKS = {
+    "inverting": _inverting_network,
+    "non_inverting": _non_inverting_network,
+    "voltage_follower": _follower_network,
+    "low_pass": _low_pass_network,
+    "high_pass": _high_pass_network,
+    "summing": _summing_network,
+    "differentiator": _differentiator_network,
+    "integrator": _integrator_network,
+    "difference": _difference_network,
+}
+
+
+def transfer_function(kind, components, model=IDEAL):
+    """Kapalı çevrim H(s) için (pay, payda) polinom katsayıları (yüksek dereceden başlar)"""
+    network = NETWORKS.get(kind)
+    if network is None:
+        raise ValueError(f"Doğrusal transfer fonksiyonu tanımlı olmayan devre: {kind}")
+    (g_num, g_den), (n_num, n_den) = network(components)
+    if model.ideal:
+        return g_num, g_den
+    a_num, a_den = model.open_loop()
+    num = np.polymul(g_num, np.polymul(a_num, n_den))
+    den = np.polymul(g_den, np.polyadd(np.polymul(a_num, n_den), np.polymul(n_num, a_den)))
+    return num, den
+
+
+def characteristic_frequency(kind, components, targets):
+    """Izgaranın ortalanacağı frekans: kesim frekansı, 1/(2πτ) veya 1 kHz"""
+    if "cutoff" in targets:
+        return targets["cutoff"]
+    if "tau" in targets:
+        return 1 / (2 * math.pi * targets["tau"])
+    return 1e3
+
+
+# --- Frekans cevabı ----------------------------------------------------------
+
+@lru_cache(maxsize=256)
+def _frequency_response(kind, names, values, model, f_start, f_stop, points):
+    num, den = transfer_function(kind, dict(zip(names, values)), model)
+    frequency = np.logspace(math.log10(f_start), math.log10(f_stop), points)
+    s = 2j * math.pi * frequency
+    response = np.polyval(num, s) / np.polyval(den, s)
+    magnitude = 20 * np.log10(np.maximum(np.abs(response), 1e-300))
+    phase = np.degrees(np.unwrap(np.angle(response)))
+    for array in (frequency, magnitude, phase):
+        array.flags.writeable = False
+    return FrequencyResponse(frequency, magnitude, phase, model.name)
+
+
+def frequency_response(result, model=IDEAL, f_start=None, f_stop=None, points_per_decade=50):
+    """DesignResult için Bode genlik/faz eğrisi (tasarım ve model başına önbellekli).
+
+    Izgara verilmezse karakteristik frekansın üç dekat altından üç dekat üstüne uzanır.
+    """
+    f0 = characteristic_frequency(result.kind, result.components, result.targets)
+    f_start = f_start or f0 / 1e3
+    f_stop = f_stop or f0 * 1e3
+    points = max(2, int(round(math.log10(f_stop / f_start) * points_per_decade)) + 1)
+    return _frequency_response(
+        result.kind, result.component_names, result.component_values, model,
+        float(f_start), float(f_stop), points
+    )
+
+
+# --- Geçici rejim ------------------------------------------------------------
+
+def _state_space(num, den):
+    """Denetlenebilir kanonik biçim (A, B, C, D)"""
+    num = np.trim_zeros(num, "f")
+    den = np.trim_zeros(den, "f")
+    if num.size > den.size:
+        raise ValueError("Uygun olmayan transfer fonksiyonu; ideal türev alıcı için sonlu GBW modeli kullanın")
+    num, den = num / den[0], den / den[0]
+    order = den.size - 1
+    num = np.concatenate([np.zeros(order + 1 - num.size), num])
+    d = num[0]
+    a = np.zeros((order, order))
+    if order:
+        a[0, :] = -den[1:]
+        a[1:, :-1] = np.eye(order - 1)
+    b = np.zeros(order)
+    if order:
+        b[0] = 1.0
+    c = num[1:] - d * den[1:]
+    return a, b, c, d
+
+
+def _expm(matrix):
+    """Küçük matrisler için ölçekle-ve-karele Taylor açılımı"""
+    norm = np.linalg.norm(matrix, np.inf)
+    squarings = max(0, int(math.ceil(math.log2(norm))) + 1) if norm > 0.5 else 0
+    scaled = matrix / (2 ** squarings)
+    result = np.eye(matrix.shape[0])
+    term = np.eye(matrix.shape[0])
+    for k in range(1, 16):
+        term = term @ scaled / k
+        result = result + term
+    for _ in range(squarings):
+        result = result @ result
+    return result
+
+
+def _causal_convolve(kernel, signal):
+    """y[k] = Σ_{j<=k} kernel[k-j]·signal[j], FFT ile"""
+    n = signal.size
+    size = 1 << (2 * n - 1).bit_length()
+    return np.fft.ifft(np.fft.fft(kernel, size) * np.fft.fft(signal, size))[:n]
+
+
+def simulate_lti(num, den, time, u):
+    """Sıfır dereceli tutucu ile tam ayrıklaştırılmış durum uzayı benzetimi.
+
+    Özdeğer ayrışımıyla her kip bağımsız birinci derece bir özyinelemeye dönüşür ve
+    tüm zaman adımları tek seferde hesaplanır; kipler ayrışmıyorsa adım adım ilerler.
+    """
+    a, b, c, d = _state_space(num, den)
+    if a.shape[0] == 0:
+        return d * u
+    dt = time[1] - time[0]
+    eigvals, vectors = np.linalg.eig(a)
+    if np.linalg.cond(vectors) < 1e8:
+        mu = np.exp(eigvals * dt)
+        small = np.abs(eigvals * dt) < 1e-12
+        phi = np.where(small, dt, (mu - 1) / np.where(small, 1.0, eigvals))
+        beta = np.linalg.solve(vectors, b) * phi
+        weights = c @ vectors
+        steps = np.arange(u.size)
+        output = np.zeros(u.size)
+        for i in range(eigvals.size):
+            kernel = mu[i] ** steps
+            modal = _causal_convolve(kernel, beta[i] * u)
+            output[1:] += (weights[i] * modal[:-1]).real
+        return output + d * u
+
+    # Tekrarlı kutuplar: ayrık sistem matrisleriyle açık adım
+    order = a.shape[0]
+    augmented = np.zeros((order + 1, order + 1))
+    augmented[:order, :order] = a * dt
+    augmented[:order, order] = b * dt
+    discrete = _expm(augmented)
+    ad, bd = discrete[:order, :order], discrete[:order, order]
+    state = np.zeros(order)
+    output = np.empty(u.size)
+    for k in range(u.size):
+        output[k] = c @ state + d * u[k]
+        state = ad @ state + bd * u[k]
+    return output
+
+
+def _slowest_time_constant(num, den):
+    poles = np.roots(np.trim_zeros(den, "f"))
+    decaying = -poles.real[poles.real < 0]
+    return 1 / decaying.min() if decaying.size else None
+
+
+def _schmitt_output(u, vut, vlt, vsat):
+    """Tersleyen Schmitt tetikleyici: eşik geçişlerinde durum değiştirir (vektörel ileri doldurma)"""
+    state = np.where(u >= vut, -1.0, np.where(u <= vlt, 1.0, 0.0))
+    if state[0] == 0:
+        state[0] = 1.0
+    last = np.maximum.accumulate(np.where(state != 0, np.arange(u.size), 0))
+    return vsat * state[last]
+
+
+@lru_cache(maxsize=256)
+def _transient(kind, names, values, target_names, target_values, model, signal, points, periods):
+    components = dict(zip(names, values))
+    targets = dict(zip(target_names, target_values))
+    f0 = characteristic_frequency(kind, components, targets)
+
+    if kind == "schmitt":
+        num = den = None
+        amplitude = 1.5 * targets["vut"]
+    else:
+        num, den = transfer_function(kind, components, model)
+        amplitude = 1.0
+
+    if signal == "sine":
+        time = np.linspace(0.0, periods / f0, points)
+        u = amplitude * np.sin(2 * math.pi * f0 * time)
+    elif signal == "step":
+        tau = _slowest_time_constant(num, den) if num is not None else None
+        time = np.linspace(0.0, 8 * tau if tau else 1 / f0, points)
+        u = np.full(points, amplitude)
+    else:
+        raise ValueError(f"Bilinmeyen giriş sinyali: {signal}")
+
+    if kind == "schmitt":
+        vsat = model.vsat or components["Vcc"]
+        output = _schmitt_output(u, targets["vut"], targets["vlt"], vsat)
+    else:
+        output = simulate_lti(num, den, time, u)
+        if model.vsat is not None:
+            output = np.clip(output, -model.vsat, model.vsat)
+
+    for array in (time, u, output):
+        array.flags.writeable = False
+    return TransientResponse(time, u, output, signal, model.name)
+
+
+def transient_response(result, signal="step", model=UA741, points=1000, periods=5):
+    """Basamak veya sinüs girişine zaman cevabı (tasarım, model ve sinyal başına önbellekli).
+
+    Sinüs girişi devrenin karakteristik frekansındadır; ideal türev alıcının basamak
+    cevabı tanımsız olduğundan varsayılan model sonlu GBW'lidir.
+    """
+    return _transient(
+        result.kind, result.component_names, result.component_values,
+        result.target_names, result.target_values, model, signal, int(points), int(periods)
+    )
+
+
+def has_time_response(result, model=UA741):
+    """Geçici rejim hesaplanabilir mi; uygun olmayan H(s) (ideal türev alıcı) için False"""
+    if result.kind not in NETWORKS:
+        return True
+    num, den = transfer_function(result.kind, result.components, model)
+    return np.trim_zeros(num, "f").size <= np.trim_zeros(den, "f").size
+
+
+def analyze(result, model=UA741):
+    """Bir tasarım için frekans ve zaman analizlerinin JSON'a yazılabilir özeti.
+
+    Geçici rejimi tanımsız tasarımlarda (ideal türev alıcı) step_final_value None olur.
+    """
+    summary = {"kind": result.kind, "model": model.name}
+    if result.kind in NETWORKS:
+        ideal = frequency_response(result, IDEAL)
+        real = frequency_response(result, model)
+        summary["dc_gain_db"] = real.dc_gain_db
+        summary["corner_frequencies"] = {"ideal": ideal.corner_frequencies(), model.name: real.corner_frequencies()}
+        summary["step_final_value"] = (
+            transient_response(result, "step", model).final_value if has_time_response(result, model) else None
+        )
+    else:
+        summary["sine_output_levels"] = sorted(set(transient_response(result, "sine", model).output.tolist()))
+    return summary
+
+
+def clear_cache():
+    _frequency_response.cache_clear()
+    _transient.cache_clear()
+    pgfplots_figures.cache_clear()
+
+
+# --- LaTeX (pgfplots) çıktısı ------------------------------------------------
+
+def _coordinates(x, y, limit=150):
+    index = np.unique(np.linspace(0, x.size - 1, min(limit, x.size)).astype(int))
+    return " ".join(f"({x[i]:.5g},{y[i]:.5g})" for i in index)
+
+
+def _axis(kind, options, plots):
+    body = "\n".join(f"    \\addplot[{style}] coordinates {{{coords}}};" for style, coords in plots)
+    return f"\\begin{{tikzpicture}}\n  \\begin{{{kind}}}[{options}]\n{body}\n  \\end{{{kind}}}\n\\end{{tikzpicture}}"
+
+
+AXIS_STYLE = "width=7cm, height=4.5cm, grid=both, title style={font=\\small}, label style={font=\\small}"
+
+
+@lru_cache(maxsize=128)
+def pgfplots_figures(result, model=UA741):
+    """Bode genlik/faz ve geçici rejim grafikleri için pgfplots kodu (geçici rejim tanımlıysa)"""
+    figures = []
+    if result.kind in NETWORKS:
+        ideal = frequency_response(result, IDEAL)
+        real = frequency_response(result, model)
+        legend = f"legend entries={{ideal,{model.name}}}, legend pos=south west, legend style={{font=\\tiny}}"
+        figures.append(_axis("semilogxaxis", f"{AXIS_STYLE}, xlabel={{$f$ (Hz)}}, ylabel={{$|H|$ (dB)}}, {legend}", [
+            ("thick, blue", _coordinates(ideal.frequency, ideal.magnitude_db)),
+            ("thick, red, dashed", _coordinates(real.frequency, real.magnitude_db)),
+        ]))
+        figures.append(_axis("semilogxaxis", f"{AXIS_STYLE}, xlabel={{$f$ (Hz)}}, ylabel={{Faz ($^\\circ$)}}", [
+            ("thick, blue", _coordinates(ideal.frequency, ideal.phase_deg)),
+            ("thick, red, dashed", _coordinates(real.frequency, real.phase_deg)),
+        ]))
+        signal = "sine" if result.kind in ("differentiator", "integrator") else "step"
+    else:
+        signal = "sine"
+    if not has_time_response(result, model):
+        return "\n\\quad\n".join(figures)
+
+    response = transient_response(result, signal, model)
+    figures.append(_axis(
+        "axis",
+        f"{AXIS_STYLE}, xlabel={{$t$ (s)}}, ylabel={{$V$}}, legend entries={{$V_{{in}}$,$V_{{out}}$}}, "
+        "legend pos=outer north east, legend style={font=\\tiny}, scaled x ticks=true",
+        [
+            ("gray, dashed", _coordinates(response.time, response.input)),
+            ("thick, blue", _coordinates(response.time, response.output)),
+        ]
+    ))
+    return "\n\\quad\n".join(figures)
+
+
+def add_analysis_plots(latex_code, figures):
+    """Grafikleri standalone belgede devre şemasının altına yerleştirir"""
+    begin = latex_code.find("\\begin{document}")
+    end = latex_code.rfind("\\end{document}")
+    if begin < 0 or end < begin:
+        return latex_code
+    preamble = latex_code[:begin]
+    if "pgfplots" not in preamble:
+        preamble += "\\usepackage{pgfplots}\n\\pgfplotsset{compat=1.16}\n"
+    body_start = begin + len("\\begin{document}")
+    body = latex_code[body_start:end].strip("\n")
+    return (
+        f"{preamble}\\begin{{document}}\n\\begin{{tabular}}{{@{{}}c@{{}}}}\n{body}\n\\\\[1em]\n"
+        f"{figures}\n\\end{{tabular}}\n{latex_code[end:]}"
+    )
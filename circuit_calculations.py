@@ -0,0 +1,220 @@
+import math
+from dataclasses import dataclass
+
+from design_result import DesignResult
+from quantity import parse_numeric_value
+
+DEFAULT_CONFIG = {
+    "default_resistor": "10k",
+    "default_capacitor": "1u",
+    "default_voltage": "15",
+    "default_gain": "10",
+    "default_cutoff": "1000",
+    "default_time_constant": "1ms",
+}
+
+
+def normalize_turkish_text(text):
+    """Türkçe karakterleri standartlaştır ve küçük harfe çevir"""
+    if not text:
+        return ""
+    # 'İ'.lower() noktalı iki karakter üretir, önce düz 'i'ye çevrilir
+    return text.replace('İ', 'i').lower()
+
+
+ASCII_FOLD = str.maketrans("ışğüöç", "isguoc")
+
+
+def fold_turkish_text(text):
+    """Karşılaştırma anahtarı: küçük harf, Türkçe karakterler ASCII, tek boşluk"""
+    return " ".join(normalize_turkish_text(text).translate(ASCII_FOLD).split())
+
+
+@dataclass(frozen=True)
+class InputSpec:
+    """Bir devre hesaplamasının tek girdi alanı"""
+    name: str
+    prompt: str
+    default: object  # config -> varsayılan değer metni
+    unit: str = ""  # beklenen birim; SI önekli girdiler (ör. "1ms", "2kHz") kabul edilir
+
+
+@dataclass(frozen=True)
+class CircuitSpec:
+    """Desteklenen bir devre tipinin hesaplama tanımı"""
+    kind: str
+    circuit_type: str
+    search_terms: tuple
+    inputs: tuple
+    design: object
+    display_formula: str = ""
+
+
+# --- Devre hesaplamaları -----------------------------------------------------
+
+def design_inverting(gain, r1):
+    return {"R1": r1, "R2": r1 * abs(gain)}, {"gain": -gain}, r"-\frac{R_2}{R_1}"
+
+
+def design_non_inverting(gain, r1):
+    if gain < 1:
+        raise ValueError("Terslemeyen yükselteç kazancı 1'den küçük olamaz")
+    return {"R1": r1, "R2": r1 * (gain - 1)}, {"gain": gain}, r"1 + \frac{R_2}{R_1}"
+
+
+def design_rc_filter(cutoff, c):
+    if cutoff <= 0:
+        raise ValueError("Kesim frekansı pozitif olmalı")
+    return {"C": c, "R": 1 / (2 * math.pi * cutoff * c)}, {"cutoff": cutoff}, None
+
+
+def design_summing(gain1, gain2, rf):
+    if gain1 == 0 or gain2 == 0:
+        raise ValueError("Toplayıcı giriş kazançları sıfır olamaz")
+    components = {"Rf": rf, "R1": rf / abs(gain1), "R2": rf / abs(gain2)}
+    formula = r"-\left(\frac{R_f}{R_1}V_1 + \frac{R_f}{R_2}V_2\right)"
+    return components, {"gain1": -abs(gain1), "gain2": -abs(gain2)}, formula
+
+
+def design_schmitt(vut, vcc, r1):
+    if not 0 < vut < vcc:
+        raise ValueError(f"Üst eşik 0 ile Vcc ({vcc:g} V) arasında olmalı")
+    return {"Vcc": vcc, "R1": r1, "R2": r1 * (vut / (vcc - vut))}, {"vut": vut, "vlt": -vut}, None
+
+
+def design_voltage_follower():
+    return {}, {"gain": 1.0}, "1"
+
+
+def design_differentiator(tau, r):
+    if tau <= 0:
+        raise ValueError("Zaman sabiti pozitif olmalı")
+    return {"R": r, "C": tau / r}, {"tau": tau}, r"V_{out} = -RC\frac{dV_{in}}{dt}"
+
+
+def design_integrator(tau, r):
+    if tau <= 0:
+        raise ValueError("Zaman sabiti pozitif olmalı")
+    # Rf, DC ofset için
+    return {"R": r, "C": tau / r, "Rf": r * 10}, {"tau": tau}, r"V_{out} = -\frac{1}{RC}\int V_{in}dt"
+
+
+def design_difference(gain, r1):
+    if gain <= 0:
+        raise ValueError("Fark yükselteci kazancı pozitif olmalı")
+    r3 = r1 * gain
+    return {"R1": r1, "R3": r3, "R2": r1, "R4": r3}, {"gain": gain}, r"\frac{R3}{R1}"
+
+
+def _gain_input():
+    return InputSpec("gain", "İstenen kazanç değeri [{default}x]: ", lambda c: c["default_gain"], unit="x")
+
+
+def _tau_input():
+    return InputSpec("tau", "İstenen zaman sabiti (RC) [{default}]: ", lambda c: c["default_time_constant"], unit="s")
+
+
+def _cutoff_input():
+    return InputSpec("cutoff", "İstenen kesim frekansı [{default} Hz]: ", lambda c: c["default_cutoff"], unit="Hz")
+
+
+CIRCUIT_SPECS = (
+    CircuitSpec(
+        "inverting", "Tersleyici Yükselteç", ("tersleyici",), (_gain_input(),),
+        lambda v, c: design_inverting(v["gain"], c["R"]), "A_v = -R₂/R₁"
+    ),
+    CircuitSpec(
+        "non_inverting", "Terslemeyen Yükselteç", ("terslemeyen",), (_gain_input(),),
+        lambda v, c: design_non_inverting(v["gain"], c["R"]), "A_v = 1 + R₂/R₁"
+    ),
+    CircuitSpec(
+        "low_pass", "Alçak Geçiren Filtre", ("alçak geçiren filtre",), (_cutoff_input(),),
+        lambda v, c: design_rc_filter(v["cutoff"], c["C"]), "f_c = 1/(2πRC)"
+    ),
+    CircuitSpec(
+        "high_pass", "Yüksek Geçiren Filtre", ("yüksek geçiren filtre",), (_cutoff_input(),),
+        lambda v, c: design_rc_filter(v["cutoff"], c["C"]), "f_c = 1/(2πRC)"
+    ),
+    CircuitSpec(
+        "summing", "Toplayıcı", ("toplayıcı",),
+        (
+            InputSpec("gain1", "Birinci giriş için kazanç [{default}]: ", lambda c: f"-{c['default_gain']}", unit="x"),
+            InputSpec("gain2", "İkinci giriş için kazanç [{default}]: ", lambda c: f"-{c['default_gain']}", unit="x"),
+        ),
+        lambda v, c: design_summing(v["gain1"], v["gain2"], c["R"]), "V_out = -(R_f/R₁)V₁ - (R_f/R₂)V₂"
+    ),
+    CircuitSpec(
+        "schmitt", "Schmitt Trigger", ("schmitt",),
+        (InputSpec("vut", "İstenen üst eşik değeri [{default} V]: ", lambda c: "5", unit="V"),),
+        lambda v, c: design_schmitt(v["vut"], c["V"], c["R"]), ""
+    ),
+    CircuitSpec(
+        "voltage_follower", "Gerilim İzleyici", ("gerilim izleyici",), (),
+        lambda v, c: design_voltage_follower(), "V_out = V_in"
+    ),
+    CircuitSpec(
+        "differentiator", "Türev Alıcı", ("türev alıcı",), (_tau_input(),),
+        lambda v, c: design_differentiator(v["tau"], c["R"]), "V_out = -RC(dV_in/dt)"
+    ),
+    CircuitSpec(
+        "integrator", "Integral Alıcı", ("integral alıcı",), (_tau_input(),),
+        lambda v, c: design_integrator(v["tau"], c["R"]), "V_out = -(1/RC)∫V_in dt"
+    ),
+    CircuitSpec(
+        "difference", "Fark Yükselteci", ("fark yükselteci",), (_gain_input(),),
+        lambda v, c: design_difference(v["gain"], c["R"]), "A_v = R₃/R₁"
+    ),
+)
+
+SPECS_BY_KIND = {spec.kind: spec for spec in CIRCUIT_SPECS}
+FORMULA_KEYS = {"differentiator": "Formula", "integrator": "Formula"}
+
+
+def find_circuit_spec(circuit_type):
+    """Devre tipi adını (Türkçe karakter duyarsız) hesaplama tanımına eşler"""
+    if circuit_type in SPECS_BY_KIND:
+        return SPECS_BY_KIND[circuit_type]
+    normalized = normalize_turkish_text(circuit_type)
+    for spec in CIRCUIT_SPECS:
+        if any(normalize_turkish_text(term) in normalized for term in spec.search_terms):
+            return spec
+    return None
+
+
+def parse_input(input_spec, value):
+    return parse_numeric_value(value, input_spec.unit)
+
+
+def calculate(circuit_type, spec=None, config=None):
+    """Devre tipi ve girdi sözlüğünden DesignResult üretir; girdi/çıktı yan etkisi yoktur.
+
+    Eksik girdiler yapılandırmadaki varsayılanlarla doldurulur.
+    Bilinmeyen devre tipi veya geçersiz değerler için ValueError fırlatır.
+    """
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    spec = spec or {}
+    circuit = find_circuit_spec(circuit_type)
+    if circuit is None:
+        raise ValueError(f"Hesaplaması tanımlı olmayan devre tipi: {circuit_type}")
+
+    values = {}
+    for input_spec in circuit.inputs:
+        raw = spec.get(input_spec.name)
+        if raw is None or raw == "":
+            raw = input_spec.default(config)
+        values[input_spec.name] = parse_input(input_spec, raw)
+
+    defaults = {
+        "R": parse_numeric_value(config["default_resistor"]),
+        "C": parse_numeric_value(config["default_capacitor"]),
+        "V": parse_numeric_value(config["default_voltage"]),
+    }
+    components, targets, formula = circuit.design(values, defaults)
+    return DesignResult(
+        circuit_type=circuit_type,
+        kind=circuit.kind,
+        components=components,
+        targets=targets,
+        formula=formula,
+        formula_key=FORMULA_KEYS.get(circuit.kind, "GainFormula"),
+    )
@@ -0,0 +1,419 @@
+"""OpAmp devre tasarım sistemi için etkileşimsiz komut satırı arayüzü.
+
+    python cli.py design "kazancı 10 olan terslemeyen yükselteç" --compile --no-open
+    python cli.py match "alçak geçiren filtre 2 kHz" "schmitt trigger"
+    python cli.py sweep "Alçak Geçiren Filtre" --param cutoff --range 100:10k:5 --log --jobs 4
+    python cli.py compile latex_codes/*.tex --jobs 4 --no-open
+    python cli.py stream --jobs 8 --compile < istekler.ndjson > sonuclar.ndjson
+    python cli.py bench --skip-compile --sizes 1000
+
+Sonuçlar stdout'a JSON (varsayılan), NDJSON (--format ndjson) veya okunaklı metin
+olarak yazılır; tasarımcının ilerleme ve uyarı mesajları stderr'e gider. Ağır
+modüller (tasarımcı, NLP modeli) yalnızca ihtiyaç duyan alt komutta yüklenir.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+FORMATS = ("json", "ndjson", "text")
+
+
+def parse_assignments(items):
+    """'gain=10' / 'cutoff=2kHz' biçimindeki argümanları ad → metin sözlüğüne çevirir"""
+    parsed = {}
+    for item in items or []:
+        key, _, value = item.partition("=")
+        if not key or not value:
+            raise ValueError(f"Geçersiz atama: {item}")
+        parsed[key.strip()] = value.strip()
+    return parsed
+
+
+def sweep_values(values=None, span=None, log=False):
+    """'1,2,5' listesini veya 'başlangıç:bitiş:adet' aralığını sayı listesine çevirir"""
+    from quantity import parse_numeric_value
+
+    if values:
+        return [parse_numeric_value(value) for value in values.split(",") if value.strip()]
+    parts = span.split(":")
+    if len(parts) != 3:
+        raise ValueError(f"Aralık 'başlangıç:bitiş:adet' biçiminde olmalı: {span}")
+    start, stop, count = parse_numeric_value(parts[0]), parse_numeric_value(parts[1]), int(parts[2])
+    if count < 1:
+        raise ValueError("Adet en az 1 olmalı")
+    if count == 1:
+        return [start]
+    if log:
+        if start <= 0 or stop <= 0:
+            raise ValueError("Logaritmik aralık pozitif olmalı")
+        ratio = (stop / start) ** (1 / (count - 1))
+        return [start * ratio ** i for i in range(count)]
+    step = (stop - start) / (count - 1)
+    return [start + step * i for i in range(count)]
+
+
+def load_calculation_config(path="config.json"):
+    """Hesaplamayı ve op-amp kontrolünü etkileyen ayarlar (tasarımcıyı ve NLP modelini yüklemeden)"""
+    from circuit_calculations import DEFAULT_CONFIG
+    from parts import CHECK_DEFAULTS, PARTS_FILE
+
+    defaults = {**DEFAULT_CONFIG, **CHECK_DEFAULTS, "parts_file": PARTS_FILE}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    except FileNotFoundError:
+        overrides = {}
+    return {**defaults, **{key: value for key, value in overrides.items() if key in defaults}}
+
+
+# Seride bir grup bu kadar noktayla sınırlıdır; kayıtlar grup grup akar
+SWEEP_CHUNK = 256
+
+
+def _sweep_chunk(job):
+    """Bir grup noktayı hesaplar; op-amp kontrolü grubun tamamı için tek vektörel adımda yapılır"""
+    circuit_type, points, config, model_name, top = job
+    from circuit_calculations import calculate
+
+    records, results = [], []
+    for values in points:
+        record = {"circuit_type": circuit_type, "values": values}
+        try:
+            result = calculate(circuit_type, values, config)
+            record["result"] = result.to_json()
+            if model_name:
+                from circuit_analysis import MODELS, analyze
+                record["analysis"] = analyze(result, MODELS[model_name])
+        except ValueError as e:
+            records.append({**record, "error": str(e)})
+            continue
+        except Exception as e:
+            # Beklenmeyen hata da yalnızca bu noktanın kaydı olur; tarama sürer
+            records.append({**record, "error": f"{type(e).__name__}: {e}"})
+            continue
+        records.append(record)
+        results.append((record, result))
+    if top != 0 and results and config.get("parts_file"):
+        from parts import check_designs, load_library
+
+        checks = check_designs([result for _, result in results], load_library(config["parts_file"]), config, top)
+        for (record, _), check in zip(results, checks):
+            record["opamps"] = check
+    return records
+
+
+def run_sweep(circuit_type, name, points, fixed=None, config=None, model_name=None, jobs=1, top=None):
+    """Tek girdiyi taratır; kayıtları girdi sırasıyla, hazır oldukça üretir.
+
+    Noktalar gruplara bölünür ve her grup (sürecinde) op-amp kütüphanesine karşı
+    tek seferde kontrol edilir; top 0 ise kontrol yapılmaz.
+    """
+    points = [{**(fixed or {}), name: value} for value in points]
+    size = SWEEP_CHUNK if jobs <= 1 else max(1, min(SWEEP_CHUNK, len(points) // (jobs * 4)))
+    chunks = [
+        (circuit_type, points[start:start + size], config or {}, model_name, top)
+        for start in range(0, len(points), size)
+    ]
+    if jobs <= 1 or len(chunks) <= 1:
+        for records in map(_sweep_chunk, chunks):
+            yield from records
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for records in pool.map(_sweep_chunk, chunks):
+            yield from records
+
+
+# --- Çıktı -------------------------------------------------------------------
+
+def text_lines(record):
+    if "error" in record:
+        return [f"HATA: {record['error']}"]
+    lines = []
+    if "result" in record:
+        from design_result import DesignResult
+
+        result = record["result"]
+        lines.append(f"[{result['circuit_type']}]")
+        design = DesignResult(result["circuit_type"], result["kind"], result["components"], result["targets"], result["formula"])
+        lines += [f"  {line}" for line in design.summary_lines()]
+    elif "stages" in record:
+        lines.append(f"[{record['name']}]")
+    elif "circuit_type" in record:
+        lines.append(f"[{record['circuit_type']}]")
+    for key in ("matched_input", "pdf_path", "svg_path", "source"):
+        if record.get(key):
+            lines.append(f"  {key}: {record[key]}")
+    if record.get("opamps"):
+        parts = record["opamps"]["parts"]
+        lines.append("  op-amp: " + (", ".join(f"{item['part']} ({item['margin']:g})" for item in parts) or "uygun parça yok"))
+    if record.get("values"):
+        lines.append("  girdiler: " + ", ".join(f"{k}={v}" for k, v in record["values"].items()))
+    return lines
+
+
+class Output:
+    """Kayıtları seçilen biçimde stdout'a yazar; json biçimi için sonda tek belge üretir"""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.format = fmt
+        self.records = []
+        self.failed = False
+
+    def emit(self, record):
+        self.failed = self.failed or "error" in record or record.get("success") is False
+        if self.format == "ndjson":
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.stream.flush()
+        elif self.format == "text":
+            self.stream.write("\n".join(text_lines(record)) + "\n")
+            self.stream.flush()
+        else:
+            self.records.append(record)
+
+    def close(self, single=False):
+        if self.format == "json":
+            document = self.records[0] if single and len(self.records) == 1 else self.records
+            json.dump(document, self.stream, ensure_ascii=False, indent=2)
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+# --- Alt komutlar ------------------------------------------------------------
+
+def make_designer(args):
+    from anakod5 import CircuitDesigner
+
+    designer = CircuitDesigner()
+    if getattr(args, "output_dir", None):
+        designer.config["output_dir"] = args.output_dir
+        designer.ensure_directories()
+    return designer
+
+
+def design_options(args):
+    from pipeline import DesignOptions
+
+    return DesignOptions(
+        analysis_model=args.model if args.analysis else None,
+        latex=args.latex,
+        svg=getattr(args, "svg", False),
+        compile=args.compile,
+        open_result=not getattr(args, "no_open", True),
+    )
+
+
+def cmd_design(args, output):
+    from pipeline import design_record
+
+    try:
+        explicit = parse_assignments(args.value)
+    except ValueError as e:
+        return output.emit({"error": str(e)})
+    designer = make_designer(args)
+    try:
+        output.emit(design_record(designer, args.request, args.circuit, explicit, design_options(args)))
+    except ValueError as e:
+        output.emit({"request": args.request, "error": str(e)})
+
+
+def cmd_stream(args, output):
+    from pipeline import run_stream
+
+    designer = make_designer(args)
+    source = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    with source:
+        for record in run_stream(designer, source, design_options(args), max(1, args.jobs), args.ordered):
+            output.emit(record)
+
+
+def cmd_match(args, output):
+    designer = make_designer(args)
+    for request in args.requests:
+        circuit, query = designer.match_query(request)
+        if circuit is None:
+            output.emit({"request": request, "error": "Eşleşen devre bulunamadı"})
+            continue
+        values, unused = designer.extract_inputs(circuit["circuit_type"], query)
+        output.emit({
+            "request": request,
+            "circuit_type": circuit["circuit_type"],
+            "matched_input": circuit.get("input"),
+            "values": values,
+            "unused": [{"value": item.value, "unit": item.unit} for item in unused],
+        })
+
+
+def cmd_sweep(args, output):
+    from circuit_calculations import find_circuit_spec
+    from pipeline import unknown_inputs
+
+    spec = find_circuit_spec(args.circuit)
+    if spec is None:
+        return output.emit({"error": f"Bilinmeyen devre tipi: {args.circuit}"})
+    names = [item.name for item in spec.inputs]
+    if args.param not in names:
+        return output.emit({"error": f"{spec.circuit_type} girdileri: {', '.join(names) or '-'}"})
+    try:
+        points = sweep_values(args.values, args.range, args.log)
+        fixed = parse_assignments(args.value)
+    except ValueError as e:
+        return output.emit({"error": str(e)})
+    unknown = unknown_inputs(spec.circuit_type, fixed)
+    if unknown:
+        return output.emit({"error": unknown})
+    config = load_calculation_config()
+    if args.parts:
+        config["parts_file"] = args.parts
+    try:
+        if args.top != 0 and config["parts_file"]:
+            from parts import load_library
+            load_library(config["parts_file"])
+    except (OSError, ValueError, KeyError) as e:
+        return output.emit({"error": f"Op-amp kütüphanesi okunamadı: {e}"})
+    model_name = args.model if args.analysis else None
+    for record in run_sweep(
+        spec.circuit_type, args.param, points, fixed, config, model_name, args.jobs, args.top
+    ):
+        output.emit(record)
+
+
+def cmd_compile(args, output):
+    from pathlib import Path
+    from concurrent.futures import ThreadPoolExecutor
+
+    from artifacts import publish_text
+    from latex_validator import validate_latex
+
+    designer = make_designer(args)
+    output_dir = Path(designer.config["output_dir"])
+
+    def compile_file(source):
+        path = Path(source)
+        record = {"source": source}
+        try:
+            latex_code = sys.stdin.read() if source == "-" else path.read_text(encoding="utf-8")
+        except OSError as e:
+            return {**record, "success": False, "error": str(e)}
+        validation = validate_latex(latex_code)
+        if not validation.ok:
+            return {**record, "success": False, "error": validation.summary()}
+        name = "stdin" if source == "-" else path.stem
+        artifact, error = designer.compile_document(latex_code)
+        if artifact is None:
+            return {**record, "success": False, "error": error}
+        pdf_path = output_dir / f"{name}.pdf"
+        designer.get_artifacts().publish(artifact, pdf_path)
+        if source == "-":
+            publish_text(output_dir / f"{name}.tex", latex_code)
+        return {**record, "success": True, "pdf_path": str(pdf_path)}
+
+    # pdflatex ayrı bir süreçtir; iş parçacıkları yalnızca bekler
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for record in pool.map(compile_file, args.files):
+            output.emit(record)
+            if record["success"] and not args.no_open:
+                designer.open_pdf(record["pdf_path"])
+
+
+def cmd_bench(args, output):
+    import benchmark
+
+    # Eşik aşımında benchmark 1 döndürür; çıkış kodu olarak aktarılır
+    output.failed = bool(benchmark.main(args.bench_args))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="OpAmp devre tasarım sistemi komut satırı arayüzü")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="Çıktı biçimi (varsayılan: sweep için ndjson, diğerleri için json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    design = commands.add_parser("design", help="Tek bir isteği tasarla (eşleştirme + hesaplama + isteğe bağlı derleme)")
+    design.add_argument("request", nargs="?", help="Doğal dil isteği; çok katlı istekler '->' ile ayrılır")
+    design.add_argument("--circuit", help="Eşleştirme yapmadan kullanılacak devre tipi")
+    design.add_argument("--value", action="append", metavar="AD=DEĞER", help="Hesaplama girdisi, ör. gain=10 (sorgudakini ezer)")
+    design.add_argument("--analysis", action="store_true", help="Frekans/zaman analizi özetini ekle")
+    design.add_argument("--model", default="uA741", help="Analiz op-amp modeli (--analysis ile)")
+    design.add_argument("--latex", action="store_true", help="Üretilen LaTeX kodunu çıktıya ekle")
+    design.add_argument("--svg", action="store_true", help="SVG şema yaz")
+    design.add_argument("--compile", action="store_true", help="PDF derle")
+    design.add_argument("--no-open", action="store_true", help="Derlenen PDF'i açma")
+    design.add_argument("--output-dir")
+    design.set_defaults(handler=cmd_design)
+
+    match = commands.add_parser("match", help="İstekleri devre tiplerine eşle ve değerleri çıkar")
+    match.add_argument("requests", nargs="+")
+    match.set_defaults(handler=cmd_match)
+
+    stream = commands.add_parser(
+        "stream", help="stdin'den NDJSON istekleri okuyup sonuçları bittikçe NDJSON olarak yaz"
+    )
+    stream.add_argument("--input", default="-", help="İstek dosyası (varsayılan: stdin)")
+    stream.add_argument("--jobs", type=int, default=4, help="Aynı anda işlenen en fazla istek")
+    stream.add_argument("--ordered", action="store_true", help="Sonuçları girdi sırasıyla yaz")
+    stream.add_argument("--analysis", action="store_true")
+    stream.add_argument("--model", default="uA741")
+    stream.add_argument("--latex", action="store_true")
+    stream.add_argument("--compile", action="store_true")
+    stream.add_argument("--output-dir")
+    stream.set_defaults(handler=cmd_stream)
+
+    sweep = commands.add_parser("sweep", help="Bir girdiyi taratarak tasarımları üret")
+    sweep.add_argument("circuit", help="Devre tipi")
+    sweep.add_argument("--param", required=True, help="Taratılacak girdi (ör. gain, cutoff)")
+    points = sweep.add_mutually_exclusive_group(required=True)
+    points.add_argument("--values", help="Virgülle ayrılmış değerler, ör. 1,2,5,10 (negatifler için --values=-1,-2)")
+    points.add_argument("--range", help="başlangıç:bitiş:adet, ör. 100:10k:21")
+    sweep.add_argument("--log", action="store_true", help="Aralığı logaritmik böl")
+    sweep.add_argument("--value", action="append", metavar="AD=DEĞER", help="Sabit diğer girdiler")
+    sweep.add_argument("--analysis", action="store_true")
+    sweep.add_argument("--model", default="uA741")
+    sweep.add_argument("--jobs", type=int, default=1, help="Paralel süreç sayısı")
+    sweep.add_argument("--top", type=int, help="Nokta başına önerilen op-amp sayısı (0: kontrol yok)")
+    sweep.add_argument("--parts", help="Op-amp kütüphanesi (varsayılan: config parts_file)")
+    sweep.set_defaults(handler=cmd_sweep)
+
+    compile_ = commands.add_parser("compile", help="LaTeX dosyalarını paylaşılan depo üzerinden derle")
+    compile_.add_argument("files", nargs="+", help="Derlenecek .tex dosyaları; '-' stdin'den okur")
+    compile_.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Eşzamanlı pdflatex sayısı")
+    compile_.add_argument("--no-open", action="store_true")
+    compile_.add_argument("--output-dir")
+    compile_.set_defaults(handler=cmd_compile)
+
+    bench = commands.add_parser("bench", help="benchmark.py'yi çalıştır (kalan argümanlar ona aktarılır)")
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    from instrumentation import configure_from_argv
+
+    parser = build_parser()
+    args, extra = parser.parse_known_args(configure_from_argv(argv))
+    if args.command == "bench":
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"tanınmayan argümanlar: {' '.join(extra)}")
+    if getattr(args, "analysis", False):
+        # Model adları numpy'ı yükleyen circuit_analysis'te; yalnızca analiz istenince bakılır
+        from circuit_analysis import MODELS
+
+        if args.model not in MODELS:
+            parser.error(f"--model: geçersiz seçim: {args.model!r} (seçenekler: {', '.join(sorted(MODELS))})")
+    fmt = args.format or ("ndjson" if args.command in ("sweep", "stream") else "json")
+    output = Output(sys.stdout, fmt)
+    # Tasarımcının print çıktıları makine okunur sonucu bozmasın
+    with contextlib.redirect_stdout(sys.stderr):
+        args.handler(args, output)
+    if args.command != "bench":
+        output.close(single=args.command == "design")
+    return 1 if output.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from circuit_calculations import CIRCUIT_SPECS, fold_turkish_text as fold
+from extraction import analyze_query
+from tfidf import Vectorizer, column_scores, csr_to_csc, load_npz, save_npz
+
+INDEX_FORMAT = 3  # 2: "İ" ön işlemede düz "i" olur; 3: tek index.npz, sütun biçimli parçalar
+MATRIX_FILE = "index.npz"
+REQUIRED_FIELDS = {"input": str, "circuit_type": str}
+OPTIONAL_FIELDS = {"parameters": dict, "output": str}
+
+# Datasette bulunan ama tek katlı hesaplayıcısı olmayan devre tipleri
+# (band filtreleri cascade.py ile çok katlı olarak tasarlanır)
+EXTRA_CIRCUIT_TYPES = (
+    "Karşılaştırıcı", "Çıkartıcı", "Entegre Filtre", "Diferansiyel Yükselteç",
+    "Band Geçiren Filtre", "Band Durduran Filtre",
+)
+CIRCUIT_TYPES = tuple(spec.circuit_type for spec in CIRCUIT_SPECS) + EXTRA_CIRCUIT_TYPES
+# Yazım farkları (Türev Alici, İntegral Alıcı) katlama ile, farklı adlandırmalar burada eşlenir
+ALIASES = {
+    "Fark Yükselteç": "Fark Yükselteci",
+    "Band Durduran": "Band Durduran Filtre",
+    "Gerilim Takipçi": "Gerilim İzleyici",
+    "Gerilim Karşılaştırıcı": "Karşılaştırıcı",
+}
+
+CANONICAL_TYPES = {fold(name): name for name in CIRCUIT_TYPES}
+CANONICAL_TYPES.update({fold(alias): name for alias, name in ALIASES.items()})
+
+
+def canonical_circuit_type(circuit_type):
+    return CANONICAL_TYPES.get(fold(circuit_type))
+
+
+@dataclass
+class CorpusReport:
+    """Doğrulama ve temizleme sonucu"""
+    records: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    renamed: Counter = field(default_factory=Counter)
+    duplicates: int = 0
+    conflicts: list = field(default_factory=list)
+
+    def summary_lines(self):
+        lines = [f"{len(self.records)} geçerli kayıt, {len(self.errors)} hatalı, {self.duplicates} tekrar"]
+        lines += [f"  {old!r} → {new!r}: {count}" for (old, new), count in sorted(self.renamed.items())]
+        lines += [f"  Çelişki: {conflict}" for conflict in self.conflicts]
+        lines += [f"  Hata: {error}" for error in self.errors]
+        return lines
+
+
+def clean_corpus(records):
+    """Kayıtları doğrular, devre tipi adlarını kanonik hale getirir ve tekrarları ayıklar.
+
+    Aynı girdi (katlanmış) ikinci kez geldiğinde ilk kayıt korunur; tipleri farklıysa
+    çelişki olarak raporlanır.
+    """
+    report = CorpusReport()
+    seen = {}
+    for position, record in enumerate(records):
+        if not isinstance(record, dict):
+            report.errors.append(f"#{position}: kayıt bir nesne değil")
+            continue
+        problems = [
+            f"'{name}' alanı eksik ya da boş" for name, kind in REQUIRED_FIELDS.items()
+            if not isinstance(record.get(name), kind) or not record[name].strip()
+        ]
+        problems += [
+            f"'{name}' alanı {kind.__name__} olmalı" for name, kind in OPTIONAL_FIELDS.items()
+            if name in record and not isinstance(record[name], kind)
+        ]
+        if problems:
+            report.errors.append(f"#{position}: {', '.join(problems)}")
+            continue
+
+        circuit_type = canonical_circuit_type(record["circuit_type"])
+        if circuit_type is None:
+            report.errors.append(f"#{position}: bilinmeyen devre tipi {record['circuit_type']!r}")
+            continue
+        if circuit_type != record["circuit_type"]:
+            report.renamed[(record["circuit_type"], circuit_type)] += 1
+
+        key = fold(record["input"])
+        if key in seen:
+            report.duplicates += 1
+            first = report.records[seen[key]]
+            if first["circuit_type"] != circuit_type:
+                report.conflicts.append(f"{record['input']!r}: {first['circuit_type']} / {circuit_type}")
+            continue
+        seen[key] = len(report.records)
+        report.records.append({**record, "input": " ".join(record["input"].split()), "circuit_type": circuit_type})
+    return report
+
+
+def read_corpus(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def file_digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+# --- Ön işleme ---------------------------------------------------------------
+
+def load_nlp():
+    try:
+        import spacy
+        return spacy.load("en_core_web_sm")
+    except (ImportError, OSError):
+        return None
+
+
+def preprocess_mode(nlp):
+    """İndeksin hangi ön işlemeyle üretildiği; eşleşmeyen indeks kullanılmaz"""
+    return f"spacy:{nlp.meta['name']}" if nlp is not None else "lower"
+
+
+def preprocess_text(text, nlp):
+    return analyze_query(text, nlp).processed
+
+
+_WORKER_NLP = {}
+
+
+def _preprocess_shard(job):
+    texts, use_spacy = job
+    # Model her işçi süreçte bir kez yüklenir
+    if use_spacy not in _WORKER_NLP:
+        _WORKER_NLP[use_spacy] = load_nlp() if use_spacy else None
+    nlp = _WORKER_NLP[use_spacy]
+    return preprocess_mode(nlp), [preprocess_text(text, nlp) for text in texts]
+
+
+# --- İndeks ------------------------------------------------------------------
+
+@dataclass
+class MatchIndex:
+    """Tam eşleşme sözlüğü ve parçalara bölünmüş TF-IDF matrisi.
+
+    Her parça (başlangıç satırı, satır sayısı, colptr, satırlar, değerler) olarak sütun
+    biçiminde tutulur; diskten yüklenen diziler tek bir .npz üzerinde bellek eşlemelidir.
+    """
+    exact: dict
+    vectorizer: Vectorizer
+    shards: list
+    size: int
+    version: str = None
+
+    @classmethod
+    def build(cls, exact, texts):
+        """Ön işlenmiş metinlerden bellek içi, tek parçalı indeks"""
+        vectorizer = Vectorizer.fit(texts)
+        shard = csr_to_csc(*vectorizer.transform(texts), vectorizer.size)
+        return cls(exact, vectorizer, [(0, len(texts), *shard)], len(texts))
+
+    def scores(self, query_vector):
+        """Sorgunun tüm satırlarla kosinüs benzerliği (satırlar ve sorgu L2 normalize)"""
+        scores = np.zeros(self.size)
+        for offset, count, colptr, rows, data in self.shards:
+            scores[offset:offset + count] = column_scores(query_vector, colptr, rows, data, count)
+        return scores
+
+    def best(self, query_vector):
+        scores = self.scores(query_vector)
+        best_idx = int(scores.argmax())
+        return best_idx, float(scores[best_idx])
+
+
+def chunked(items, count):
+    size = -(-len(items) // max(1, count))
+    return [items[i:i + size] for i in range(0, len(items), size)] if items else []
+
+
+SHARD_ARRAYS = ("colptr", "rows", "data")
+
+
+def _vectorize_shard(job):
+    texts, vectorizer, name = job
+    arrays = csr_to_csc(*vectorizer.transform(texts), vectorizer.size)
+    info = {"name": name, "rows": len(texts), "nnz": int(arrays[1].size)}
+    return info, {f"{name}_{part}": array for part, array in zip(SHARD_ARRAYS, arrays)}
+
+
+def write_atomic(path, text):
+    tmp = Path(f"{path}.tmp-{os.getpid()}")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def build_index(dataset_path, index_dir="corpus_index", shards=None, workers=None, use_spacy=True):
+    """Datasetten sürümlü, parçalı eşleşme indeksi üretir ve CURRENT'ı ona yöneltir.
+
+    Ön işleme ve parça matrisleri işçi süreçlerde paralel hesaplanır; sözlük ve idf
+    tüm korpus üzerinden tek seferde öğrenilir. Aynı içerik için sürüm adı aynıdır,
+    var olan sürüm yeniden üretilmez.
+    """
+    index_dir = Path(index_dir)
+    report = clean_corpus(read_corpus(dataset_path))
+    records = report.records
+    workers = workers or os.cpu_count() or 1
+    parts = chunked(records, shards or workers)
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(parts) > 1 else None
+    mapper = pool.map if pool else map
+    try:
+        processed = list(mapper(_preprocess_shard, [([r["input"] for r in part], use_spacy) for part in parts]))
+        modes = {mode for mode, _ in processed}
+        if len(modes) > 1:
+            raise RuntimeError(f"İşçiler farklı ön işleme kullandı: {sorted(modes)}")
+        mode = modes.pop() if modes else "lower"
+        texts = [text for _, shard_texts in processed for text in shard_texts]
+
+        payload = json.dumps({"format": INDEX_FORMAT, "preprocess": mode, "shards": len(parts), "records": records},
+                             ensure_ascii=False, sort_keys=True)
+        version = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+        target = index_dir / version
+        if not (target / "manifest.json").exists():
+            vectorizer = Vectorizer.fit(texts)
+            staging = index_dir / f".{version}.tmp-{os.getpid()}"
+            shutil.rmtree(staging, ignore_errors=True)
+            staging.mkdir(parents=True)
+            jobs = [(shard_texts, vectorizer, f"shard_{number:03d}") for number, (_, shard_texts) in enumerate(processed)]
+            arrays = {"terms": vectorizer.terms, "idf": vectorizer.idf}
+            shard_info, offset = [], 0
+            for info, shard_arrays in mapper(_vectorize_shard, jobs):
+                shard_info.append({**info, "offset": offset})
+                arrays.update(shard_arrays)
+                offset += info["rows"]
+            save_npz(staging / MATRIX_FILE, arrays)
+
+            exact = {}
+            for i, text in enumerate(texts):
+                exact.setdefault(text.strip().lower(), i)
+            for name, data in (("records", records), ("exact", exact)):
+                (staging / f"{name}.json").write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            manifest = {
+                "format": INDEX_FORMAT,
+                "version": version,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "preprocess": mode,
+                "source": {"path": str(dataset_path), "sha256": file_digest(dataset_path)},
+                "size": len(records),
+                "terms": vectorizer.size,
+                "shards": shard_info,
+            }
+            (staging / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+            try:
+                os.replace(staging, target)
+            except OSError:
+                # Aynı sürümü eşzamanlı üreten başka bir süreç önce yayımladı
+                shutil.rmtree(staging, ignore_errors=True)
+    finally:
+        if pool:
+            pool.shutdown()
+
+    write_atomic(index_dir / "CURRENT", version)
+    return version, report
+
+
+def load_index(index_dir="corpus_index", mode=None, dataset_path=None):
+    """CURRENT sürümünü (kayıtlar, MatchIndex) olarak bellek eşlemeli yükler.
+
+    İndeks yoksa ya da ön işleme modu veya kaynak dataset değişmişse None döner.
+    """
+    index_dir = Path(index_dir)
+    current = index_dir / "CURRENT"
+    if not current.exists():
+        return None
+    target = index_dir / current.read_text(encoding="utf-8").strip()
+    manifest = json.loads((target / "manifest.json").read_text(encoding="utf-8"))
+    if manifest["format"] != INDEX_FORMAT or (mode and manifest["preprocess"] != mode):
+        return None
+    if dataset_path and Path(dataset_path).exists() and file_digest(dataset_path) != manifest["source"]["sha256"]:
+        return None
+
+    def read(name):
+        return json.loads((target / f"{name}.json").read_text(encoding="utf-8"))
+
+    arrays = load_npz(target / MATRIX_FILE)
+    shards = [
+        (shard["offset"], shard["rows"], *(arrays[f"{shard['name']}_{part}"] for part in SHARD_ARRAYS))
+        for shard in manifest["shards"]
+    ]
+    vectorizer = Vectorizer(arrays["terms"], arrays["idf"])
+    return read("records"), MatchIndex(read("exact"), vectorizer, shards, manifest["size"], manifest["version"])
+
+
+def index_versions(index_dir="corpus_index"):
+    index_dir = Path(index_dir)
+    current = (index_dir / "CURRENT").read_text(encoding="utf-8").strip() if (index_dir / "CURRENT").exists() else None
+    versions = []
+    for manifest_path in sorted(index_dir.glob("*/manifest.json")):
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        versions.append({**manifest, "current": manifest["version"] == current})
+    return sorted(versions, key=lambda manifest: manifest["created"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Devre korpusu doğrulama ve eşleşme indeksi aracı")
+    parser.add_argument("--dataset", default="dataset.json")
+    parser.add_argument("--index-dir", default="corpus_index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    validate = commands.add_parser("validate", help="Kayıtları doğrula, takma adları ve tekrarları raporla")
+    validate.add_argument("--output", help="Temizlenmiş korpusun yazılacağı JSON dosyası")
+    build = commands.add_parser("build", help="Sürümlü, parçalı indeks üret")
+    build.add_argument("--shards", type=int, default=None, help="Parça sayısı (varsayılan: işçi sayısı)")
+    build.add_argument("--workers", type=int, default=None)
+    build.add_argument("--no-spacy", action="store_true", help="Lemmatizasyon yerine küçük harf ön işleme")
+    commands.add_parser("info", help="Mevcut indeks sürümlerini listele")
+    args = parser.parse_args()
+
+    if args.command == "validate":
+        report = clean_corpus(read_corpus(args.dataset))
+        print("\n".join(report.summary_lines()))
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report.records, f, ensure_ascii=False, indent=2)
+        sys.exit(1 if report.errors else 0)
+    elif args.command == "build":
+        started = time.perf_counter()
+        version, report = build_index(args.dataset, args.index_dir, args.shards, args.workers, not args.no_spacy)
+        print("\n".join(report.summary_lines()[:1]))
+        print(f"İndeks sürümü {version} hazır ({time.perf_counter() - started:.2f} s): {Path(args.index_dir) / version}")
+    else:
+        for manifest in index_versions(args.index_dir):
+            marker = "*" if manifest["current"] else " "
+            print(f"{marker} {manifest['version']}  {manifest['created']}  {manifest['size']} kayıt, "
+                  f"{len(manifest['shards'])} parça, {manifest.get('terms', '?')} terim, {manifest['preprocess']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import json
+
+# Anahtar önekine göre birimler; hedef anahtarları tam adla eşlenir
+TARGET_UNITS = {"gain": "x", "gain1": "x", "gain2": "x", "cutoff": "Hz", "vut": "V", "vlt": "V", "tau": "s"}
+COMPONENT_UNITS = {"R": "Ω", "C": "F", "V": "V"}
+
+# Aynı devre tipindeki binlerce sonuç aynı anahtar demetini paylaşır
+_NAME_CACHE = {}
+
+
+def intern_names(names):
+    names = tuple(names)
+    return _NAME_CACHE.setdefault(names, names)
+
+
+def unit_of(key):
+    """Bir bileşen veya hedef anahtarının SI birimi"""
+    if key in TARGET_UNITS:
+        return TARGET_UNITS[key]
+    return COMPONENT_UNITS.get(key[:1], "")
+
+
+def format_resistance(value):
+    """Direnç değerini okunaklı formata çevirir"""
+    if value >= 1e6:
+        return f"{value/1e6:.2f} MΩ"
+    elif value >= 1e3:
+        return f"{value/1e3:.2f} kΩ"
+    else:
+        return f"{value:.2f} Ω"
+
+
+def format_capacitance(value):
+    """Kapasitans değerini okunaklı formata çevirir"""
+    if value >= 1e-3:
+        return f"{value*1e3:.2f} mF"
+    elif value >= 1e-6:
+        return f"{value*1e6:.2f} μF"
+    elif value >= 1e-9:
+        return f"{value*1e9:.2f} nF"
+    else:
+        return f"{value*1e12:.2f} pF"
+
+
+def format_latex_parameters(params):
+    """Parametreleri LaTeX formatına dönüştürür"""
+    formatted = {}
+    for key, value in params.items():
+        if isinstance(value, (int, float)):
+            if key.startswith('R'):
+                if value >= 1e6:
+                    formatted[key] = f"{value/1e6:.1f}~M$\\Omega$"
+                elif value >= 1e3:
+                    formatted[key] = f"{value/1e3:.1f}~k$\\Omega$"
+                else:
+                    formatted[key] = f"{value:.1f}~$\\Omega$"
+            elif key.startswith('C'):
+                if value >= 1e-3:
+                    formatted[key] = f"{value*1e3:.1f}~mF"
+                elif value >= 1e-6:
+                    formatted[key] = f"{value*1e6:.1f}~$\\mu$F"
+                elif value >= 1e-9:
+                    formatted[key] = f"{value*1e9:.1f}~nF"
+                else:
+                    formatted[key] = f"{value*1e12:.1f}~pF"
+            elif key.startswith('V'):
+                formatted[key] = f"{value:.1f}~V"
+        else:
+            formatted[key] = str(value)
+    return formatted
+
+
+class DesignResult:
+    """Ham float değerleri tutan kompakt tasarım sonucu.
+
+    Değerler anahtar demetleri (devre tipine göre paylaşılır) ve float demetleri
+    olarak saklanır; LaTeX, GUI, JSON ve CSV biçimleri yalnızca istendiğinde üretilir.
+    """
+
+    __slots__ = (
+        "circuit_type", "kind", "component_names", "component_values",
+        "target_names", "target_values", "formula", "formula_key",
+    )
+
+    def __init__(self, circuit_type, kind, components=None, targets=None, formula=None, formula_key="GainFormula"):
+        components = components or {}
+        targets = targets or {}
+        self.circuit_type = circuit_type
+        self.kind = kind
+        self.component_names = intern_names(components)
+        self.component_values = tuple(float(v) for v in components.values())
+        self.target_names = intern_names(targets)
+        self.target_values = tuple(float(v) for v in targets.values())
+        self.formula = formula
+        self.formula_key = formula_key
+
+    def __repr__(self):
+        return (
+            f"DesignResult(circuit_type={self.circuit_type!r}, kind={self.kind!r}, "
+            f"components={self.components!r}, targets={self.targets!r})"
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, DesignResult):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    @property
+    def components(self):
+        return dict(zip(self.component_names, self.component_values))
+
+    @property
+    def targets(self):
+        return dict(zip(self.target_names, self.target_values))
+
+    def units(self):
+        return {key: unit_of(key) for key in self.component_names + self.target_names}
+
+    # --- Çıktı hedefleri ---------------------------------------------------
+
+    def to_template_parameters(self, placeholders=None):
+        """LaTeX şablonundaki <<...>> yer tutucularına karşılık gelen sözlük.
+
+        placeholders verilirse yalnızca şablonda karşılığı olan anahtarlar döner.
+        """
+        params = self.components
+        targets = self.targets
+        if self.formula is not None:
+            params[self.formula_key] = self.formula
+        if "gain" in targets:
+            params["GainValue"] = f"{targets['gain']:.2f}"
+        if "cutoff" in targets:
+            params["Cutoff"] = f"{targets['cutoff']:.2f} Hz"
+        if "vut" in targets:
+            params["Vut"] = f"{targets['vut']:.2f} V"
+            params["Vlt"] = f"{targets['vlt']:.2f} V"
+        if placeholders is not None:
+            params = {key: value for key, value in params.items() if key in placeholders}
+        return format_latex_parameters(params)
+
+    def to_display(self, display_formula=None):
+        """GUI sonuç ekranında gösterilecek okunaklı metinler"""
+        display = {}
+        for key, value in zip(self.component_names, self.component_values):
+            if key.startswith('R'):
+                display[key] = format_resistance(value)
+            elif key.startswith('C'):
+                display[key] = format_capacitance(value)
+
+        targets = self.targets
+        if "gain" in targets:
+            display["gain"] = f"{targets['gain']:.2f}x"
+        if "cutoff" in targets:
+            display["cutoff"] = f"{targets['cutoff']:.2f} Hz"
+        if "vut" in targets:
+            display["vut"] = f"{targets['vut']:.2f} V"
+            display["vlt"] = f"{targets['vlt']:.2f} V"
+        if "tau" in targets:
+            display["tau"] = f"{targets['tau'] * 1000:.2f} ms"
+        if display_formula:
+            display["formula"] = display_formula
+        return display
+
+    def to_json(self):
+        """JSON'a yazılabilir sözlük; sayılar ham SI değerleri olarak kalır"""
+        return {
+            "circuit_type": self.circuit_type,
+            "kind": self.kind,
+            "components": self.components,
+            "targets": self.targets,
+            "units": self.units(),
+            "formula": self.formula,
+        }
+
+    def dumps(self):
+        return json.dumps(self.to_json(), ensure_ascii=False)
+
+    def csv_header(self):
+        return ["circuit_type", "kind", *self.component_names, *self.target_names]
+
+    def to_csv_row(self):
+        """csv_header() sırasıyla ham değer satırı"""
+        return [self.circuit_type, self.kind, *self.component_values, *self.target_values]
+
+    def summary_lines(self):
+        """Komut satırında gösterilecek hesaplama özeti"""
+        lines = []
+        for key, value in zip(self.component_names, self.component_values):
+            if key.startswith('R'):
+                lines.append(f"Hesaplanan {key}: {format_resistance(value)}")
+            elif key.startswith('C'):
+                lines.append(f"Hesaplanan {key}: {format_capacitance(value)}")
+        targets = self.targets
+        if "gain" in targets:
+            lines.append(f"Kazanç: {targets['gain']:.2f}x")
+        if "cutoff" in targets:
+            lines.append(f"Kesim Frekansı: {targets['cutoff']:.2f} Hz")
+        if "vut" in targets:
+            lines.append(f"Üst Eşik: {targets['vut']:.2f} V, Alt Eşik: {targets['vlt']:.2f} V")
+        if "tau" in targets:
+            lines.append(f"Zaman Sabiti (τ): {targets['tau']*1000:.2f} ms")
+        if self.kind == "summing":
+            lines.append(f"Çıkış formülü: Vout = {self.formula}")
+        return lines
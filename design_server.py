@@ -0,0 +1,438 @@
+import argparse
+import asyncio
+import contextvars
+import functools
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from anakod5 import CircuitDesigner
+from artifacts import content_digest
+from cascade import composition_latex
+from circuit_analysis import (
+    IDEAL, MODELS, UA741, analyze, frequency_response, has_time_response, transient_response
+)
+from instrumentation import configure_from_argv
+from svg_renderer import pdf_converter, render_svg, svg_to_pdf
+
+
+# İstek başlıkları için üst sınırlar; aşılırsa 431 döner
+MAX_HEADERS = 100
+MAX_HEADER_BYTES = 16 << 10
+
+
+class EndpointMetrics:
+    """Bir uç noktanın istek sayısı, hata sayısı ve gecikme istatistiklerini tutar"""
+
+    def __init__(self, window=1024):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=window)
+
+    def record(self, elapsed, ok=True):
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.recent.append(elapsed)
+
+    def percentile(self, q):
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class HTTPError(Exception):
+    """İstemciye döndürülecek HTTP hata durumu"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class DesignServer:
+    """CircuitDesigner'ı sıcak tutan asyncio tabanlı yerel HTTP/JSON servisi"""
+
+    def __init__(self, designer=None, max_concurrency=8, compile_workers=2, max_body=1 << 20):
+        self.designer = designer or CircuitDesigner()
+        self.designer.config["max_concurrent_compiles"] = compile_workers
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.cpu_pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="design")
+        self.max_body = max_body
+        self.metrics = {}
+        self.inflight_compiles = {}
+        self.routes = {
+            ("GET", "/health"): self.handle_health,
+            ("GET", "/metrics"): self.handle_metrics,
+            ("POST", "/match"): self.handle_match,
+            ("POST", "/calculate"): self.handle_calculate,
+            ("POST", "/analyze"): self.handle_analyze,
+            ("POST", "/render"): self.handle_render,
+            ("POST", "/compile"): self.handle_compile,
+            ("POST", "/compose"): self.handle_compose,
+        }
+
+    def warm_up(self):
+        """NLP modeli ve eşleşme indeksini ilk istekten önce hazırlar"""
+        if self.designer.dataset and self.designer.match_index is None:
+            self.designer.build_match_index()
+
+    async def run_blocking(self, pool, func, *args):
+        loop = asyncio.get_running_loop()
+        # İstek izinin thread içinde de görünmesi için bağlam kopyalanır
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(pool, functools.partial(context.run, func, *args))
+
+    # --- Uç noktalar -------------------------------------------------------
+
+    async def handle_health(self, payload):
+        return {"status": "ok", "dataset_size": len(self.designer.dataset)}
+
+    async def handle_metrics(self, payload):
+        return {path: metrics.to_dict() for path, metrics in sorted(self.metrics.items())}
+
+    async def handle_match(self, payload):
+        query = str(payload.get("query", "")).strip()
+        if not query:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'query' alanı gerekli")
+
+        circuit, processed = await self.run_blocking(self.cpu_pool, self.designer.match_query, query)
+        if not circuit:
+            raise HTTPError(HTTPStatus.NOT_FOUND, "Eşleşen devre bulunamadı")
+        values, unused = await self.run_blocking(
+            self.cpu_pool, self.designer.extract_inputs, circuit["circuit_type"], processed
+        )
+        return {
+            "circuit_type": circuit["circuit_type"],
+            "input": circuit["input"],
+            "values": values,
+            "unused": [{"value": item.value, "unit": item.unit} for item in unused],
+        }
+
+    async def handle_calculate(self, payload):
+        return await self.run_blocking(self.cpu_pool, self.calculation, payload)
+
+    def calculation(self, payload):
+        result = self.calculate(payload)
+        response = result.to_json()
+        if payload.get("latex_parameters", True):
+            response["parameters"] = result.to_template_parameters()
+        if payload.get("opamps", True):
+            opamps = self.designer.suggest_opamps(result, payload.get("top"))
+            if opamps is not None:
+                response["opamps"] = opamps
+        return response
+
+    async def handle_analyze(self, payload):
+        model = MODELS.get(payload.get("model", UA741.name))
+        if model is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Bilinmeyen op-amp modeli: {payload.get('model')}")
+        result = await self.run_blocking(self.cpu_pool, self.calculate, payload)
+        return await self.run_blocking(self.cpu_pool, self.analysis, result, model, bool(payload.get("curves")))
+
+    def analysis(self, result, model, curves):
+        response = analyze(result, model)
+        if curves:
+            if "dc_gain_db" in response:
+                response["bode"] = frequency_response(result, model).to_dict()
+            signal = "step" if "dc_gain_db" in response else "sine"
+            if has_time_response(result, model):
+                response["transient"] = transient_response(result, signal, model).to_dict()
+        return response
+
+    async def handle_render(self, payload):
+        if self.backend(payload) == "svg":
+            return await self.run_blocking(self.cpu_pool, self.svg_response, payload)
+        return await self.run_blocking(self.cpu_pool, self.latex_response, payload)
+
+    def svg_response(self, payload):
+        result = self.calculate(payload)
+        return {"circuit_type": result.circuit_type, "svg": self.render_svg(result)}
+
+    def latex_response(self, payload):
+        circuit_type, latex_code, params = self.render_latex(payload)
+        validation = self.designer.validate_latex_code(circuit_type, latex_code, params)
+        return {
+            "circuit_type": circuit_type,
+            "latex": latex_code,
+            "issues": [str(issue) for issue in validation.issues],
+        }
+
+    async def handle_compile(self, payload):
+        if self.backend(payload) == "svg":
+            if pdf_converter() is None:
+                raise HTTPError(HTTPStatus.NOT_IMPLEMENTED, "SVG→PDF dönüştürücü yok (cairosvg veya rsvg-convert)")
+            svg_text = await self.run_blocking(self.cpu_pool, lambda: self.render_svg(self.calculate(payload)))
+            try:
+                return await self.run_blocking(self.cpu_pool, svg_to_pdf, svg_text)
+            except RuntimeError as e:
+                raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"SVG dönüştürme hatası: {e}")
+
+        if "latex" not in payload and payload.get("layered", self.designer.config["render_mode"] == "layered"):
+            return await self.compile_layered(payload)
+
+        if "latex" in payload:
+            latex_code = str(payload["latex"])
+        else:
+            _, latex_code, _ = await self.render(payload)
+
+        return await self.pdf_bytes(await self.compile(latex_code))
+
+    async def handle_compose(self, payload):
+        request = str(payload.get("request", "")).strip()
+        if not request:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'request' alanı gerekli")
+        model = MODELS.get(payload.get("model", IDEAL.name))
+        if model is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Bilinmeyen op-amp modeli: {payload.get('model')}")
+        compile_ = bool(payload.get("compile"))
+        latex_code, response = await self.run_blocking(
+            self.cpu_pool, self.composition, request, payload.get("composite"), model,
+            not compile_, bool(payload.get("curves"))
+        )
+        if compile_:
+            return await self.pdf_bytes(await self.compile(latex_code))
+        return response
+
+    def composition(self, request, composite, model, summary, curves):
+        """Kompozisyonun LaTeX kodu ve (summary ise) frekans cevabı özeti"""
+        try:
+            composition = self.designer.compose(request, composite)
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+        latex_code = composition_latex(composition)
+        if not summary:
+            return latex_code, None
+        bode = composition.frequency_response(model)
+        response = composition.to_dict()
+        response.update(peak_db=bode.peak_db, corner_frequencies=bode.corner_frequencies(), latex=latex_code)
+        if curves:
+            response["bode"] = bode.to_dict()
+        return latex_code, response
+
+    # --- Yardımcılar -------------------------------------------------------
+
+    def require_circuit_type(self, payload):
+        circuit_type = str(payload.get("circuit_type", "")).strip()
+        if not circuit_type:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'circuit_type' alanı gerekli")
+        return circuit_type
+
+    def backend(self, payload):
+        backend = payload.get("backend", self.designer.config["render_backend"])
+        if backend not in ("latex", "svg"):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Bilinmeyen çizim arka ucu: {backend}")
+        return backend
+
+    def render_svg(self, result):
+        try:
+            return render_svg(result)
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.NOT_FOUND, str(e))
+
+    def calculate(self, payload):
+        circuit_type = self.require_circuit_type(payload)
+        values = payload.get("values")
+        if values is None and payload.get("query"):
+            values, _ = self.designer.extract_inputs(circuit_type, str(payload["query"]))
+        try:
+            return self.designer.calculate(circuit_type, values or {})
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e))
+
+    async def render(self, payload):
+        """Şablonu (ve analiz grafiklerini) iş parçacığı havuzunda üretir; olay döngüsü bloklanmaz"""
+        return await self.run_blocking(self.cpu_pool, self.render_latex, payload)
+
+    def render_latex(self, payload):
+        circuit_type = self.require_circuit_type(payload)
+        params = payload.get("parameters")
+        result = None
+        if params is None:
+            result = self.calculate(payload)
+            params = self.designer.template_parameters(result)
+            if not payload.get("analysis", True):
+                result = None
+        params = {k: str(v) for k, v in params.items()}
+        latex_code = self.designer.generate_latex_code(circuit_type, params, result)
+        if latex_code is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Şablon bulunamadı: {circuit_type}")
+        return circuit_type, latex_code, params
+
+    async def pdf_bytes(self, result):
+        """Depodaki PDF'in içeriği; dosya okuması olay döngüsünün dışında yapılır"""
+        return await self.run_blocking(self.cpu_pool, self.designer.get_artifacts().read_bytes, result.pdf_path)
+
+    async def compile(self, latex_code):
+        """Aynı belge için eşzamanlı derlemeleri tek pdflatex işinde birleştirir.
+
+        Çıktılar çıktı klasörüne değil, boyut sınırlı paylaşılan depoya yazılır;
+        istemcilerin gönderdiği farklı belgeler diski sınırsız dolduramaz.
+        """
+        digest = content_digest("pdflatex", latex_code)
+        future = self.inflight_compiles.get(digest)
+        if future is None:
+            future = asyncio.ensure_future(self.designer.compile_latex_async(latex_code))
+            self.inflight_compiles[digest] = future
+            future.add_done_callback(lambda _: self.inflight_compiles.pop(digest, None))
+
+        result = await asyncio.shield(future)
+        if not result.success:
+            reason = "zaman aşımı" if result.timed_out else result.log_excerpt[-500:]
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"LaTeX derleme hatası: {reason}")
+        return result
+
+    async def compile_layered(self, payload):
+        """Statik katman önbelleğini kullanarak yalnızca etiketleri derler"""
+        circuit_type = self.require_circuit_type(payload)
+        params = payload.get("parameters")
+        if params is None:
+            result = await self.run_blocking(self.cpu_pool, self.calculate, payload)
+            params = await self.run_blocking(self.cpu_pool, self.designer.template_parameters, result)
+        params = {k: str(v) for k, v in params.items()}
+        result = await self.designer.compile_layered_async(circuit_type, params)
+        if not result.success:
+            reason = "zaman aşımı" if result.timed_out else result.log_excerpt[-500:]
+            raise HTTPError(HTTPStatus.UNPROCESSABLE_ENTITY, f"LaTeX derleme hatası: {reason}")
+        return await self.pdf_bytes(result)
+
+    # --- HTTP katmanı ------------------------------------------------------
+
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Geçersiz istek satırı")
+
+        headers = {}
+        size = 0
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:  # Akış sınırını aşan tek satır
+                raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "İstek başlığı çok büyük")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            size += len(line)
+            if len(headers) >= MAX_HEADERS or size > MAX_HEADER_BYTES:
+                raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "İstek başlıkları çok büyük")
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Geçersiz Content-Length")
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Geçersiz Content-Length")
+        if length > self.max_body:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "İstek gövdesi çok büyük")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target.split("?", 1)[0], body
+
+    async def write_response(self, writer, status, body, content_type):
+        status = HTTPStatus(status)
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        # Ölçümler yalnızca tanımlı uç noktalara göre tutulur; rastgele yollar sözlüğü büyütmez
+        route = "unknown"
+        started = time.perf_counter()
+        status, body, content_type = HTTPStatus.OK, b"", "application/json"
+        try:
+            request = await self.read_request(reader)
+            if request is None:
+                return
+            method, path, raw_body = request
+            handler = self.routes.get((method, path))
+            if handler is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, f"Bilinmeyen uç nokta: {method} {path}")
+            route = path
+
+            try:
+                payload = json.loads(raw_body.decode("utf-8")) if raw_body else {}
+            except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, f"Geçersiz JSON: {e}")
+            if not isinstance(payload, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "İstek gövdesi bir JSON nesnesi olmalı")
+
+            async with self.semaphore:
+                with self.designer.instrumentation.trace("http", path=path):
+                    result = await handler(payload)
+
+            if isinstance(result, bytes):
+                body, content_type = result, "application/pdf"
+            else:
+                body = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        except HTTPError as e:
+            status = e.status
+            body = json.dumps({"error": e.message}, ensure_ascii=False).encode("utf-8")
+        except Exception as e:
+            status = HTTPStatus.INTERNAL_SERVER_ERROR
+            body = json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8")
+
+        try:
+            await self.write_response(writer, status, body, content_type)
+        finally:
+            writer.close()
+            metrics = self.metrics.setdefault(route, EndpointMetrics())
+            metrics.record(time.perf_counter() - started, ok=status < 400)
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        await asyncio.get_running_loop().run_in_executor(self.cpu_pool, self.warm_up)
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Devre tasarım servisi çalışıyor: http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="OpAmp devre tasarım HTTP servisi",
+        epilog="Ölçüm için --profile ve --trace DOSYA seçenekleri de kullanılabilir."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--compile-workers", type=int, default=2)
+    args = parser.parse_args(configure_from_argv())
+
+    async def run():
+        server = DesignServer(max_concurrency=args.max_concurrency, compile_workers=args.compile_workers)
+        await server.serve(args.host, args.port)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\nServis durduruldu.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import re
+from dataclasses import dataclass, field
+
+from circuit_calculations import find_circuit_spec, fold_turkish_text, normalize_turkish_text
+from quantity import find_quantities
+
+# Rol → katlanmış anahtar kelime kökleri; Türkçe ekler ("kazancı", "eşikli") kök eşleşmesiyle yakalanır
+ROLE_KEYWORDS = {
+    "gain": ("kazan", "kat", "gain", "amplifikasyon"),
+    "cutoff": ("kesim", "frekans", "kose", "cutoff", "fc"),
+    "tau": ("zaman sabit", "tau", "τ", "rc"),
+    "vut": ("esik", "threshold", "vut"),
+}
+ORDINAL_KEYWORDS = {"gain1": ("birinci", "ilk", "v1"), "gain2": ("ikinci", "v2")}
+# Birimli değerin rolü doğrudan biriminden gelir
+UNIT_ROLES = {"x": "gain", "Hz": "cutoff", "s": "tau", "V": "vut"}
+# Birimsiz bir değerin bir anahtar kelimeye bağlanabileceği en uzak mesafe (karakter)
+KEYWORD_WINDOW = 24
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+@dataclass(frozen=True)
+class Query:
+    """Bir kez işlenmiş kullanıcı sorgusu: TF-IDF metni ve aynı geçişten gelen token akışı"""
+    text: str
+    processed: str
+    tokens: tuple  # (token metni, başlangıç konumu)
+
+
+def analyze_query(text, nlp=None):
+    """Sorguyu tek NLP geçişiyle işler; spaCy yoksa küçük harf ve düzenli ifade token'ları"""
+    # normalize_turkish_text uzunluğu korur; token konumları özgün metindeki değerlerle hizalı kalır
+    lowered = normalize_turkish_text(text)
+    if nlp:
+        doc = nlp(lowered)
+        processed = " ".join([token.lemma_ for token in doc if not token.is_stop])
+        tokens = tuple((token.text, token.idx) for token in doc)
+    else:
+        processed = lowered
+        tokens = tuple((match.group(), match.start()) for match in TOKEN.finditer(lowered))
+    return Query(text, processed, tokens)
+
+
+@dataclass(frozen=True)
+class ExtractedValue:
+    """Sorgudan çıkarılan tek değer ve rolü"""
+    role: str
+    value: float
+    unit: str
+    span: tuple
+    source: str  # "unit", "keyword" veya "position"
+
+
+@dataclass
+class Extraction:
+    """Sorgudaki değerler; rolü belirlenemeyenler unassigned listesinde kalır"""
+    values: list = field(default_factory=list)
+    unassigned: list = field(default_factory=list)
+
+    def for_spec(self, spec, positional=False):
+        """Değerleri devrenin girdi adlarına eşler; kazanç rolü gain1/gain2'ye sırayla dağılır.
+
+        positional True ise rolü bilinmeyen birimsiz değerler ilk boş girdiye yazılır.
+        Devreye uymayan değerler ikinci dönüş değerinde döner.
+        """
+        names = [item.name for item in spec.inputs]
+        assigned, unused = {}, []
+        for item in self.values:
+            role = item.role
+            if role == "gain" and role not in names:
+                role = next((name for name in ("gain1", "gain2") if name in names and name not in assigned), role)
+            if role in names and role not in assigned:
+                assigned[role] = item.value
+            else:
+                unused.append(item)
+        for quantity, span in self.unassigned:
+            free = [name for name in names if name not in assigned]
+            if positional and free and not quantity.unit:
+                assigned[free[0]] = quantity.value
+            else:
+                unused.append(ExtractedValue("", quantity.value, quantity.unit, span, "position"))
+        return assigned, unused
+
+
+def _keyword_spans(query):
+    """Token akışındaki rol anahtar kelimeleri: [(rol, başlangıç, bitiş)]"""
+    spans = []
+    tokens = [(fold_turkish_text(token), start, start + len(token)) for token, start in query.tokens]
+    for index, (token, start, end) in enumerate(tokens):
+        pair = f"{token} {tokens[index + 1][0]}" if index + 1 < len(tokens) else token
+        for role, keywords in (*ROLE_KEYWORDS.items(), *ORDINAL_KEYWORDS.items()):
+            if any(token.startswith(keyword) or pair.startswith(keyword) for keyword in keywords):
+                spans.append((role, start, end))
+                break
+    return spans
+
+
+def _nearest_role(span, keywords, preceding_only=False):
+    best = None
+    for role, start, end in keywords:
+        if preceding_only and end > span[0]:
+            continue
+        distance = span[0] - end if end <= span[0] else start - span[1]
+        if 0 <= distance <= KEYWORD_WINDOW and (best is None or distance < best[0]):
+            best = (distance, role)
+    return best[1] if best else None
+
+
+def extract_values(query):
+    """Sorgudaki sayısal değerleri birim ve yakındaki anahtar kelimelere göre rollere ayırır.
+
+    query bir Query ise (eşleştirmede üretilen) token akışı yeniden kullanılır; metin
+    verilirse yalnızca düzenli ifade token'ları çıkarılır, NLP modeli yeniden çalışmaz.
+    """
+    if not isinstance(query, Query):
+        query = analyze_query(query)
+    keywords = _keyword_spans(query)
+    extraction = Extraction()
+    for quantity, span in find_quantities(query.text):
+        role = UNIT_ROLES.get(quantity.unit)
+        source = "unit"
+        nearest = _nearest_role(span, keywords)
+        if role == "gain" or nearest == "gain":
+            # "ikinci giriş kazancı 5": sıra sözcüğü değerden önce gelir
+            ordinal = _nearest_role(span, [k for k in keywords if k[0] in ORDINAL_KEYWORDS], preceding_only=True)
+            nearest = ordinal or nearest
+        if role == "gain" and nearest in ORDINAL_KEYWORDS:
+            role, source = nearest, "keyword"
+        elif role is None and not quantity.unit and nearest is not None:
+            role, source = nearest, "keyword"
+        if role is None:
+            extraction.unassigned.append((quantity, span))
+        else:
+            extraction.values.append(ExtractedValue(role, quantity.value, quantity.unit, span, source))
+    return extraction
+
+
+def extract_inputs(circuit_type, query, positional=False):
+    """Devre tipinin girdi sözlüğü (yalnızca sorguda bulunan değerler) ve kullanılmayan değerler"""
+    spec = find_circuit_spec(circuit_type)
+    if spec is None:
+        return {}, []
+    return extract_values(query).for_spec(spec, positional)
@@ -0,0 +1,88 @@
+import re
+from dataclasses import dataclass
+
+from circuit_calculations import CIRCUIT_SPECS, DEFAULT_CONFIG, calculate, find_circuit_spec
+from latex_validator import template_placeholders
+
+# Birime göre giriş kutusu: (alt sınır, üst sınır, adım); None ise serbest metin (ör. "1ms")
+WIDGET_RANGES = {
+    "x": (0.1, 1000, 0.1),
+    "Hz": (1, 100000, 1),
+    "V": (0.1, 50, 0.1),
+}
+FIELD_LABELS = {
+    "gain": "Kazanç Değeri:",
+    "gain1": "Birinci Giriş Kazancı:",
+    "gain2": "İkinci Giriş Kazancı:",
+    "cutoff": "Kesim Frekansı (Hz):",
+    "vut": "Üst Eşik Değeri (V):",
+    "tau": "Zaman Sabiti (RC):",
+}
+_PROMPT_DEFAULT = re.compile(r"\s*\[[^\]]*\]\s*:?\s*$")
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Parametre formundaki tek alan; name hesaplama girdisinin adıdır"""
+    name: str
+    label: str
+    default: str
+    unit: str = ""
+    range: tuple = None  # (alt, üst, adım); None ise serbest metin
+
+    @property
+    def spinbox(self):
+        return self.range is not None
+
+
+@dataclass(frozen=True)
+class FormSpec:
+    """Bir devre tipinin parametre formu ve şablonuyla anahtar uyumu"""
+    circuit_type: str
+    kind: str
+    fields: tuple
+    placeholders: frozenset  # şablondaki <<...>> adları
+    keys: frozenset  # hesaplama sonucunun şablona verdiği anahtarlar
+
+    @property
+    def missing(self):
+        """Şablonda olup hesaplamanın doldurmadığı yer tutucular; boş değilse çıktı eksik kalır"""
+        return self.placeholders - self.keys
+
+
+def field_label(input_spec):
+    return FIELD_LABELS.get(input_spec.name) or _PROMPT_DEFAULT.sub(":", input_spec.prompt)
+
+
+def field_range(input_spec, default):
+    """Birimin aralığı; varsayılanı negatif olan alanlarda (toplayıcı kazançları) aralık aynalanır"""
+    bounds = WIDGET_RANGES.get(input_spec.unit)
+    if bounds is not None and default.startswith("-"):
+        low, high, step = bounds
+        return (-high, -low, step)
+    return bounds
+
+
+def form_spec(circuit_type, template_text=None, config=None):
+    """Devre tanımı ve şablondan form tanımı üretir; bilinmeyen tip için ValueError"""
+    circuit = find_circuit_spec(circuit_type)
+    if circuit is None:
+        raise ValueError(f"Hesaplaması tanımlı olmayan devre tipi: {circuit_type}")
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    fields = []
+    for item in circuit.inputs:
+        default = str(item.default(config))
+        fields.append(FieldSpec(item.name, field_label(item), default, item.unit, field_range(item, default)))
+    # Anahtarlar varsayılan girdilerle bir örnek hesaplamadan gelir; tasarım değerlerinden bağımsızdır.
+    # Şablon varsa yalnızca yer tutucularına karşılık gelenler tutulur (doldurulan form uyarı üretmez).
+    placeholders = template_placeholders(template_text) if template_text else frozenset()
+    keys = frozenset(calculate(circuit_type, {}, config).to_template_parameters(placeholders if template_text else None))
+    return FormSpec(circuit.circuit_type, circuit.kind, tuple(fields), placeholders, keys)
+
+
+def form_registry(load_template=None, config=None):
+    """Tüm devre tipleri için tip → FormSpec; load_template(tip) şablon metnini veya None döndürür"""
+    return {
+        spec.circuit_type: form_spec(spec.circuit_type, load_template(spec.circuit_type) if load_template else None, config)
+        for spec in CIRCUIT_SPECS
+    }
@@ -1,23 +1,32 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, scrolledtext
 import json
-import math
 import re
 import os
 import webbrowser
 import subprocess
 import sys
 from anakod5 import CircuitDesigner
+from circuit_calculations import find_circuit_spec
+from forms import form_spec
+from quantity import parse_numeric_value
+from artifacts import publish_file, publish_text
+from latex_validator import validate_latex
+from instrumentation import configure_from_argv, get_instrumentation, timed, traced
 
 class CircuitDesignerGUI(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("OpAmp Devre Tasarım Sistemi")
+        self.instrumentation = get_instrumentation()
         self.designer = ()
         self.geometry("1000x700")
         self.selected_circuit = None
         self.parameters = {}
         self.calculated_values = {}
+        self.design_result = None
+        self.forms = {}  # devre tipi -> (FormSpec, çerçeve, {girdi adı: widget})
+        self.active_form = None
         self.latex_code = ""
         self.current_step = 1
         self.latex_code_dir = "latex_codes"
@@ -40,15 +49,6 @@ class CircuitDesignerGUI(tk.Tk):
             {"id": 10, "input": "fark yükselteci", "circuit_type": "Fark Yükselteci", "description": "İki giriş arasındaki farkı yükselten devre"}
         ]
         
-        self.default_config = {
-            "default_resistor": "10k",
-            "default_capacitor": "1u",
-            "default_voltage": "15",
-            "default_gain": "10",
-            "default_cutoff": "1000",
-            "default_time_constant": "1ms"
-        }
-        
         self.init_ui()
         
     def init_ui(self):
@@ -398,33 +398,34 @@ class CircuitDesignerGUI(tk.Tk):
         self.compile_selected_latex()
         self.view_compiled_pdf()
 
+    @timed("gui.compile")
     def compile_latex(self, latex_file_path, output_pdf_path):
         try:
-            # Önce PDF dosyasını sil (eğer varsa)
-            if os.path.exists(output_pdf_path):
-                os.remove(output_pdf_path)
-                
-            # pdflatex komutunu çalıştır
-            command = ["pdflatex", "-interaction=nonstopmode", "-output-directory", self.pdf_output_dir, latex_file_path]
-            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            stdout, stderr = process.communicate(timeout=30)  # 30 saniye zaman aşımı
+            # Derlemeden önce hızlı ön kontrol
+            with open(latex_file_path, 'r', encoding='utf-8') as f:
+                latex_code = f.read()
+            validation = validate_latex(latex_code)
+            if not validation.ok:
+                messagebox.showerror("LaTeX Ön Kontrol Hatası",
+                                   f"Belge derlenmeden reddedildi:\n\n{validation.summary()}")
+                return False
 
-            if process.returncode == 0:
+            # Aynı belgeyi derlemiş başka bir pencere/süreç varsa PDF paylaşılan depodan gelir;
+            # sabit adlı çıktı dosyası derleme bitince atomik olarak değiştirilir
+            artifact, error_log = self.designer.compile_document(latex_code)
+            if artifact is not None:
+                self.designer.get_artifacts().publish(artifact, output_pdf_path)
                 messagebox.showinfo("Başarılı", f"PDF başarıyla oluşturuldu:\n{output_pdf_path}")
                 self.view_btn.config(state='normal')
                 return True
             else:
-                error_log = stderr.decode('utf-8', errors='replace') if stderr else stdout.decode('utf-8', errors='replace')
                 messagebox.showerror("LaTeX Derleme Hatası", 
-                                   f"LaTeX derlenirken bir hata oluştu:\n\n{error_log[:500]}...")
+                                   f"LaTeX derlenirken bir hata oluştu:\n\n{error_log}")
                 return False
                 
         except FileNotFoundError:
             messagebox.showerror("Hata", "pdflatex komutu bulunamadı. Lütfen LaTeX dağıtımının (TeX Live veya MiKTeX) kurulu olduğundan emin olun.")
             return False
-        except subprocess.TimeoutExpired:
-            messagebox.showerror("Hata", "LaTeX derleme işlemi zaman aşımına uğradı.")
-            return False
         except Exception as e:
             messagebox.showerror("Hata", f"Beklenmeyen bir hata oluştu: {str(e)}")
             return False
@@ -494,10 +495,20 @@ class CircuitDesignerGUI(tk.Tk):
                     self.circuit_list.see(i)
                     self.circuit_list.activate(i)
                     self.select_circuit(match)
+                    self.fill_parameters_from_query(match['circuit_type'], query)
                     break
         else:
             messagebox.showinfo("Arama Sonucu", "Eşleşen devre bulunamadı.")
             
+    def fill_parameters_from_query(self, circuit_type, query):
+        """Arama metnindeki değerleri (ör. "10 kat kazançlı") parametre alanlarına yazar"""
+        values, _ = self.designer.extract_inputs(circuit_type, query)
+        for name, value in values.items():
+            widget = self.parameters.get(name)
+            if widget is not None:
+                widget.delete(0, 'end')
+                widget.insert(0, f"{value:g}")
+            
     def select_circuit_from_list(self):
         selection = self.circuit_list.curselection()
         if not selection:
@@ -511,111 +522,70 @@ class CircuitDesignerGUI(tk.Tk):
         self.selected_circuit = circuit
         self.parameters = {}
         self.calculated_values = {}
+        self.design_result = None
         
         # Update parameter input section
         self.update_parameter_inputs()
         
         self.set_step(2)
         
+    def get_form(self, circuit_type):
+        """Devre tipinin parametre formu; çerçeve ilk kullanımda bir kez kurulur ve saklanır"""
+        form = self.forms.get(circuit_type)
+        if form is not None:
+            return form
+
+        template_file = self.designer.template_path(circuit_type)
+        template_text = self.designer.load_template(template_file) if template_file.exists() else None
+        spec = form_spec(circuit_type, template_text, self.designer.config)
+        frame = ttk.Frame(self.param_inputs_frame)
+        frame.columnconfigure(1, weight=1)
+        widgets = {}
+        for row, field in enumerate(spec.fields):
+            ttk.Label(frame, text=field.label).grid(row=row, column=0, sticky='w', padx=5, pady=5)
+            if field.spinbox:
+                low, high, step = field.range
+                widget = ttk.Spinbox(frame, from_=low, to=high, increment=step, format="%.2f")
+                widget.set(field.default)
+            else:
+                widget = ttk.Entry(frame)
+                widget.insert(0, field.default)
+            widget.grid(row=row, column=1, sticky='ew', padx=5, pady=5)
+            widgets[field.name] = widget
+
+        if spec.missing:
+            ttk.Label(
+                frame,
+                text="Uyarı: şablondaki şu alanlar doldurulamıyor: " + ", ".join(sorted(spec.missing)),
+                style='Info.TLabel'
+            ).grid(row=len(spec.fields), column=0, columnspan=2, sticky='w', padx=5, pady=5)
+
+        form = self.forms[circuit_type] = (spec, frame, widgets)
+        return form
+
     def update_parameter_inputs(self):
         if not self.selected_circuit:
             return
-            
-        # Clear existing inputs
-        for widget in self.param_inputs_frame.winfo_children():
-            widget.destroy()
                 
         # Update info label
         self.circuit_info_label.config(
             text=f"Seçilen Devre: {self.selected_circuit['circuit_type']}\n{self.selected_circuit['description']}"
         )
         
-        circuit_type = self.selected_circuit['circuit_type'].lower()
-        
-        # Add parameter inputs based on circuit type
-        if 'tersleyici' in circuit_type or 'terslemeyen' in circuit_type or 'fark yükselteci' in circuit_type:
-            gain_label = ttk.Label(self.param_inputs_frame, text="Kazanç Değeri:")
-            gain_label.grid(row=0, column=0, sticky='w', padx=5, pady=5)
-            
-            gain_input = ttk.Spinbox(
-                self.param_inputs_frame, 
-                from_=0.1, 
-                to=1000, 
-                increment=0.1,
-                format="%.2f"
-            )
-            gain_input.set(self.default_config['default_gain'])
-            gain_input.grid(row=0, column=1, sticky='ew', padx=5, pady=5)
-            self.parameters['gain'] = gain_input
-            
-        elif 'alçak geçiren' in circuit_type or 'yüksek geçiren' in circuit_type:
-            cutoff_label = ttk.Label(self.param_inputs_frame, text="Kesim Frekansı (Hz):")
-            cutoff_label.grid(row=0, column=0, sticky='w', padx=5, pady=5)
-            
-            cutoff_input = ttk.Spinbox(
-                self.param_inputs_frame, 
-                from_=1, 
-                to=100000, 
-                increment=1,
-                format="%.2f"
-            )
-            cutoff_input.set(self.default_config['default_cutoff'])
-            cutoff_input.grid(row=0, column=1, sticky='ew', padx=5, pady=5)
-            self.parameters['cutoff'] = cutoff_input
-            
-        elif 'toplayıcı' in circuit_type:
-            gain1_label = ttk.Label(self.param_inputs_frame, text="Birinci Giriş Kazancı:")
-            gain1_label.grid(row=0, column=0, sticky='w', padx=5, pady=5)
-            
-            gain1_input = ttk.Spinbox(
-                self.param_inputs_frame, 
-                from_=0.1, 
-                to=1000, 
-                increment=0.1,
-                format="%.2f"
-            )
-            gain1_input.set(self.default_config['default_gain'])
-            gain1_input.grid(row=0, column=1, sticky='ew', padx=5, pady=5)
-            self.parameters['gain1'] = gain1_input
-            
-            gain2_label = ttk.Label(self.param_inputs_frame, text="İkinci Giriş Kazancı:")
-            gain2_label.grid(row=1, column=0, sticky='w', padx=5, pady=5)
-            
-            gain2_input = ttk.Spinbox(
-                self.param_inputs_frame, 
-                from_=0.1, 
-                to=1000, 
-                increment=0.1,
-                format="%.2f"
-            )
-            gain2_input.set(self.default_config['default_gain'])
-            gain2_input.grid(row=1, column=1, sticky='ew', padx=5, pady=5)
-            self.parameters['gain2'] = gain2_input
-            
-        elif 'schmitt' in circuit_type:
-            vut_label = ttk.Label(self.param_inputs_frame, text="Üst Eşik Değeri (V):")
-            vut_label.grid(row=0, column=0, sticky='w', padx=5, pady=5)
-            
-            vut_input = ttk.Spinbox(
-                self.param_inputs_frame, 
-                from_=0.1, 
-                to=50, 
-                increment=0.1,
-                format="%.2f"
-            )
-            vut_input.set(5.0)
-            vut_input.grid(row=0, column=1, sticky='ew', padx=5, pady=5)
-            self.parameters['vut'] = vut_input
-            
-        elif 'türev alıcı' in circuit_type or 'integral alıcı' in circuit_type:
-            tau_label = ttk.Label(self.param_inputs_frame, text="Zaman Sabiti (RC):")
-            tau_label.grid(row=0, column=0, sticky='w', padx=5, pady=5)
-            
-            tau_input = ttk.Entry(self.param_inputs_frame)
-            tau_input.insert(0, self.default_config['default_time_constant'])
-            tau_input.grid(row=0, column=1, sticky='ew', padx=5, pady=5)
-            self.parameters['tau'] = tau_input
+        # Formlar yeniden kurulmaz; yalnızca seçilen devrenin çerçevesi gösterilir
+        try:
+            _, frame, widgets = self.get_form(self.selected_circuit['circuit_type'])
+        except ValueError as e:
+            messagebox.showerror("Hata", str(e))
+            return
+        if self.active_form is not frame:
+            if self.active_form is not None:
+                self.active_form.pack_forget()
+            frame.pack(fill='both', expand=True)
+            self.active_form = frame
+        self.parameters = widgets
             
+    @traced("gui")
     def calculate_parameters(self):
         if not self.selected_circuit:
             return
@@ -623,118 +593,14 @@ class CircuitDesignerGUI(tk.Tk):
         self.calculate_btn.config(text="Hesaplanıyor...", state='disabled')
         self.update()
         
-        circuit_type = self.selected_circuit['circuit_type'].lower()
         self.calculated_values = {}
+        self.design_result = None
         
         try:
-            if 'tersleyici' in circuit_type:
-                gain = float(self.parameters['gain'].get())
-                R1 = self.parse_numeric_value(self.default_config['default_resistor'])
-                R2 = R1 * abs(gain)
-                
-                self.calculated_values = {
-                    'R1': self.format_resistance(R1),
-                    'R2': self.format_resistance(R2),
-                    'gain': f"{-gain:.2f}x",
-                    'formula': "A_v = -R₂/R₁"
-                }
-                
-            elif 'terslemeyen' in circuit_type:
-                gain = float(self.parameters['gain'].get())
-                R1 = self.parse_numeric_value(self.default_config['default_resistor'])
-                R2 = R1 * (gain - 1)
-                
-                self.calculated_values = {
-                    'R1': self.format_resistance(R1),
-                    'R2': self.format_resistance(R2),
-                    'gain': f"{gain:.2f}x",
-                    'formula': "A_v = 1 + R₂/R₁"
-                }
-                
-            elif 'alçak geçiren' in circuit_type or 'yüksek geçiren' in circuit_type:
-                cutoff = float(self.parameters['cutoff'].get())
-                C = self.parse_numeric_value(self.default_config['default_capacitor'])
-                R = 1 / (2 * math.pi * cutoff * C)
-                
-                self.calculated_values = {
-                    'R': self.format_resistance(R),
-                    'C': self.format_capacitance(C),
-                    'cutoff': f"{cutoff:.2f} Hz",
-                    'formula': "f_c = 1/(2πRC)"
-                }
-                
-            elif 'toplayıcı' in circuit_type:
-                gain1 = float(self.parameters['gain1'].get())
-                gain2 = float(self.parameters['gain2'].get())
-                Rf = self.parse_numeric_value(self.default_config['default_resistor'])
-                R1 = Rf / abs(gain1)
-                R2 = Rf / abs(gain2)
-                
-                self.calculated_values = {
-                    'Rf': self.format_resistance(Rf),
-                    'R1': self.format_resistance(R1),
-                    'R2': self.format_resistance(R2),
-                    'formula': "V_out = -(R_f/R₁)V₁ - (R_f/R₂)V₂"
-                }
-                
-            elif 'schmitt' in circuit_type:
-                vut = float(self.parameters['vut'].get())
-                Vcc = self.parse_numeric_value(self.default_config['default_voltage'])
-                R1 = self.parse_numeric_value(self.default_config['default_resistor'])
-                R2 = R1 * (vut / (Vcc - vut))
-                
-                self.calculated_values = {
-                    'R1': self.format_resistance(R1),
-                    'R2': self.format_resistance(R2),
-                    'vut': f"{vut:.2f} V",
-                    'vlt': f"{-vut:.2f} V"
-                }
-                
-            elif 'gerilim izleyici' in circuit_type:
-                self.calculated_values = {
-                    'gain': "1.00x",
-                    'formula': "V_out = V_in"
-                }
-                
-            elif 'türev alıcı' in circuit_type:
-                tau = self.parse_numeric_value(self.parameters['tau'].get())
-                R = self.parse_numeric_value(self.default_config['default_resistor'])
-                C = tau / R
-                
-                self.calculated_values = {
-                    'R': self.format_resistance(R),
-                    'C': self.format_capacitance(C),
-                    'tau': f"{tau * 1000:.2f} ms",
-                    'formula': "V_out = -RC(dV_in/dt)"
-                }
-                
-            elif 'integral alıcı' in circuit_type:
-                tau = self.parse_numeric_value(self.parameters['tau'].get())
-                R = self.parse_numeric_value(self.default_config['default_resistor'])
-                C = tau / R
-                Rf = R * 10
-                
-                self.calculated_values = {
-                    'R': self.format_resistance(R),
-                    'C': self.format_capacitance(C),
-                    'Rf': self.format_resistance(Rf),
-                    'tau': f"{tau * 1000:.2f} ms",
-                    'formula': "V_out = -(1/RC)∫V_in dt"
-                }
-                
-            elif 'fark yükselteci' in circuit_type:
-                gain = float(self.parameters['gain'].get())
-                R1 = self.parse_numeric_value(self.default_config['default_resistor'])
-                R3 = R1 * gain
-                
-                self.calculated_values = {
-                    'R1': self.format_resistance(R1),
-                    'R2': self.format_resistance(R1),
-                    'R3': self.format_resistance(R3),
-                    'R4': self.format_resistance(R3),
-                    'gain': f"{gain:.2f}x",
-                    'formula': "A_v = R₃/R₁"
-                }
+            values = {name: widget.get() for name, widget in self.parameters.items()}
+            self.design_result = self.designer.calculate(self.selected_circuit['circuit_type'], values)
+            spec = find_circuit_spec(self.design_result.circuit_type)
+            self.calculated_values = self.design_result.to_display(spec.display_formula if spec else None)
             
             self.update_results_display()
             self.set_step(3)
@@ -814,34 +680,10 @@ class CircuitDesignerGUI(tk.Tk):
                 row += 1
     
     def parse_numeric_value(self, value_str):
-        clean_str = str(value_str).replace(' ', '')
-        
-        # Extract number and unit
-        match = re.match(r'^([\d.]+)([kKMuμnp]?)', clean_str)
-        if not match:
-            try:
-                return float(clean_str)
-            except:
-                return 0
-        
-        number = float(match.group(1))
-        unit = match.group(2)
-        
-        # Convert based on unit
-        multipliers = {
-            'p': 1e-12,  # pico
-            'n': 1e-9,   # nano
-            'μ': 1e-6,   # micro
-            'u': 1e-6,   # micro (alternative)
-            'k': 1e3,    # kilo
-            'K': 1e3,    # kilo (alternative)
-            'M': 1e6     # mega
-        }
-        
-        if unit in multipliers:
-            return number * multipliers[unit]
-        else:
-            return number
+        try:
+            return parse_numeric_value(value_str)
+        except ValueError:
+            return 0
     
     def format_resistance(self, value):
         if value >= 1e6:
@@ -861,14 +703,22 @@ class CircuitDesignerGUI(tk.Tk):
         else:
             return f"{value*1e12:.2f} pF"
     
+    @traced("gui")
     def generate_latex_code(self):
         
-        if not self.selected_circuit or not self.calculated_values:
+        if not self.selected_circuit or self.design_result is None:
             return
         
-        converted_params = {k: str(v) for k, v in self.calculated_values.items()}
-
-        latex_code = self.designer.generate_latex_code(self.selected_circuit["circuit_type"], converted_params)
+        # Aynı tasarım daha önce derlendiyse (bu veya başka bir süreçte) PDF önbellekten gelir
+        cached = self.designer.cached_design(self.design_result)
+        parameters = self.designer.template_parameters(self.design_result)
+        if cached is not None:
+            latex_code = cached["latex"]
+        else:
+            # Şablon değerleri ekrandaki metinlerden değil, ham sonuçtan biçimlendirilir
+            latex_code = self.designer.generate_latex_code(
+                self.selected_circuit["circuit_type"], parameters, self.design_result
+            )
 
         if latex_code is None:
             messagebox.showerror("Hata", "LaTeX şablonu bulunamadı.")
@@ -885,8 +735,7 @@ class CircuitDesignerGUI(tk.Tk):
         tex_path = os.path.join(self.latex_code_dir, tex_filename)
 
         try:
-            with open(tex_path, 'w', encoding='utf-8') as f:
-                f.write(self.latex_code)
+            publish_text(tex_path, self.latex_code)
         except Exception as e:
             messagebox.showerror("Hata", f"LaTeX kodu kaydedilirken hata oluştu: {e}")
             return
@@ -894,7 +743,11 @@ class CircuitDesignerGUI(tk.Tk):
         # PDF derle
         pdf_filename = tex_filename.replace(".tex", ".pdf")
         pdf_path = os.path.join(self.pdf_output_dir, pdf_filename)
-        self.compile_latex(tex_path, pdf_path)
+        if cached is not None:
+            publish_file(cached["pdf_path"], pdf_path)
+            self.view_btn.config(state='normal')
+        elif self.compile_latex(tex_path, pdf_path):
+            self.designer.store_design(self.design_result, parameters, latex_code, pdf_path)
 
         # PDF görüntüle
         if os.path.exists(pdf_path):
@@ -1011,5 +864,6 @@ Bu devre LaTeX ile oluşturulmuştur. Hesaplanan değerler:
         self.populate_latex_file_list()
         # Kod bloğunun SONUNA şu kısmı ekleyin:
 if __name__ == "__main__":
+    configure_from_argv()
     app = CircuitDesignerGUI()
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,246 @@
+import atexit
+import contextvars
+import cProfile
+import functools
+import inspect
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+NULL_CONTEXT = nullcontext()
+# Etkin istek izi; thread'ler ve asyncio görevleri arasında ayrı tutulur
+CURRENT_TRACE = contextvars.ContextVar("current_trace", default=None)
+
+
+class StageStats:
+    """Bir aşamanın toplam çağrı sayısı ve süre istatistikleri"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        self.min = min(self.min, elapsed)
+        self.max = max(self.max, elapsed)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "min_ms": round(self.min * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class Instrumentation:
+    """Tasarım hattı için aşama zamanlayıcıları, sayaçlar ve isteğe bağlı profil yakalama"""
+
+    def __init__(self, enabled=True, trace_path=None, profile=False, trace_memory=False):
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.stages = {}
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.profiler = cProfile.Profile() if profile else None
+        self.trace_memory = trace_memory
+        self.trace_file = None
+
+    # --- Yakalama ----------------------------------------------------------
+
+    def start(self):
+        """cProfile/tracemalloc yakalamasını başlatır"""
+        if self.profiler is not None:
+            self.profiler.enable()
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return self
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.trace_file is not None:
+            self.trace_file.close()
+            self.trace_file = None
+
+    def stage(self, name):
+        """Bir aşamanın süresini ölçen bağlam yöneticisi; kapalıyken maliyetsizdir"""
+        if not self.enabled:
+            return NULL_CONTEXT
+        return self._timed_stage(name)
+
+    @contextmanager
+    def _timed_stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.stages.setdefault(name, StageStats()).add(elapsed)
+            trace = CURRENT_TRACE.get()
+            if trace is not None:
+                # Aynı aşamanın tekrarları (ör. her dataset satırı için nlp) tek kayıtta toplanır
+                entry = trace["stages"].setdefault(name, {"count": 0, "ms": 0.0})
+                entry["count"] += 1
+                entry["ms"] += elapsed * 1000
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+        trace = CURRENT_TRACE.get()
+        if trace is not None:
+            trace["counters"][name] = trace["counters"].get(name, 0) + n
+
+    @contextmanager
+    def trace(self, kind, **meta):
+        """İstek başına izleme kaydı; trace_path verilmişse JSON satırı olarak yazılır"""
+        if not self.enabled:
+            yield None
+            return
+
+        record = {"kind": kind, "meta": meta, "started": time.time(), "stages": {}, "counters": {}}
+        token = CURRENT_TRACE.set(record)
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            for entry in record["stages"].values():
+                entry["ms"] = round(entry["ms"], 3)
+            CURRENT_TRACE.reset(token)
+            self.write_trace(record)
+
+    def write_trace(self, record):
+        if not self.trace_path:
+            return
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self.lock:
+            if self.trace_file is None:
+                self.trace_file = open(self.trace_path, "a", encoding="utf-8")
+            self.trace_file.write(line + "\n")
+            self.trace_file.flush()
+
+    # --- Raporlama ---------------------------------------------------------
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "stages": {name: stats.to_dict() for name, stats in self.stages.items()},
+                "counters": dict(self.counters),
+            }
+
+    def summary_table(self, top=15):
+        """Aşama süreleri, sayaçlar ve (varsa) profil özetinden oluşan metin tablosu"""
+        snap = self.snapshot()
+        lines = [f"{'Aşama':<24}{'Çağrı':>8}{'Toplam ms':>12}{'Ort. ms':>10}{'Min ms':>10}{'Maks ms':>10}"]
+        lines.append("-" * len(lines[0]))
+        for name, stats in sorted(snap["stages"].items(), key=lambda item: -item[1]["total_ms"]):
+            lines.append(
+                f"{name:<24}{stats['count']:>8}{stats['total_ms']:>12.2f}{stats['mean_ms']:>10.2f}"
+                f"{stats['min_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+            )
+
+        if snap["counters"]:
+            lines.append("")
+            lines.append(f"{'Sayaç':<32}{'Değer':>10}")
+            for name, value in sorted(snap["counters"].items()):
+                lines.append(f"{name:<32}{value:>10}")
+
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append("")
+            lines.append(f"Bellek: şu an {current / 1024:.1f} KiB, tepe {peak / 1024:.1f} KiB")
+
+        if self.profiler is not None:
+            buffer = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=buffer)
+            stats.sort_stats("cumulative").print_stats(top)
+            lines.append("")
+            lines.append(buffer.getvalue().rstrip())
+        return "\n".join(lines)
+
+    def print_summary(self, stream=None):
+        self.stop()
+        print("\n" + self.summary_table(), file=stream or sys.stderr)
+
+
+def timed(stage_name):
+    """Metodu self.instrumentation üzerinden verilen aşama adıyla zamanlar"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                with self.instrumentation.stage(stage_name):
+                    return await func(self, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.instrumentation.stage(stage_name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced(kind):
+    """Her çağrıyı ayrı bir istek izi olarak kaydeder (GUI eylemleri için)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.instrumentation.trace(kind, action=func.__name__):
+                with self.instrumentation.stage(f"{kind}.{func.__name__}"):
+                    return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+_current = Instrumentation(enabled=False)
+
+
+def get_instrumentation():
+    """Süreç genelinde kullanılan ölçüm katmanını döndürür"""
+    return _current
+
+
+def set_instrumentation(instrumentation):
+    """Varsayılan ölçüm katmanını değiştirir (ör. --profile ile)"""
+    global _current
+    _current = instrumentation
+    return instrumentation
+
+
+def configure_from_argv(argv=None):
+    """--profile ve --trace DOSYA seçeneklerini işler, kalan argümanları döndürür.
+
+    --profile verildiğinde çıkışta özet tablo basılır.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    profile = "--profile" in argv
+    trace_path = None
+    if "--trace" in argv:
+        index = argv.index("--trace")
+        trace_path = argv[index + 1] if index + 1 < len(argv) else "trace.jsonl"
+        del argv[index:index + 2]
+    argv = [arg for arg in argv if arg != "--profile"]
+
+    if profile or trace_path:
+        instrumentation = set_instrumentation(
+            Instrumentation(enabled=True, trace_path=trace_path, profile=profile, trace_memory=profile)
+        ).start()
+        atexit.register(instrumentation.print_summary if profile else instrumentation.stop)
+    return argv
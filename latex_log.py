@@ -0,0 +1,137 @@
+import re
+from collections import deque
+from dataclasses import dataclass, field
+
+ERROR_RE = re.compile(r"^! (?P<message>.*)")
+LINE_RE = re.compile(r"^l\.(?P<line>\d+)")
+MISSING_FILE_RE = re.compile(r"File [`'](?P<name>[^']+?)\.(?P<ext>sty|cls|tex|def)' not found")
+BOX_RE = re.compile(
+    r"^Overfull \\(?P<kind>[hv])box \((?P<amount>[\d.]+pt) too (?:wide|high)\).*?"
+    r"(?:lines? (?P<start>\d+)(?:--(?P<end>\d+))?)?$"
+)
+FATAL_MARKERS = ("! Emergency stop.", "*** (job aborted", "Fatal error occurred", "! ==> Fatal error")
+
+
+@dataclass
+class LatexDiagnostics:
+    """pdflatex çıktısından çıkarılan kısa, yapılandırılmış teşhis bilgisi"""
+    errors: list = field(default_factory=list)
+    missing_packages: list = field(default_factory=list)
+    overfull_boxes: list = field(default_factory=list)
+    fatal: bool = False
+    lines_read: int = 0
+    tail: list = field(default_factory=list)
+
+    @property
+    def ok(self):
+        return not self.errors and not self.fatal
+
+    def summary(self):
+        """Kullanıcıya gösterilecek birkaç satırlık özet"""
+        lines = []
+        for message, line in self.errors:
+            lines.append(f"Hata (satır {line}): {message}" if line else f"Hata: {message}")
+        if self.missing_packages:
+            lines.append("Eksik paketler: " + ", ".join(self.missing_packages))
+        if self.overfull_boxes:
+            lines.append(f"Taşan kutu sayısı: {len(self.overfull_boxes)}")
+        if self.fatal and not self.errors:
+            lines.append("Ölümcül hata: derleme durduruldu")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "errors": [{"message": message, "line": line} for message, line in self.errors],
+            "missing_packages": list(self.missing_packages),
+            "overfull_boxes": [
+                {"kind": kind, "amount": amount, "lines": lines} for kind, amount, lines in self.overfull_boxes
+            ],
+            "fatal": self.fatal,
+            "lines_read": self.lines_read,
+        }
+
+
+class LatexLogAnalyzer:
+    """TeX çıktısını satır satır okuyup tüm çıktıyı bellekte tutmadan teşhis çıkarır"""
+
+    def __init__(self, stop_on_error=True, max_items=20, tail_lines=20):
+        self.stop_on_error = stop_on_error
+        self.max_items = max_items
+        self.tail = deque(maxlen=tail_lines)
+        self.diagnostics = LatexDiagnostics()
+        self.pending_error = None
+
+    def feed(self, line):
+        """Bir çıktı satırını işler; derlemenin durdurulması gerekiyorsa True döner"""
+        line = line.rstrip("\r\n")
+        diag = self.diagnostics
+        diag.lines_read += 1
+        self.tail.append(line)
+
+        if self.pending_error is not None:
+            match = LINE_RE.match(line)
+            if match:
+                self.add_error(self.pending_error, int(match.group("line")))
+                self.pending_error = None
+                return self.should_stop()
+
+        if line.startswith(FATAL_MARKERS):
+            self.flush_pending()
+            diag.fatal = True
+            return True
+
+        match = ERROR_RE.match(line)
+        if match:
+            self.flush_pending()
+            message = match.group("message").strip()
+            missing = MISSING_FILE_RE.search(message)
+            if missing:
+                name = missing.group("name")
+                if name not in diag.missing_packages and len(diag.missing_packages) < self.max_items:
+                    diag.missing_packages.append(name)
+                self.add_error(message, None)
+                diag.fatal = True
+                return True
+            self.pending_error = message
+            return False
+
+        match = BOX_RE.match(line)
+        if match and len(diag.overfull_boxes) < self.max_items:
+            start, end = match.group("start"), match.group("end")
+            lines = [int(start), int(end or start)] if start else None
+            diag.overfull_boxes.append((match.group("kind"), match.group("amount"), lines))
+        return False
+
+    def add_error(self, message, line):
+        if len(self.diagnostics.errors) < self.max_items:
+            self.diagnostics.errors.append((message, line))
+
+    def flush_pending(self):
+        if self.pending_error is not None:
+            self.add_error(self.pending_error, None)
+            self.pending_error = None
+
+    def should_stop(self):
+        if self.stop_on_error and self.diagnostics.errors:
+            self.diagnostics.fatal = True
+            return True
+        return False
+
+    def finish(self):
+        """Akış bittiğinde bekleyen hatayı kapatır ve sonucu döndürür"""
+        self.flush_pending()
+        self.diagnostics.tail = list(self.tail)
+        return self.diagnostics
+
+    def feed_stream(self, lines):
+        """Satır üreten herhangi bir akışı (dosya, pipe) ilk ölümcül hataya kadar işler"""
+        for line in lines:
+            if self.feed(line):
+                break
+        return self.finish()
+
+
+def analyze_log_file(log_path, stop_on_error=False):
+    """Var olan bir .log dosyasını satır satır analiz eder"""
+    with open(log_path, "r", encoding="utf-8", errors="replace") as f:
+        return LatexLogAnalyzer(stop_on_error=stop_on_error).feed_stream(f)
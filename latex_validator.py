@@ -0,0 +1,199 @@
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+PLACEHOLDER_RE = re.compile(r"<<([^<>\n]+)>>")
+# Kaçış dizileri, yorumlar, ortam başlangıç/bitişleri ve çıplak süslü parantezler
+TOKEN_RE = re.compile(r"\\[\\{}%]|%[^\n]*|\\begin\{([^}]*)\}|\\end\{([^}]*)\}|[{}]")
+# format_parameters'ın ürettiği "10.0\\ k\\Ohm" gibi çift kaçışlı birimler
+DOUBLE_ESCAPE_RE = re.compile(r"(?<!\\)\\\\(?=[A-Za-z])")
+
+
+@dataclass(frozen=True)
+class ValidationIssue:
+    """Ön kontrolde bulunan tek bir sorun"""
+    level: str  # "error" veya "warning"
+    code: str
+    message: str
+    line: int = None
+
+    def __str__(self):
+        location = f" (satır {self.line})" if self.line else ""
+        return f"[{self.level}] {self.message}{location}"
+
+
+@dataclass
+class ValidationResult:
+    """Ön kontrol sonucu; hata yoksa derlemeye devam edilebilir"""
+    issues: list = field(default_factory=list)
+
+    @property
+    def errors(self):
+        return [issue for issue in self.issues if issue.level == "error"]
+
+    @property
+    def warnings(self):
+        return [issue for issue in self.issues if issue.level == "warning"]
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def summary(self):
+        return "\n".join(str(issue) for issue in self.issues)
+
+
+def line_of(text, pos):
+    return text.count("\n", 0, pos) + 1
+
+
+def check_structure(text):
+    """Süslü parantez ve \\begin/\\end dengesini tek geçişte kontrol eder"""
+    issues = []
+    brace_stack = []
+    env_stack = []
+    for match in TOKEN_RE.finditer(text):
+        token = match.group(0)
+        if token[0] == "%" or token[0] == "\\" and len(token) == 2:
+            continue
+        if match.group(1) is not None:
+            env_stack.append((match.group(1), match.start()))
+        elif match.group(2) is not None:
+            name = match.group(2)
+            if not env_stack:
+                issues.append(ValidationIssue(
+                    "error", "unmatched_end", f"Açılmamış ortam kapatılıyor: \\end{{{name}}}", line_of(text, match.start())
+                ))
+            else:
+                opened, pos = env_stack.pop()
+                if opened != name:
+                    issues.append(ValidationIssue(
+                        "error", "env_mismatch",
+                        f"\\begin{{{opened}}} (satır {line_of(text, pos)}) \\end{{{name}}} ile kapatılmış",
+                        line_of(text, match.start())
+                    ))
+        elif token == "{":
+            brace_stack.append(match.start())
+        elif brace_stack:
+            brace_stack.pop()
+        else:
+            issues.append(ValidationIssue(
+                "error", "unbalanced_brace", "Fazladan kapanan süslü parantez '}'", line_of(text, match.start())
+            ))
+
+    for pos in brace_stack:
+        issues.append(ValidationIssue(
+            "error", "unbalanced_brace", "Kapanmamış süslü parantez '{'", line_of(text, pos)
+        ))
+    for name, pos in env_stack:
+        issues.append(ValidationIssue(
+            "error", "unclosed_env", f"Kapanmamış ortam: \\begin{{{name}}}", line_of(text, pos)
+        ))
+    return issues
+
+
+@lru_cache(maxsize=128)
+def template_placeholders(template_text):
+    """Şablondaki <<...>> yer tutucularının kümesi (şablon başına önbellekli)"""
+    return frozenset(PLACEHOLDER_RE.findall(template_text))
+
+
+@lru_cache(maxsize=1024)
+def check_parameter_keys(placeholders, keys):
+    """Parametre anahtarlarını şablon yer tutucularıyla karşılaştırır (şablon + anahtar imzası başına önbellekli)"""
+    issues = []
+    for key in sorted(keys - placeholders):
+        issues.append(ValidationIssue("warning", "unknown_key", f"Şablonda karşılığı olmayan parametre: {key}"))
+    return tuple(issues)
+
+
+def check_values(parameters):
+    """Parametre değerlerinde pdflatex'i bozacak çift kaçışları arar"""
+    issues = []
+    for key, value in parameters.items():
+        value = str(value)
+        if "\\\\" in value:
+            issues.append(ValidationIssue(
+                "error", "double_escape", f"{key} değeri çift ters bölü içeriyor: {value!r}"
+            ))
+        if value.count("{") != value.count("}"):
+            issues.append(ValidationIssue(
+                "error", "unbalanced_brace", f"{key} değerinde süslü parantezler dengesiz: {value!r}"
+            ))
+    return issues
+
+
+def validate_document(latex_code, filled=frozenset()):
+    """Şablondan bağımsız belge kontrolleri: kalan yer tutucular, kaçışlar, yapı.
+
+    filled içindeki adlarla yer tutucular doldurulacak sayılır ve raporlanmaz.
+    """
+    issues = []
+    for match in PLACEHOLDER_RE.finditer(latex_code):
+        if match.group(1) in filled:
+            continue
+        issues.append(ValidationIssue(
+            "error", "leftover_placeholder", f"Doldurulmamış yer tutucu: {match.group(0)}",
+            line_of(latex_code, match.start())
+        ))
+    for match in DOUBLE_ESCAPE_RE.finditer(latex_code):
+        issues.append(ValidationIssue(
+            "error", "double_escape", "Çift kaçışlı komut (\\\\ ile başlayan birim)", line_of(latex_code, match.start())
+        ))
+    issues.extend(check_structure(latex_code))
+    return ValidationResult(issues)
+
+
+@lru_cache(maxsize=128)
+def template_issues(template_text, keys):
+    """Şablonun, verilen anahtarlarla doldurulduğunda kalacak belge sorunları.
+
+    Şablon + anahtar imzası başına önbelleklidir. Yer tutucular süslü parantez ve
+    kaçış içermediğinden yapı taraması değerlerden bağımsızdır; bir yer tutucunun
+    adı bu karakterleri içeriyor ya da kaçıştan hemen sonra geliyorsa None döner.
+    """
+    for match in PLACEHOLDER_RE.finditer(template_text):
+        if template_text[match.start() - 1:match.start()] == "\\" or any(char in match.group(1) for char in "{}\\%"):
+            return None
+    return tuple(validate_document(template_text, keys).issues)
+
+
+@lru_cache(maxsize=1024)
+def value_is_inert(value):
+    """Değer şablona konunca çevresinin yapısını bozamaz mı (dengeli, yorumsuz, tek satır)"""
+    if "\n" in value or "<<" in value or value.endswith("\\") or "%" in value.replace("\\%", ""):
+        return False
+    return not check_structure(value) and not DOUBLE_ESCAPE_RE.search(value)
+
+
+def fill_template(template_text, parameters):
+    """generate_latex_code ile aynı yer tutucu değiştirme"""
+    for key, value in parameters.items():
+        template_text = template_text.replace(f"<<{key}>>", str(value))
+    return template_text
+
+
+def filled_template_issues(latex_code, template_text, parameters):
+    """Kod şablonun bu parametrelerle doldurulmuş hâliyse önbellekli sorunlar, değilse None"""
+    issues = template_issues(template_text, frozenset(parameters))
+    if issues is None or not all(value_is_inert(str(value)) for value in parameters.values()):
+        return None
+    return issues if latex_code == fill_template(template_text, parameters) else None
+
+
+def validate_latex(latex_code, template_text=None, parameters=None):
+    """Derlemeden önce çalışan hızlı, saf Python LaTeX ön kontrolü.
+
+    Kod şablonun parametrelerle doldurulmuş hâliyse yalnızca değerler taranır; şablonun
+    yapı taraması önbellekten gelir. Diğer belgeler (ör. analiz grafikli) baştan taranır.
+    """
+    cached = None
+    if template_text is not None and parameters is not None:
+        cached = filled_template_issues(latex_code, template_text, parameters)
+    result = ValidationResult(list(cached)) if cached is not None else validate_document(latex_code)
+    if parameters is not None:
+        result.issues.extend(check_values(parameters))
+        if template_text is not None:
+            placeholders = template_placeholders(template_text)
+            result.issues.extend(check_parameter_keys(placeholders, frozenset(parameters)))
+    return result
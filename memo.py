@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_FILE = ".lock"
+
+
+def canonical_key(*parts):
+    """Parçaların sıralı JSON biçiminden kararlı önbellek anahtarı"""
+    text = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def canonical_values(values):
+    """Kayan nokta gürültüsü anahtarı değiştirmesin diye 12 anlamlı basamağa yuvarlar"""
+    return {name: float(f"{float(value):.12g}") for name, value in values.items()}
+
+
+@contextmanager
+def file_lock(path, shared=False):
+    """Süreçler arası kilit (POSIX'te flock, Windows'ta msvcrt; Windows'ta her kilit özeldir)"""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def replace_atomic(path, write):
+    """write(geçici yol) ile yazılan dosyayı os.replace ile yayımlar.
+
+    Geçici ad mkstemp ile üretilir; aynı hedefe yazan süreçler de iş parçacıkları da
+    birbirinin dosyasına dokunmaz.
+    """
+    path = Path(path)
+    fd, name = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    os.close(fd)
+    tmp = Path(name)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class MemoStore:
+    """Süreçler arasında paylaşılan, diskte tutulan sonuç önbelleği.
+
+    Her kayıt <anahtar>.json ve varsa <anahtar>.pdf dosyasıdır. Yazma ve temizleme
+    dizin kilidini özel, okuma paylaşımlı alır; dosyalar geçici addan os.replace ile
+    yayımlanır. Süresi (ttl) dolan kayıtlar okunmaz; kayıt sayısı veya toplam boyut
+    sınırı aşılınca en uzun süredir kullanılmayanlar silinir.
+    """
+
+    def __init__(self, directory, ttl=7 * 86400, max_entries=500, max_bytes=200 << 20):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / "locks").mkdir(exist_ok=True)
+
+    def path(self, key, suffix=".json"):
+        return self.directory / f"{key}{suffix}"
+
+    def expired(self, data, now=None):
+        return self.ttl is not None and (now or time.time()) - data.get("created", 0) > self.ttl
+
+    def get(self, key):
+        """Geçerli kaydı sözlük olarak döndürür; yoksa, süresi dolmuşsa veya PDF'i kayıpsa None"""
+        with file_lock(self.directory / LOCK_FILE, shared=True):
+            meta = self.path(key)
+            try:
+                data = json.loads(meta.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                return None
+            if self.expired(data):
+                return None
+            if data.get("pdf") and not self.path(key, ".pdf").exists():
+                return None
+            os.utime(meta)  # LRU sırası için son kullanım
+        if data.get("pdf"):
+            data["pdf_path"] = str(self.path(key, ".pdf"))
+        return data
+
+    def put(self, key, data, pdf_path=None):
+        """Kaydı (ve PDF'in kopyasını) yazar, ardından sınırları uygular"""
+        data = {**data, "created": time.time(), "pdf": bool(pdf_path)}
+        with file_lock(self.directory / LOCK_FILE):
+            if pdf_path:
+                replace_atomic(self.path(key, ".pdf"), lambda tmp: shutil.copyfile(pdf_path, tmp))
+            replace_atomic(
+                self.path(key),
+                lambda tmp: tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            )
+            self._evict()
+        if pdf_path:
+            data["pdf_path"] = str(self.path(key, ".pdf"))
+        return data
+
+    @contextmanager
+    def computing(self, key):
+        """Aynı anahtarı üreten süreçleri sıraya sokar; girişte önbellek yeniden kontrol edilmelidir"""
+        lock = self.directory / "locks" / f"{key}.lock"
+        with file_lock(lock):
+            os.utime(lock)
+            yield
+
+    def entries(self):
+        """(son kullanım, toplam bayt, anahtar, kayıt) listesi"""
+        entries = []
+        for meta in self.directory.glob("*.json"):
+            try:
+                stat = meta.stat()
+                data = json.loads(meta.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            pdf = meta.with_suffix(".pdf")
+            size = stat.st_size + (pdf.stat().st_size if pdf.exists() else 0)
+            entries.append((stat.st_mtime, size, meta.stem, data))
+        return entries
+
+    def remove(self, key):
+        for suffix in (".json", ".pdf"):
+            self.path(key, suffix).unlink(missing_ok=True)
+
+    def _evict(self):
+        now = time.time()
+        live = []
+        for entry in self.entries():
+            if self.expired(entry[3], now):
+                self.remove(entry[2])
+            else:
+                live.append(entry)
+        live.sort()
+        total = sum(size for _, size, _, _ in live)
+        removed = 0
+        while live and (len(live) > self.max_entries or total > self.max_bytes):
+            _, size, key, _ = live.pop(0)
+            self.remove(key)
+            total -= size
+            removed += 1
+        # Anahtar kilitleri boştur; yalnızca uzun süredir kullanılmayanlar silinir
+        if self.ttl is not None:
+            for lock in (self.directory / "locks").glob("*.lock"):
+                try:
+                    if now - lock.stat().st_mtime > self.ttl:
+                        lock.unlink()
+                except OSError:
+                    pass
+        return removed
+
+    def evict(self):
+        """Süresi dolan ve sınırı aşan kayıtları siler; silinen sınır fazlası sayısını döndürür"""
+        with file_lock(self.directory / LOCK_FILE):
+            return self._evict()
+
+    def clear(self):
+        with file_lock(self.directory / LOCK_FILE):
+            for _, _, key, _ in self.entries():
+                self.remove(key)
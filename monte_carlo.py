@@ -0,0 +1,306 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from circuit_calculations import CIRCUIT_SPECS, calculate, find_circuit_spec, parse_numeric_value
+
+# Bileşen önekine göre varsayılan toleranslar (Vcc gibi kaynaklar sabit kabul edilir)
+DEFAULT_TOLERANCES = {"R": 0.01, "C": 0.05}
+PERCENTILES = (0.135, 2.5, 50.0, 97.5, 99.865)
+
+
+# --- Vektörel performans ölçütleri ------------------------------------------
+#
+# Her fonksiyon bileşen dizilerinden (örnek başına bir değer) ölçüt dizileri üretir.
+
+def _inverting_metrics(c):
+    return {"gain": -c["R2"] / c["R1"]}
+
+
+def _non_inverting_metrics(c):
+    return {"gain": 1 + c["R2"] / c["R1"]}
+
+
+def _difference_metrics(c):
+    # R4/R2 ile R3/R1 arasındaki uyumsuzluk ortak mod kazancını sıfırdan uzaklaştırır
+    divider = c["R4"] / (c["R2"] + c["R4"])
+    inverting = c["R3"] / c["R1"]
+    non_inverting = divider * (1 + inverting)
+    differential = (non_inverting + inverting) / 2
+    common_mode = np.abs(non_inverting - inverting)
+    cmrr = 20 * np.log10(np.abs(differential) / np.maximum(common_mode, 1e-15))
+    return {"gain": differential, "cmrr_db": cmrr}
+
+
+def _rc_metrics(c):
+    return {"cutoff": 1 / (2 * math.pi * c["R"] * c["C"])}
+
+
+def _summing_metrics(c):
+    return {"gain1": -c["Rf"] / c["R1"], "gain2": -c["Rf"] / c["R2"]}
+
+
+def _schmitt_metrics(c):
+    vut = c["Vcc"] * c["R2"] / (c["R1"] + c["R2"])
+    return {"vut": vut, "vlt": -vut}
+
+
+def _tau_metrics(c):
+    return {"tau": c["R"] * c["C"]}
+
+
+METRICS = {
+    "inverting": _inverting_metrics,
+    "non_inverting": _non_inverting_metrics,
+    "difference": _difference_metrics,
+    "low_pass": _rc_metrics,
+    "high_pass": _rc_metrics,
+    "summing": _summing_metrics,
+    "schmitt": _schmitt_metrics,
+    "differentiator": _tau_metrics,
+    "integrator": _tau_metrics,
+}
+
+# Verim penceresine dahil edilmeyen, yalnızca raporlanan ölçütler
+REPORT_ONLY = {"cmrr_db"}
+
+
+@dataclass
+class MetricStats:
+    """Bir ölçütün dağılımı ve spesifikasyon penceresine göre verimi"""
+    name: str
+    nominal: float
+    mean: float
+    std: float
+    percentiles: dict
+    window: tuple = None
+    yield_: float = None
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "nominal": self.nominal,
+            "mean": self.mean,
+            "std": self.std,
+            "percentiles": self.percentiles,
+            "window": list(self.window) if self.window else None,
+            "yield": self.yield_,
+        }
+
+
+@dataclass
+class MonteCarloResult:
+    """Tek bir tasarımın Monte Carlo tolerans analizi sonucu"""
+    circuit_type: str
+    kind: str
+    samples: int
+    tolerances: dict
+    distribution: str
+    metrics: list = field(default_factory=list)
+    yield_: float = None
+    duration: float = 0.0
+
+    def to_dict(self):
+        return {
+            "circuit_type": self.circuit_type,
+            "kind": self.kind,
+            "samples": self.samples,
+            "tolerances": self.tolerances,
+            "distribution": self.distribution,
+            "metrics": [metric.to_dict() for metric in self.metrics],
+            "yield": self.yield_,
+            "duration": round(self.duration, 4),
+        }
+
+    def summary_lines(self):
+        lines = [f"{self.circuit_type} ({self.samples} örnek, {self.distribution})"]
+        for metric in self.metrics:
+            low, high = metric.percentiles[str(PERCENTILES[0])], metric.percentiles[str(PERCENTILES[-1])]
+            line = f"  {metric.name:<8} nominal {metric.nominal:.5g}  ±3σ aralığı [{low:.5g}, {high:.5g}]"
+            if metric.yield_ is not None:
+                line += f"  verim %{metric.yield_ * 100:.2f}"
+            lines.append(line)
+        if self.yield_ is not None:
+            lines.append(f"  Toplam verim: %{self.yield_ * 100:.2f}")
+        return lines
+
+
+def tolerance_of(name, tolerances):
+    return tolerances.get(name, tolerances.get(name[:1], 0.0))
+
+
+def sample_components(components, tolerances, samples, rng, distribution="uniform"):
+    """Tüm bileşenler için tek seferde (bileşen sayısı x örnek) matrisi çeker.
+
+    uniform: ±tolerans içinde düzgün; normal: tolerans = 3σ, ±tolerans'ta kırpılmış.
+    """
+    names = list(components)
+    nominal = np.array([components[name] for name in names], dtype=float)[:, None]
+    spread = np.array([tolerance_of(name, tolerances) for name in names], dtype=float)[:, None]
+    if distribution == "uniform":
+        deviation = rng.uniform(-1.0, 1.0, size=(len(names), samples))
+    elif distribution == "normal":
+        deviation = np.clip(rng.standard_normal(size=(len(names), samples)) / 3.0, -1.0, 1.0)
+    else:
+        raise ValueError(f"Bilinmeyen dağılım: {distribution}")
+    values = nominal * (1.0 + spread * deviation)
+    return dict(zip(names, values))
+
+
+def spec_window(nominal, window):
+    """Göreli pencere (ör. 0.02 = nominalin ±%2'si) veya mutlak (alt, üst) çifti"""
+    if window is None:
+        return None
+    if isinstance(window, (int, float)):
+        bounds = (nominal * (1 - window), nominal * (1 + window))
+        return (min(bounds), max(bounds))
+    return tuple(window)
+
+
+def run_monte_carlo(result, tolerances=None, samples=100000, windows=None, default_window=0.05,
+                    distribution="uniform", seed=None):
+    """DesignResult için Monte Carlo tolerans analizi.
+
+    windows ölçüt adından pencereye eşlenir; verilmeyen ölçütler için default_window kullanılır.
+    """
+    metric_func = METRICS.get(result.kind)
+    if metric_func is None:
+        raise ValueError(f"Tolerans analizi tanımlı olmayan devre: {result.circuit_type}")
+    tolerances = {**DEFAULT_TOLERANCES, **(tolerances or {})}
+    windows = windows or {}
+
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    components = result.components
+    nominal = metric_func({name: np.float64(value) for name, value in components.items()})
+    sampled = metric_func(sample_components(components, tolerances, samples, rng, distribution))
+
+    stats = []
+    passing = np.ones(samples, dtype=bool)
+    for name, values in sampled.items():
+        window = spec_window(float(nominal[name]), windows.get(name, None if name in REPORT_ONLY else default_window))
+        metric_yield = None
+        if window is not None:
+            inside = (values >= window[0]) & (values <= window[1])
+            passing &= inside
+            metric_yield = float(inside.mean())
+        stats.append(MetricStats(
+            name=name,
+            nominal=float(nominal[name]),
+            mean=float(values.mean()),
+            std=float(values.std()),
+            percentiles={str(p): float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))},
+            window=window,
+            yield_=metric_yield,
+        ))
+
+    has_window = any(metric.window is not None for metric in stats)
+    return MonteCarloResult(
+        circuit_type=result.circuit_type,
+        kind=result.kind,
+        samples=samples,
+        tolerances={name: tolerance_of(name, tolerances) for name in components},
+        distribution=distribution,
+        metrics=stats,
+        yield_=float(passing.mean()) if has_window else None,
+        duration=time.perf_counter() - started,
+    )
+
+
+def _run_job(job):
+    result, seed, kwargs = job
+    return run_monte_carlo(result, seed=seed, **kwargs)
+
+
+def run_many(results, workers=None, seed=None, **kwargs):
+    """Birden çok tasarımı süreç havuzunda paralel analiz eder (girdi sırasıyla döner).
+
+    Her tasarıma SeedSequence'tan türetilmiş bağımsız bir tohum verilir; sonuçlar
+    işçi sayısından bağımsız olarak tekrarlanabilir.
+    """
+    results = list(results)
+    seeds = np.random.SeedSequence(seed).spawn(len(results))
+    jobs = [(result, child, kwargs) for result, child in zip(results, seeds)]
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers <= 1 or len(jobs) <= 1:
+        return [_run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_job, jobs))
+
+
+def parse_assignments(items, numeric=True):
+    """'R=1%' / 'gain=9.5:10.5' biçimindeki argümanları sözlüğe çevirir"""
+    parsed = {}
+    for item in items or []:
+        key, _, value = item.partition("=")
+        if not value:
+            raise ValueError(f"Geçersiz atama: {item}")
+        if not numeric:
+            parsed[key] = value
+        elif ":" in value:
+            low, high = value.split(":", 1)
+            parsed[key] = (parse_numeric_value(low), parse_numeric_value(high))
+        elif value.endswith("%"):
+            parsed[key] = float(value[:-1]) / 100
+        else:
+            parsed[key] = parse_numeric_value(value)
+    return parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tasarımlar için Monte Carlo tolerans ve verim analizi")
+    parser.add_argument("circuits", nargs="*", help="Devre tipleri (varsayılan: analizi tanımlı tüm devreler)")
+    parser.add_argument("--value", action="append", metavar="AD=DEĞER", help="Hesaplama girdisi, ör. gain=10")
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--tolerance", action="append", metavar="ÖNEK=%", help="Ör. R=1%% C=5%% (varsayılan R=1%%, C=5%%)")
+    parser.add_argument("--window", action="append", metavar="ÖLÇÜT=PENCERE",
+                        help="Göreli (gain=2%%) veya mutlak (cutoff=950:1050) spesifikasyon penceresi")
+    parser.add_argument("--default-window", type=float, default=0.05)
+    parser.add_argument("--distribution", choices=("uniform", "normal"), default="uniform")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    try:
+        values = parse_assignments(args.value, numeric=False)
+        tolerances = parse_assignments(args.tolerance)
+        windows = parse_assignments(args.window)
+    except ValueError as e:
+        parser.error(str(e))
+    circuit_types = args.circuits or [spec.circuit_type for spec in CIRCUIT_SPECS if spec.kind in METRICS]
+    results = []
+    for circuit_type in circuit_types:
+        spec = find_circuit_spec(circuit_type)
+        if spec is None:
+            parser.error(f"Bilinmeyen devre tipi: {circuit_type}")
+        known = {input_spec.name for input_spec in spec.inputs}
+        results.append(calculate(circuit_type, {k: v for k, v in values.items() if k in known}))
+
+    reports = run_many(
+        results,
+        workers=args.workers,
+        seed=args.seed,
+        tolerances=tolerances,
+        samples=args.samples,
+        windows=windows,
+        default_window=args.default_window,
+        distribution=args.distribution,
+    )
+    for report in reports:
+        print("\n".join(report.summary_lines()))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([report.to_dict() for report in reports], f, ensure_ascii=False, indent=2)
+        print(f"\nSonuçlar yazıldı: {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
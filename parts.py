@@ -0,0 +1,219 @@
+import json
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from circuit_analysis import NETWORKS, OpAmpModel
+from quantity import parse_numeric_value
+
+PARTS_FILE = "opamp_parts.json"
+# Gerçek op-amp kontrolünün varsayılanları; yapılandırmadaki aynı adlı anahtarlar bunları ezer
+CHECK_DEFAULTS = {
+    "default_voltage": "15",  # ± besleme; toplam besleme iki katıdır
+    "signal_bandwidth": 20e3,  # Hz, yükselteçlerin geçirmesi gereken en yüksek frekans
+    "signal_amplitude": 1.0,  # V, giriş tepe genliği
+    "gbw_margin": 10.0,  # kapalı çevrim bant genişliği / sinyal frekansı en az bu kadar
+    "max_bias_offset": 0.01,  # V, giriş kutuplama akımının çıkışta izin verilen ofseti
+    "opamp_suggestions": 5,
+}
+
+
+@dataclass(frozen=True)
+class PartLibrary:
+    """Op-amp kütüphanesi; sütunlar GBW'ye göre sıralı numpy dizileridir.
+
+    GBW sırası ve slew/besleme için hazır sıralamalar indeks görevi görür: bir grup
+    tasarımın en küçük ihtiyaçlarını karşılamayan parçalar ikili aramayla baştan
+    elenir, kalanlar tüm tasarımlarla tek seferde (tasarım × parça) karşılaştırılır.
+    """
+    names: tuple
+    gbw: np.ndarray  # Hz
+    slew_rate: np.ndarray  # V/s
+    supply_min: np.ndarray  # V, toplam besleme
+    supply_max: np.ndarray
+    input_bias: np.ndarray  # A
+    a0: np.ndarray
+    slew_order: np.ndarray  # slew_rate'e göre artan sıra
+    supply_order: np.ndarray  # supply_max'a göre artan sıra
+    slew_sorted: np.ndarray
+    supply_max_sorted: np.ndarray
+
+    @classmethod
+    def from_records(cls, records):
+        records = sorted(records, key=lambda part: float(part["gbw"]))
+        column = lambda key: np.array([float(part[key]) for part in records])
+        slew_rate, supply_max = column("slew_rate"), column("supply_max")
+        slew_order = np.argsort(slew_rate, kind="stable")
+        supply_order = np.argsort(supply_max, kind="stable")
+        return cls(
+            names=tuple(part["name"] for part in records),
+            gbw=column("gbw"),
+            slew_rate=slew_rate,
+            supply_min=column("supply_min"),
+            supply_max=supply_max,
+            input_bias=column("input_bias"),
+            a0=column("a0"),
+            slew_order=slew_order,
+            supply_order=supply_order,
+            slew_sorted=slew_rate[slew_order],
+            supply_max_sorted=supply_max[supply_order],
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def candidates(self, gbw=0.0, slew_rate=0.0, supply=None):
+        """GBW ve slew rate alt sınırlarını ve besleme aralığını sağlayan parçaların sıraları"""
+        keep = np.zeros(len(self), dtype=bool)
+        keep[np.searchsorted(self.gbw, gbw, side="left"):] = True
+        fast = np.zeros(len(self), dtype=bool)
+        fast[self.slew_order[np.searchsorted(self.slew_sorted, slew_rate, side="left"):]] = True
+        keep &= fast
+        if supply is not None:
+            wide = np.zeros(len(self), dtype=bool)
+            wide[self.supply_order[np.searchsorted(self.supply_max_sorted, supply, side="left"):]] = True
+            keep &= wide & (self.supply_min <= supply)
+        return np.flatnonzero(keep)
+
+    def model(self, name):
+        """Parçanın analizde kullanılabilecek tek kutuplu modeli"""
+        index = self.names.index(name)
+        return OpAmpModel(name, gbw=float(self.gbw[index]), a0=float(self.a0[index]))
+
+
+@lru_cache(maxsize=8)
+def load_library(path=PARTS_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return PartLibrary.from_records(json.load(f))
+
+
+@dataclass(frozen=True)
+class Requirements:
+    """Tasarım başına (satır) gerçek op-amp ihtiyaçları"""
+    frequency: np.ndarray  # Hz, sinyal frekansı
+    noise_gain: np.ndarray  # |NG| sinyal frekansında
+    gbw: np.ndarray  # Hz, gereken en küçük GBW
+    slew_rate: np.ndarray  # V/s
+    output_peak: np.ndarray  # V
+    feedback_resistance: np.ndarray  # Ω, kutuplama akımının çıkış ofsetine dönüştüğü direnç
+    supply: float  # V, toplam besleme
+
+
+def settings(config=None):
+    return {**CHECK_DEFAULTS, **{key: value for key, value in (config or {}).items() if key in CHECK_DEFAULTS}}
+
+
+def signal_frequency(result, bandwidth):
+    targets = result.targets
+    if result.kind == "low_pass":
+        return targets["cutoff"]
+    if result.kind == "high_pass":
+        return max(targets["cutoff"], bandwidth)
+    if "tau" in targets:
+        return 1 / (2 * math.pi * targets["tau"])
+    return bandwidth
+
+
+def requirements(results, config=None):
+    """Tasarımların bant genişliği, slew ve kutuplama ihtiyaçlarını dizilere çıkarır.
+
+    Gürültü kazancı ve sinyal kazancı circuit_analysis ağlarından sinyal
+    frekansında hesaplanır; ağı olmayan devrelerde (Schmitt) bant genişliği
+    şartı yoktur ve çıkış beslemeye kadar salınır.
+    """
+    options = settings(config)
+    supply = parse_numeric_value(options["default_voltage"])
+    bandwidth, amplitude = float(options["signal_bandwidth"]), float(options["signal_amplitude"])
+    count = len(results)
+    frequency, noise_gain, gain = np.empty(count), np.zeros(count), np.full(count, np.inf)
+    feedback = np.zeros(count)
+    for i, result in enumerate(results):
+        frequency[i] = signal_frequency(result, bandwidth)
+        components = result.components
+        feedback[i] = max((value for key, value in components.items() if key.startswith("R")), default=0.0)
+        network = NETWORKS.get(result.kind)
+        if network is None:
+            continue
+        s = 2j * math.pi * frequency[i]
+        (g_num, g_den), (n_num, n_den) = network(components)
+        gain[i] = abs(np.polyval(g_num, s) / np.polyval(g_den, s))
+        noise_gain[i] = abs(np.polyval(n_num, s) / np.polyval(n_den, s))
+    output_peak = np.minimum(gain * amplitude, supply)
+    return Requirements(
+        frequency=frequency,
+        noise_gain=noise_gain,
+        gbw=noise_gain * frequency * float(options["gbw_margin"]),
+        slew_rate=2 * math.pi * frequency * output_peak,
+        output_peak=output_peak,
+        feedback_resistance=feedback,
+        supply=2 * supply,
+    )
+
+
+def rank_parts(results, library=None, config=None, top=None, need=None):
+    """Her tasarım için uygun op-amp'ların kenar payına göre sıralı listesi.
+
+    Kontroller (GBW, slew rate, besleme aralığı, kutuplama ofseti) tüm tasarım ×
+    parça matrisi üzerinde vektörel yapılır. Kenar payı en zayıf kontrolün oranıdır
+    (1'in üzeri şart sağlanıyor demektir); listeler en yüksek paydan başlar.
+    """
+    library = library or load_library()
+    options = settings(config)
+    top = options["opamp_suggestions"] if top is None else top
+    need = need or requirements(results, config)
+    if not len(results):
+        return []
+    # İndeks: grubun en küçük ihtiyaçlarını karşılamayan parçalar hiç karşılaştırılmaz
+    index = library.candidates(need.gbw.min(), need.slew_rate.min(), need.supply)
+    gbw, slew = library.gbw[index], library.slew_rate[index]
+    bias_offset = need.feedback_resistance[:, None] * library.input_bias[index]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margins = np.stack([
+            np.where(need.gbw[:, None] > 0, gbw / need.gbw[:, None], np.inf),
+            slew / need.slew_rate[:, None],
+            np.where(bias_offset > 0, float(options["max_bias_offset"]) / bias_offset, np.inf),
+        ])
+    margin = margins.min(axis=0)
+    suitable = margin >= 1
+    # Uygun olmayanlar inf ile sona itilir; argsort azalan kenar payı verir
+    order = np.argsort(np.where(suitable, -margin, np.inf), axis=1, kind="stable")
+
+    ranked = []
+    for row in range(len(results)):
+        parts = []
+        for column in order[row, :top]:
+            if not suitable[row, column]:
+                break
+            part = index[column]
+            parts.append({
+                "part": library.names[part],
+                "margin": round(float(min(margin[row, column], 1e6)), 3),
+                "bandwidth": float(library.gbw[part] / max(need.noise_gain[row], 1.0)),
+                "slew_rate": float(library.slew_rate[part]),
+            })
+        ranked.append(parts)
+    return ranked
+
+
+def check_designs(results, library=None, config=None, top=None):
+    """Tasarımların ihtiyaçları ve uygun op-amp listeleri (JSON'a yazılabilir); tarama grupları için"""
+    need = requirements(results, config)
+    ranked = rank_parts(results, library, config, top, need)
+    return [
+        {
+            "required_gbw": float(need.gbw[row]),
+            "required_slew_rate": float(need.slew_rate[row]),
+            "signal_frequency": float(need.frequency[row]),
+            "supply": need.supply,
+            "parts": parts,
+        }
+        for row, parts in enumerate(ranked)
+    ]
+
+
+def check_design(result, library=None, config=None, top=None):
+    """Tek tasarımın ihtiyaçları ve uygun op-amp listesi"""
+    return check_designs([result], library, config, top)[0]
@@ -0,0 +1,226 @@
+import json
+import re
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from cascade import COMPOSITES, composition_latex, is_multi_stage
+from circuit_analysis import MODELS, analyze
+from circuit_calculations import find_circuit_spec
+
+UNSAFE_NAME = re.compile(r"[^\w.-]+")
+
+
+@dataclass(frozen=True)
+class DesignOptions:
+    """Bir tasarım isteğinde hangi çıktıların üretileceği"""
+    analysis_model: str = None  # verilirse analiz özeti eklenir
+    latex: bool = False
+    svg: bool = False
+    compile: bool = False
+    open_result: bool = False
+
+    def override(self, item):
+        """NDJSON isteğindeki alanlar ("compile", "latex", "svg", "analysis") varsayılanları ezer"""
+        changes = {key: bool(item[key]) for key in ("latex", "svg", "compile") if key in item}
+        if "analysis" in item:
+            analysis = item["analysis"]
+            changes["analysis_model"] = analysis if isinstance(analysis, str) else ("uA741" if analysis else None)
+            if isinstance(analysis, str) and analysis not in MODELS:
+                raise ValueError(f"Bilinmeyen op-amp modeli: {analysis} (modeller: {', '.join(sorted(MODELS))})")
+        return replace(self, **changes) if changes else self
+
+
+def unknown_inputs(circuit_type, values):
+    """Devrenin girdisi olmayan adlar için hata metni (hepsi geçerliyse boş)"""
+    spec = find_circuit_spec(circuit_type)
+    names = [item.name for item in spec.inputs] if spec else []
+    extra = [name for name in values if name not in names]
+    if not extra:
+        return ""
+    return f"{circuit_type} için bilinmeyen girdi: {', '.join(extra)} (girdiler: {', '.join(names) or '-'})"
+
+
+def compile_record(designer, latex_code, filename, result=None, parameters=None, open_result=False):
+    """Tasarım önbelleği ve paylaşılan derleme deposu üzerinden PDF üretir"""
+    pdf_path = Path(designer.config["output_dir"]) / f"{filename}.pdf"
+    cached = designer.cached_design(result)
+    if cached is not None:
+        designer.restore_cached(cached, filename, open_result)
+        return {"success": True, "pdf_path": str(pdf_path), "cached": True}
+    with designer.computing(result):
+        if not designer.compile_latex(latex_code, filename, open_result):
+            return {"success": False, "error": "LaTeX derlenemedi"}
+        designer.store_design(result, parameters, latex_code, pdf_path)
+    return {"success": True, "pdf_path": str(pdf_path), "cached": False}
+
+
+def design_record(designer, request, circuit_type=None, values=None, options=DesignOptions(), suffix=None):
+    """Tek bir tasarım isteğinin tam kaydı (eşleştirme, çıkarım, hesaplama, isteğe bağlı çıktı).
+
+    values verilen girdiler sorgudan çıkarılanları ezer. suffix çıktı dosya adına
+    eklenir; aynı devre tipini eşzamanlı üreten istekler birbirinin dosyasını ezmez.
+    Geçersiz girdiler için ValueError fırlatır.
+    """
+    values = dict(values or {})
+    record = {"request": request}
+    query = None
+    if circuit_type is None and request and is_multi_stage(request):
+        circuit_type = "composition"
+    elif circuit_type is None:
+        if not request:
+            return {**record, "error": "İstek metni veya devre tipi gerekli"}
+        circuit, query = designer.match_query(request)
+        if circuit is None:
+            return {**record, "error": "Eşleşen devre bulunamadı"}
+        circuit_type = circuit["circuit_type"]
+        record["matched_input"] = circuit.get("input")
+
+    if circuit_type == "composition" or circuit_type in COMPOSITES:
+        composition = designer.compose(request or "", None if circuit_type == "composition" else circuit_type)
+        record.update(composition.to_dict())
+        latex_code, filename = composition_latex(composition), designer.composition_filename(composition)
+        result = None
+    else:
+        unknown = unknown_inputs(circuit_type, values)
+        if unknown:
+            return {**record, "error": unknown}
+        # Devre tipi verilip eşleştirme atlanmışsa değerler yine istek metninden çıkarılır (NLP'siz)
+        query = query if query is not None else request
+        extracted, unused = designer.extract_inputs(circuit_type, query) if query else ({}, [])
+        values = {**extracted, **values}
+        record["circuit_type"] = circuit_type
+        record["values"] = values
+        record["unused"] = [{"value": item.value, "unit": item.unit} for item in unused]
+        result = designer.calculate(circuit_type, values)
+        record["result"] = result.to_json()
+        record["parameters"] = result.to_template_parameters()
+        if options.analysis_model:
+            record["analysis"] = analyze(result, MODELS[options.analysis_model])
+        opamps = designer.suggest_opamps(result)
+        if opamps is not None:
+            record["opamps"] = opamps
+        filename = designer.circuit_filename(circuit_type)
+        if suffix:
+            filename = f"{filename}_{suffix}"
+        if options.svg:
+            record["svg_path"] = str(designer.export_svg(result, filename))
+        latex_code = None
+        if options.compile or options.latex:
+            latex_code = designer.generate_latex_code(circuit_type, record["parameters"], result)
+            if latex_code is None:
+                return {**record, "error": f"Şablon bulunamadı: {circuit_type}"}
+
+    if options.latex:
+        record["latex"] = latex_code
+    if options.compile:
+        record.update(compile_record(
+            designer, latex_code, filename, result, record.get("parameters"), options.open_result
+        ))
+    return record
+
+
+# --- NDJSON akışı ------------------------------------------------------------
+
+def read_requests(lines):
+    """NDJSON satırlarını tek tek istek sözlüğüne çevirir; düz metin satırı istek metni sayılır.
+
+    Her isteğe (yoksa) satır numarası kimlik olarak verilir; hatalı satırlar hata
+    kaydı olarak akışta kalır, akış durmaz.
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            try:
+                item = json.loads(line)
+            except ValueError as e:
+                yield {"id": number, "error": f"Geçersiz JSON: {e}"}
+                continue
+        else:
+            item = {"request": line}
+        item.setdefault("id", number)
+        yield item
+
+
+def invalid_fields(item):
+    """İstek alanlarının tip hatası için metin (hepsi geçerliyse boş)"""
+    for key in ("request", "circuit"):
+        if item.get(key) is not None and not isinstance(item[key], str):
+            return f"'{key}' metin olmalı"
+    if item.get("values") is not None and not isinstance(item["values"], dict):
+        return "'values' nesne (ad → değer) olmalı"
+    return ""
+
+
+def process_request(designer, item, options=DesignOptions()):
+    """Tek NDJSON isteğini işler; hiçbir hata akışın dışına sızmaz"""
+    if "error" in item:
+        return item
+    request_id = item["id"]
+    invalid = invalid_fields(item)
+    if invalid:
+        return {"id": request_id, "request": item.get("request"), "error": invalid}
+    try:
+        record = design_record(
+            designer, item.get("request"), item.get("circuit"),
+            {key: str(value) for key, value in (item.get("values") or {}).items()},
+            options.override(item), UNSAFE_NAME.sub("_", str(request_id))
+        )
+    except (ValueError, KeyError, OSError) as e:
+        record = {"request": item.get("request"), "error": str(e)}
+    except Exception as e:
+        # Beklenmeyen hata da yalnızca bu isteğin kaydı olur; akış sürer
+        record = {"request": item.get("request"), "error": f"{type(e).__name__}: {e}"}
+    return {"id": request_id, **record}
+
+
+def bounded_map(func, items, workers=4, ordered=False):
+    """func'ı items üzerinde en fazla workers eşzamanlı iş ile uygular ve sonuçları üretir.
+
+    Yeni girdi ancak bir iş bittiğinde okunur (geri basınç); bellekte en fazla
+    workers kadar bekleyen iş bulunur, akışın uzunluğu önemsizdir. ordered False
+    ise sonuçlar bitiş sırasıyla, True ise girdi sırasıyla döner.
+    """
+    if workers <= 1:
+        yield from map(func, items)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque() if ordered else set()
+        for item in items:
+            if len(pending) >= workers:
+                if ordered:
+                    yield pending.popleft().result()
+                else:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            future = pool.submit(func, item)
+            if ordered:
+                pending.append(future)
+            else:
+                pending.add(future)
+        if ordered:
+            while pending:
+                yield pending.popleft().result()
+        else:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+
+def run_stream(designer, lines, options=DesignOptions(), workers=4, ordered=False):
+    """Satır akışını eşleştirme → hesaplama → çizim → (isteğe bağlı) derleme hattından geçirir.
+
+    Tasarımcının tembel yüklenen parçaları (NLP modeli, dataset, eşleştirme indeksi,
+    tasarım önbelleği, derleme deposu) iş parçacıkları başlamadan hazırlanır; sonrasında istekler paylaşılan tasarımcıyla
+    eşzamanlı işlenir. Derleme ayrı pdflatex süreçlerinde olduğundan paralelleşir.
+    """
+    if designer.dataset and designer.match_index is None:
+        designer.build_match_index()
+    designer.get_memo()
+    designer.get_artifacts()
+    return bounded_map(lambda item: process_request(designer, item, options), read_requests(lines), workers, ordered)
@@ -0,0 +1,109 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+SI_PREFIXES = {
+    "f": 1e-15, "p": 1e-12, "n": 1e-9,
+    "u": 1e-6, "µ": 1e-6, "μ": 1e-6,
+    "m": 1e-3, "k": 1e3, "K": 1e3, "M": 1e6, "G": 1e9,
+}
+# Yazım → kanonik birim ("x": kazanç katı, "sn": saniye)
+UNITS = {
+    "Ω": "Ω", "Ω": "Ω", "ohm": "Ω", "Ohm": "Ω", "R": "Ω",
+    "F": "F", "H": "H", "Hz": "Hz", "V": "V", "A": "A",
+    "s": "s", "sn": "s", "x": "x", "X": "x", "kat": "x",
+}
+
+_PREFIX = "[" + "".join(SI_PREFIXES) + "]"
+_UNIT = "|".join(sorted(map(re.escape, UNITS), key=len, reverse=True))
+# "10k", "1ms", "4,7 nF", "-5 V", "1e3Hz", "4.7 k Ω", "1k ohm"; ondalık ayırıcı nokta ya da virgül olabilir
+QUANTITY = re.compile(
+    rf"^\s*([+-]?(?:\d+(?:[.,]\d*)?|[.,]\d+)(?:[eE][+-]?\d+)?)\s*({_PREFIX})?\s*({_UNIT})?\s*$"
+)
+# RKM gösterimi: "4k7" = 4.7k, "4R7" = 4.7 Ω
+RKM = re.compile(rf"^\s*(\d+)({_PREFIX}|R)(\d+)\s*({_UNIT})?\s*$")
+# Serbest metin içindeki değerler ("kazancı 10 olan, 1,5 kHz'lik", "4.7 k Ω"); sayının ortasından
+# başlamaz. Önekten sonraki boşluk yalnızca ardından tam bir birim geliyorsa alınır ("1 k olan" = 1000).
+QUANTITY_TOKEN = re.compile(
+    rf"(?<![\w.,])([+-]?(?:\d+(?:[.,]\d+)?|[.,]\d+)(?:[eE][+-]?\d+)?)\s*({_PREFIX})?(?:\s*({_UNIT})(?!\w))?(?!\w)"
+)
+
+
+class Quantity(NamedTuple):
+    value: float
+    unit: str = ""
+
+
+@lru_cache(maxsize=65536)
+def parse_quantity(text):
+    """Birim ve SI önekli bir değeri (değer, kanonik birim) olarak çözer"""
+    match = QUANTITY.match(text)
+    if match:
+        number, prefix, unit = match.groups()
+        value = float(number.replace(",", "."))
+    else:
+        match = RKM.match(text)
+        if not match:
+            raise ValueError(f"Geçersiz değer formatı: {text}")
+        whole, prefix, fraction, unit = match.groups()
+        value = float(f"{whole}.{fraction}")
+        if prefix == "R":
+            prefix, unit = None, unit or "R"
+    return Quantity(value * SI_PREFIXES.get(prefix, 1.0), UNITS.get(unit, ""))
+
+
+def find_quantities(text):
+    """Metindeki tüm değerleri (Quantity, (başlangıç, bitiş)) listesi olarak döndürür"""
+    found = []
+    for match in QUANTITY_TOKEN.finditer(text):
+        number, prefix, unit = match.groups()
+        value = float(number.replace(",", ".")) * SI_PREFIXES.get(prefix, 1.0)
+        found.append((Quantity(value, UNITS.get(unit, "")), match.span()))
+    return found
+
+
+def parse_numeric_value(value, unit=None):
+    """Kullanıcı girdisini sayıya çevirir ("1ms" → 0.001, "10kΩ" → 10000.0).
+
+    unit verilirse farklı birimli girdiler (ör. direnç için "1kHz") reddedilir;
+    birimsiz girdi her zaman kabul edilir.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    quantity = parse_quantity(str(value))
+    if unit and quantity.unit and quantity.unit != UNITS.get(unit, unit):
+        raise ValueError(f"Beklenen birim {unit}, girilen: {value}")
+    return quantity.value
+
+
+def parse_column(values, unit=None, errors="raise"):
+    """Metin sütununu float dizisine çevirir; her farklı hücre yalnızca bir kez çözülür.
+
+    Düz sayılardan oluşan sütunlar float() hızlı yolundan geçer. Tekrarlı değerli
+    tipik bir sütunda hedef 1M hücre/s'nin üzeri (bkz. benchmark.py parse.column).
+    errors="nan" ise geçersiz hücreler hata yerine NaN olur.
+    """
+    # numpy yalnızca sütun çözmede gerekir; tekil değer çözümü ona bağımlı değildir
+    import numpy as np
+
+    if isinstance(values, np.ndarray):
+        if values.dtype.kind in "biuf":
+            return values.astype(float)
+        shape, items = values.shape, values.ravel().tolist()
+    else:
+        items = list(values)
+        shape = (len(items),)
+    try:
+        return np.fromiter(map(float, items), dtype=float, count=len(items)).reshape(shape)
+    except (TypeError, ValueError):
+        pass
+
+    parsed = {}
+    for text in set(items):
+        try:
+            parsed[text] = parse_numeric_value(text, unit)
+        except ValueError:
+            if errors == "raise":
+                raise
+            parsed[text] = np.nan
+    return np.fromiter(map(parsed.__getitem__, items), dtype=float, count=len(items)).reshape(shape)
@@ -0,0 +1,221 @@
+import argparse
+import asyncio
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from anakod5 import CircuitDesigner
+from async_compile import AsyncLatexCompiler, CompileResult
+from circuit_analysis import MODELS, UA741, pgfplots_figures
+from circuit_calculations import CIRCUIT_SPECS
+from design_result import format_latex_parameters
+from instrumentation import configure_from_argv, timed
+from latex_validator import validate_latex
+
+BASE_PREAMBLE = [
+    r"\usepackage[T1]{fontenc}",
+    r"\usepackage[a4paper,margin=2cm]{geometry}",
+    r"\usepackage{amsmath}",
+]
+PLOT_PREAMBLE = [r"\usepackage{pgfplots}", r"\pgfplotsset{compat=1.16}"]
+
+TARGET_ROWS = {
+    "gain": ("Kazanç", lambda v: f"{v:.2f}"),
+    "gain1": ("Kazanç ($V_1$)", lambda v: f"{v:.2f}"),
+    "gain2": ("Kazanç ($V_2$)", lambda v: f"{v:.2f}"),
+    "cutoff": ("Kesim frekansı", lambda v: f"{v:.2f}~Hz"),
+    "vut": ("Üst eşik", lambda v: f"{v:.2f}~V"),
+    "vlt": ("Alt eşik", lambda v: f"{v:.2f}~V"),
+    "tau": ("Zaman sabiti", lambda v: f"{v * 1e3:.2f}~ms"),
+}
+LATEX_SPECIAL = {"&": r"\&", "%": r"\%", "$": r"\$", "#": r"\#", "_": r"\_", "{": r"\{", "}": r"\}"}
+
+
+def escape_latex(text):
+    return "".join(LATEX_SPECIAL.get(char, char) for char in text)
+
+
+def split_document(latex_code):
+    """Standalone belgeyi (önsöz satırları, gövde) olarak ayırır"""
+    begin = latex_code.find("\\begin{document}")
+    end = latex_code.rfind("\\end{document}")
+    if begin < 0 or end < begin:
+        return [], latex_code
+    preamble = [
+        line.strip() for line in latex_code[:begin].splitlines()
+        if line.strip() and not line.lstrip().startswith(("\\documentclass", "%"))
+    ]
+    return preamble, latex_code[begin + len("\\begin{document}"):end].strip("\n")
+
+
+def chunked(items, count):
+    """Öğeleri sırası korunarak en fazla count ardışık parçaya böler"""
+    size = -(-len(items) // max(1, count))
+    return [items[i:i + size] for i in range(0, len(items), size)] if items else []
+
+
+class ReportBuilder:
+    """Birden çok tasarımı tek bir çok sayfalı PDF raporunda toplar.
+
+    Her tasarım bir sayfadır: devre şeması, hesaplanan değerler tablosu, formül ve
+    isteğe bağlı analiz grafikleri. Belge tek pdflatex çalıştırmasıyla ya da paralel
+    derlenen parçalar halinde üretilip birleştirilir.
+    """
+
+    def __init__(self, designer=None, plots=False, model=UA741):
+        self.designer = designer or CircuitDesigner()
+        self.instrumentation = self.designer.instrumentation
+        self.plots = plots
+        self.model = model
+
+    def page(self, result):
+        """Tek bir tasarımın sayfa gövdesi ve şablondan gelen önsöz satırları"""
+        latex_code = self.designer.generate_latex_code(result.circuit_type, self.designer.template_parameters(result))
+        lines = [f"\\section*{{{escape_latex(result.circuit_type)}}}"]
+        preamble = []
+        if latex_code is None:
+            lines.append("\\emph{Bu devre için şablon bulunamadı.}")
+        else:
+            preamble, body = split_document(latex_code)
+            lines += ["\\begin{center}", body, "\\end{center}"]
+
+        rows = [f"{key} & {value} \\\\" for key, value in format_latex_parameters(result.components).items()]
+        for key, value in result.targets.items():
+            label, fmt = TARGET_ROWS.get(key, (escape_latex(key), lambda v: f"{v:.4g}"))
+            rows.append(f"{label} & {fmt(value)} \\\\")
+        lines += [
+            "\\begin{center}", "\\begin{tabular}{ll}", "\\hline", "Büyüklük & Değer \\\\", "\\hline",
+            *rows, "\\hline", "\\end{tabular}", "\\end{center}",
+        ]
+
+        if result.formula:
+            prefix = "V_{out} = " if result.kind == "summing" else "A_v = " if result.formula_key == "GainFormula" else ""
+            lines.append(f"\\[ {prefix}{result.formula} \\]")
+        if self.plots:
+            lines += ["\\begin{center}", pgfplots_figures(result, self.model), "\\end{center}"]
+        lines.append("\\clearpage")
+        return preamble, "\n".join(lines)
+
+    @timed("report.render")
+    def document(self, results, first_page=1):
+        """Tasarım listesinden çok sayfalı article belgesi üretir"""
+        preamble = list(BASE_PREAMBLE)
+        if self.plots:
+            preamble += PLOT_PREAMBLE
+        pages = []
+        for result in results:
+            page_preamble, body = self.page(result)
+            pages.append(body)
+            for line in page_preamble:
+                if line not in preamble:
+                    preamble.append(line)
+        return "\n".join([
+            "\\documentclass[11pt]{article}",
+            *preamble,
+            "\\pagestyle{plain}",
+            "\\begin{document}",
+            f"\\setcounter{{page}}{{{first_page}}}",
+            *pages,
+            "\\end{document}",
+        ]) + "\n"
+
+    def compiler(self, max_concurrent):
+        return AsyncLatexCompiler(
+            self.designer.config["output_dir"],
+            max_concurrent=max_concurrent,
+            timeout=float(self.designer.config["compile_timeout"]) * 4
+        )
+
+    @timed("report.compile")
+    async def build_async(self, results, filename="rapor", chunks=1):
+        """Raporu derler; chunks > 1 ise parçaları paralel derleyip tek PDF'te birleştirir"""
+        results = list(results)
+        parts = chunked(results, chunks)
+        jobs = []
+        first_page = 1
+        for index, part in enumerate(parts):
+            name = filename if len(parts) == 1 else f"{filename}_part{index + 1}"
+            jobs.append((self.document(part, first_page), name))
+            first_page += len(part)
+
+        for latex_code, name in jobs:
+            validation = validate_latex(latex_code)
+            if not validation.ok:
+                self.instrumentation.count("compile.preflight_rejected")
+                return CompileResult(success=False, log_excerpt=f"{name}:\n{validation.summary()}")
+
+        compiler = self.compiler(max(1, len(jobs)))
+        self.instrumentation.count("compile.count", len(jobs))
+        compiled = await compiler.compile_many(jobs)
+        for (_, name), result in zip(jobs, compiled):
+            if not result.success:
+                self.instrumentation.count("compile.failed")
+                result.log_excerpt = f"{name}:\n{result.log_excerpt}"
+                return result
+        if len(compiled) == 1:
+            return compiled[0]
+        return await self.merge([result.pdf_path for result in compiled], filename, compiler)
+
+    async def merge(self, pdf_paths, filename, compiler):
+        """Parça PDF'lerini pdfunite ile, yoksa pdfpages kullanan kısa bir TeX çalıştırmasıyla birleştirir"""
+        output = Path(self.designer.config["output_dir"]) / f"{filename}.pdf"
+        started = time.perf_counter()
+        if shutil.which("pdfunite"):
+            proc = await asyncio.create_subprocess_exec(
+                "pdfunite", *map(str, pdf_paths), str(output),
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+            )
+            log, _ = await proc.communicate()
+            success = proc.returncode == 0 and output.exists()
+            return CompileResult(
+                success=success, pdf_path=output if success else None, duration=time.perf_counter() - started,
+                returncode=proc.returncode, log_excerpt="" if success else log.decode("utf-8", errors="replace")
+            )
+
+        includes = "\n".join(f"\\includepdf[pages=-]{{{Path(path).resolve().as_posix()}}}" for path in pdf_paths)
+        merge_code = f"\\documentclass{{article}}\n\\usepackage{{pdfpages}}\n\\begin{{document}}\n{includes}\n\\end{{document}}\n"
+        return await compiler.compile(merge_code, filename)
+
+    def build(self, results, filename="rapor", chunks=1):
+        return asyncio.run(self.build_async(results, filename, chunks))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Birden çok devre tasarımından tek bir çok sayfalı PDF raporu üretir",
+        epilog="Ölçüm için --profile ve --trace DOSYA seçenekleri de kullanılabilir."
+    )
+    parser.add_argument("circuits", nargs="*", help="Devre tipleri (varsayılan: tüm devreler)")
+    parser.add_argument("--repeat", type=int, default=1, help="Listeyi n kez tekrarla (büyük paketler için)")
+    parser.add_argument("--plots", action="store_true", help="Bode ve geçici rejim grafiklerini ekle")
+    parser.add_argument("--model", choices=sorted(MODELS), default=UA741.name)
+    parser.add_argument("--chunks", type=int, default=1, help="Paralel derlenecek parça sayısı")
+    parser.add_argument("--output", default="rapor", help="Çıktı dosya adı (uzantısız)")
+    parser.add_argument("--tex-only", action="store_true", help="Yalnızca .tex dosyasını yaz")
+    args = parser.parse_args(configure_from_argv())
+
+    builder = ReportBuilder(plots=args.plots, model=MODELS[args.model])
+    circuit_types = args.circuits or [spec.circuit_type for spec in CIRCUIT_SPECS]
+    try:
+        results = [builder.designer.calculate(circuit_type) for circuit_type in circuit_types] * args.repeat
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.tex_only:
+        tex_file = Path(builder.designer.config["output_dir"]) / f"{args.output}.tex"
+        tex_file.write_text(builder.document(results), encoding="utf-8")
+        print(f"Yazıldı: {tex_file}")
+        return
+
+    started = time.perf_counter()
+    result = builder.build(results, args.output, args.chunks)
+    if not result.success:
+        print("Rapor derlenemedi:")
+        print(result.log_excerpt)
+        sys.exit(1)
+    print(f"Rapor oluşturuldu: {result.pdf_path} ({len(results)} sayfa, {time.perf_counter() - started:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
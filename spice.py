@@ -0,0 +1,412 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from async_compile import kill_process_tree, spawn_kwargs
+from circuit_analysis import (
+    MODELS, UA741, FrequencyResponse, characteristic_frequency, transfer_function
+)
+from circuit_calculations import CIRCUIT_SPECS, calculate
+
+# Tek kutuplu, çıkışı doyuma giden op-amp makro modeli
+OPAMP_SUBCKT = """.subckt opamp inp inn out
+Rin inp inn 2Meg
+E1 gain 0 inp inn {a0:.6g}
+Rp gain pole 1k
+Cp pole 0 {cp:.6g}
+Bout out 0 V=max(min(V(pole), {vsat:.6g}), -{vsat:.6g})
+.ends opamp"""
+
+
+# --- Netlist üretimi ---------------------------------------------------------
+#
+# Her fonksiyon (bileşenler, hedefler) alır ve giriş kaynağı hariç eleman satırlarını
+# döndürür. Giriş düğümü "in", çıkış düğümü "out"tur.
+
+def _inverting_netlist(c, t):
+    return [f"R1 in n {c['R1']:.6g}", f"R2 n out {c['R2']:.6g}", "XU1 0 n out opamp"]
+
+
+def _non_inverting_netlist(c, t):
+    return [f"R1 n 0 {c['R1']:.6g}", f"R2 n out {c['R2']:.6g}", "XU1 in n out opamp"]
+
+
+def _follower_netlist(c, t):
+    return ["XU1 in out out opamp"]
+
+
+def _low_pass_netlist(c, t):
+    return [f"R1 in p {c['R']:.6g}", f"C1 p 0 {c['C']:.6g}", "XU1 p out out opamp"]
+
+
+def _high_pass_netlist(c, t):
+    return [f"C1 in p {c['C']:.6g}", f"R1 p 0 {c['R']:.6g}", "XU1 p out out opamp"]
+
+
+def _summing_netlist(c, t):
+    # Ölçüm V1 yolundan yapılır; V2 AC olarak topraklanır
+    return [
+        "V2 in2 0 DC 0 AC 0",
+        f"R1 in n {c['R1']:.6g}", f"R2 in2 n {c['R2']:.6g}", f"Rf n out {c['Rf']:.6g}",
+        "XU1 0 n out opamp",
+    ]
+
+
+def _differentiator_netlist(c, t):
+    return [f"C1 in n {c['C']:.6g}", f"R1 n out {c['R']:.6g}", "XU1 0 n out opamp"]
+
+
+def _integrator_netlist(c, t):
+    return [
+        f"R1 in n {c['R']:.6g}", f"C1 n out {c['C']:.6g}", f"Rf n out {c['Rf']:.6g}",
+        "XU1 0 n out opamp",
+    ]
+
+
+def _difference_netlist(c, t):
+    # V1 topraklı, V2 = giriş: çıkış R4/(R2+R4)·(1+R3/R1) = R3/R1 kazancıyla izlenir
+    return [
+        f"R1 0 n {c['R1']:.6g}", f"R3 n out {c['R3']:.6g}",
+        f"R2 in p {c['R2']:.6g}", f"R4 p 0 {c['R4']:.6g}",
+        "XU1 p n out opamp",
+    ]
+
+
+def _schmitt_netlist(c, t):
+    return [f"R1 out p {c['R1']:.6g}", f"R2 p 0 {c['R2']:.6g}", "XU1 p in out opamp"]
+
+
+NETLISTS = {
+    "inverting": _inverting_netlist,
+    "non_inverting": _non_inverting_netlist,
+    "voltage_follower": _follower_netlist,
+    "low_pass": _low_pass_netlist,
+    "high_pass": _high_pass_netlist,
+    "summing": _summing_netlist,
+    "differentiator": _differentiator_netlist,
+    "integrator": _integrator_netlist,
+    "difference": _difference_netlist,
+    "schmitt": _schmitt_netlist,
+}
+
+
+def spice_deck(result, model=UA741, points_per_decade=50):
+    """DesignResult'tan ngspice toplu çalıştırmaya hazır SPICE destesi üretir.
+
+    Doğrusal devreler için karakteristik frekansın ±3 dekatında AC analizi, Schmitt
+    tetikleyici için eşikleri aşan sinüs girişli geçici analiz yazılır.
+    """
+    netlist = NETLISTS.get(result.kind)
+    if netlist is None:
+        raise ValueError(f"Netlist tanımlı olmayan devre: {result.circuit_type}")
+    components, targets = result.components, result.targets
+    f0 = characteristic_frequency(result.kind, components, targets)
+    gbw = model.gbw or 1e12
+    vsat = model.vsat or components.get("Vcc", 15.0)
+    pole = gbw / model.a0
+
+    lines = [f"* {result.kind}", OPAMP_SUBCKT.format(a0=model.a0, cp=1 / (2 * math.pi * 1e3 * pole), vsat=vsat)]
+    if result.kind == "schmitt":
+        amplitude = 1.5 * targets["vut"]
+        lines.append(f"Vin in 0 SIN(0 {amplitude:.6g} {f0:.6g})")
+        lines.extend(netlist(components, targets))
+        lines.append(f".tran {1 / (f0 * 400):.6g} {3 / f0:.6g}")
+    else:
+        lines.append("Vin in 0 DC 0 AC 1")
+        lines.extend(netlist(components, targets))
+        lines.append(f".ac dec {points_per_decade} {f0 / 1e3:.6g} {f0 * 1e3:.6g}")
+    lines.append(".end")
+    return "\n".join(lines) + "\n"
+
+
+def deck_hash(deck):
+    return hashlib.sha256(deck.encode("utf-8")).hexdigest()[:16]
+
+
+# --- Raw dosya okuma ---------------------------------------------------------
+
+def parse_raw(text):
+    """ngspice ASCII raw çıktısını {plot adı: {vektör adı: numpy dizisi}} olarak okur"""
+    plots = {}
+    lines = text.splitlines()
+    i = 0
+    while i < len(lines):
+        header = {}
+        while i < len(lines) and not lines[i].startswith("Variables:"):
+            key, _, value = lines[i].partition(":")
+            header[key.strip()] = value.strip()
+            i += 1
+        if i >= len(lines):
+            break
+        count = int(header["No. Variables"])
+        points = int(header["No. Points"])
+        complex_values = "complex" in header.get("Flags", "")
+        names = [lines[i + 1 + k].split()[1] for k in range(count)]
+        i += count + 1
+        if not lines[i].startswith("Values:"):
+            raise ValueError(f"Beklenmeyen raw satırı: {lines[i]!r}")
+        i += 1
+
+        # Her nokta: indeks + count değer; değerler boşlukla ayrılmış tek akış olarak okunur
+        tokens = []
+        needed = points * (count + 1)
+        while i < len(lines) and len(tokens) < needed:
+            tokens.extend(lines[i].split())
+            i += 1
+        table = np.array(tokens[:needed], dtype=object).reshape(points, count + 1)[:, 1:]
+        if complex_values:
+            pairs = np.array([value.split(",") for value in table.ravel()], dtype=float)
+            data = (pairs[:, 0] + 1j * pairs[:, 1]).reshape(points, count)
+        else:
+            data = table.astype(float)
+        plots[header.get("Plotname", f"plot{len(plots)}")] = {name: data[:, k] for k, name in enumerate(names)}
+    return plots
+
+
+def _vector(plot, name):
+    for key, values in plot.items():
+        if key.lower() == name:
+            return values
+    raise KeyError(f"Raw dosyasında vektör yok: {name}")
+
+
+def measure(result, plots):
+    """Raw verisinden kazanç, kesim frekansı veya eşik ölçümleri çıkarır"""
+    plot = next(iter(plots.values()))
+    if result.kind == "schmitt":
+        vin = _vector(plot, "v(in)").real
+        vout = _vector(plot, "v(out)").real
+        sign = np.signbit(vout)
+        edges = np.flatnonzero(sign[1:] != sign[:-1])
+        falling = [vin[k] for k in edges if sign[k + 1]]
+        rising = [vin[k] for k in edges if not sign[k + 1]]
+        measured = {}
+        if falling:
+            measured["vut"] = float(np.mean(falling))
+        if rising:
+            measured["vlt"] = float(np.mean(rising))
+        return measured
+
+    frequency = _vector(plot, "frequency").real
+    response = _vector(plot, "v(out)")
+    magnitude = 20 * np.log10(np.maximum(np.abs(response), 1e-300))
+    fr = FrequencyResponse(frequency, magnitude, np.degrees(np.unwrap(np.angle(response))), "spice")
+    f0 = characteristic_frequency(result.kind, result.components, result.targets)
+    measured = {"gain": float(np.interp(math.log10(f0), np.log10(frequency), np.abs(response)))}
+    if "cutoff" in result.targets:
+        corners = fr.corner_frequencies()
+        if corners:
+            measured["cutoff"] = corners[0]
+    return measured
+
+
+def expected_values(result):
+    """İdeal op-amp ile beklenen ölçümler (kazanç karakteristik frekanstaki |H|)"""
+    targets = result.targets
+    if result.kind == "schmitt":
+        return {"vut": targets["vut"], "vlt": targets["vlt"]}
+    num, den = transfer_function(result.kind, result.components)
+    f0 = characteristic_frequency(result.kind, result.components, targets)
+    s = 2j * math.pi * f0
+    expected = {"gain": abs(np.polyval(num, s) / np.polyval(den, s))}
+    if "cutoff" in targets:
+        expected["cutoff"] = targets["cutoff"]
+    return expected
+
+
+# --- Toplu çalıştırma --------------------------------------------------------
+
+@dataclass
+class SpiceCheck:
+    """Bir tasarımın ngspice doğrulama sonucu"""
+    circuit_type: str
+    kind: str
+    deck_hash: str
+    passed: bool = False
+    measured: dict = field(default_factory=dict)
+    expected: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+    cached: bool = False
+    duration: float = 0.0
+    log_excerpt: str = ""
+
+    def to_dict(self):
+        return {
+            "circuit_type": self.circuit_type,
+            "kind": self.kind,
+            "deck_hash": self.deck_hash,
+            "passed": self.passed,
+            "measured": self.measured,
+            "expected": self.expected,
+            "errors": self.errors,
+            "cached": self.cached,
+            "duration": round(self.duration, 4),
+            "log_excerpt": self.log_excerpt,
+        }
+
+    def summary_line(self):
+        status = "GEÇTİ" if self.passed else "KALDI"
+        details = ", ".join(
+            f"{key}: {self.measured.get(key, float('nan')):.5g} / {value:.5g}" for key, value in self.expected.items()
+        )
+        suffix = " (önbellek)" if self.cached else ""
+        return f"[{status}] {self.circuit_type}: {details}{suffix}"
+
+
+class SpiceRunner:
+    """SPICE destelerini yerel ngspice ile (-b) paralel çalıştırır; raw çıktıları netlist özetiyle önbellekler"""
+
+    def __init__(self, command="ngspice", max_workers=4, timeout=60.0, cache_dir="spice_cache", rel_tol=0.02):
+        self.command = command
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.rel_tol = rel_tol
+        self.memory_cache = {}
+
+    def available(self):
+        return shutil.which(self.command) is not None
+
+    def cached_raw(self, digest):
+        if digest in self.memory_cache:
+            return self.memory_cache[digest]
+        if self.cache_dir is not None:
+            path = self.cache_dir / f"{digest}.raw"
+            if path.exists():
+                text = path.read_text(encoding="utf-8", errors="replace")
+                self.memory_cache[digest] = text
+                return text
+        return None
+
+    def store_raw(self, digest, text):
+        self.memory_cache[digest] = text
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_dir / f"{digest}.raw.tmp{os.getpid()}"
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, self.cache_dir / f"{digest}.raw")
+
+    def simulate(self, deck):
+        """Desteyi çalıştırır; (raw metni, önbellekten mi, günlük) döndürür"""
+        digest = deck_hash(deck)
+        raw = self.cached_raw(digest)
+        if raw is not None:
+            return raw, True, ""
+
+        with tempfile.TemporaryDirectory(prefix="spice_") as work_dir:
+            deck_path = Path(work_dir) / "deck.cir"
+            raw_path = Path(work_dir) / "deck.raw"
+            deck_path.write_text(deck, encoding="utf-8")
+            env = {**os.environ, "SPICE_ASCIIRAWFILE": "1"}
+            proc = subprocess.Popen(
+                [self.command, "-b", "-r", str(raw_path), str(deck_path)],
+                cwd=work_dir, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT, text=True, errors="replace", **spawn_kwargs()
+            )
+            try:
+                log, _ = proc.communicate(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                kill_process_tree(proc)
+                proc.communicate()
+                raise RuntimeError(f"ngspice {self.timeout:g} s içinde bitmedi")
+            if proc.returncode != 0 or not raw_path.exists():
+                tail = "\n".join(log.splitlines()[-15:])
+                raise RuntimeError(f"ngspice başarısız (çıkış kodu {proc.returncode})\n{tail}")
+            raw = raw_path.read_text(encoding="utf-8", errors="replace")
+        self.store_raw(digest, raw)
+        return raw, False, log
+
+    def verify(self, result, model=UA741):
+        """Tasarımı simüle eder ve ölçülen kazanç/kesim/eşikleri hedeflerle karşılaştırır"""
+        deck = spice_deck(result, model)
+        check = SpiceCheck(result.circuit_type, result.kind, deck_hash(deck), expected=expected_values(result))
+        started = time.perf_counter()
+        try:
+            raw, check.cached, _ = self.simulate(deck)
+            check.measured = measure(result, parse_raw(raw))
+        except (RuntimeError, ValueError, KeyError, OSError) as e:
+            check.log_excerpt = str(e)
+            check.duration = time.perf_counter() - started
+            return check
+
+        for key, expected in check.expected.items():
+            measured = check.measured.get(key)
+            if measured is None:
+                check.errors[key] = None
+                continue
+            check.errors[key] = abs(measured - expected) / abs(expected) if expected else abs(measured)
+        check.passed = all(error is not None and error <= self.rel_tol for error in check.errors.values())
+        check.duration = time.perf_counter() - started
+        return check
+
+    def verify_many(self, results, model=UA741):
+        """Tasarımları iş parçacığı havuzunda doğrular (her biri ayrı ngspice süreci)"""
+        results = list(results)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ngspice") as pool:
+            return list(pool.map(lambda result: self.verify(result, model), results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SPICE netlist üretimi ve ngspice ile toplu doğrulama")
+    parser.add_argument("circuits", nargs="*", help="Devre tipleri (varsayılan: netlisti tanımlı tüm devreler)")
+    parser.add_argument("--model", choices=sorted(MODELS), default=UA741.name)
+    parser.add_argument("--ngspice", default="ngspice", help="ngspice çalıştırılabilir dosyası")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--rel-tol", type=float, default=0.02, help="Kabul edilen göreli hata")
+    parser.add_argument("--cache-dir", default="spice_cache")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--emit", metavar="DİZİN", help="Yalnızca desteleri bu dizine yaz, simülasyon yapma")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    circuit_types = args.circuits or [spec.circuit_type for spec in CIRCUIT_SPECS if spec.kind in NETLISTS]
+    try:
+        results = [calculate(circuit_type) for circuit_type in circuit_types]
+    except ValueError as e:
+        parser.error(str(e))
+    model = MODELS[args.model]
+
+    if args.emit:
+        out_dir = Path(args.emit)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for result in results:
+            path = out_dir / f"{result.kind}.cir"
+            path.write_text(spice_deck(result, model), encoding="utf-8")
+            print(f"Yazıldı: {path}")
+        return
+
+    runner = SpiceRunner(
+        command=args.ngspice, max_workers=args.jobs, timeout=args.timeout,
+        cache_dir=None if args.no_cache else args.cache_dir, rel_tol=args.rel_tol
+    )
+    if not runner.available():
+        print(f"HATA: '{args.ngspice}' bulunamadı. Yalnızca desteler için --emit kullanın.", file=sys.stderr)
+        sys.exit(2)
+
+    checks = runner.verify_many(results, model)
+    for check in checks:
+        print(check.summary_line())
+        if check.log_excerpt:
+            print("  " + check.log_excerpt.replace("\n", "\n  "))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump([check.to_dict() for check in checks], f, ensure_ascii=False, indent=2)
+    if not all(check.passed for check in checks):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+import math
+import re
+import shutil
+import subprocess
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from circuit_calculations import SPECS_BY_KIND
+from design_result import format_capacitance, format_resistance
+
+SCALE = 48        # piksel / circuitikz birimi (cm)
+MARGIN = 0.6      # birim
+STROKE = 2
+FONT = "DejaVu Sans, Arial, sans-serif"
+SUBSCRIPT_RE = re.compile(r"_(\w+)")
+
+# circuitikz "op amp" düğümünün yaklaşık uç konumları (merkeze göre)
+OPAMP_MINUS = (-1.2, 0.5)
+OPAMP_PLUS = (-1.2, -0.5)
+OPAMP_OUT = (1.2, 0.0)
+
+
+class Schematic:
+    """circuitikz koordinatlarıyla (y yukarı) çizim yapan ve SVG üreten küçük çizim yüzeyi"""
+
+    def __init__(self):
+        self.lines = []    # (noktalar, dolgu)
+        self.circles = []  # (merkez, yarıçap, dolu)
+        self.texts = []    # (konum, metin, hizalama, boyut, kalın)
+
+    # --- Temel öğeler ------------------------------------------------------
+
+    def wire(self, *points):
+        self.lines.append((points, False))
+
+    def dot(self, point):
+        self.circles.append((point, 0.07, True))
+
+    def terminal(self, point, label=None, side="right"):
+        self.circles.append((point, 0.07, False))
+        if label:
+            offset = {"right": (0.15, 0), "left": (-0.15, 0), "below": (0, -0.35)}[side]
+            anchor = {"right": "start", "left": "end", "below": "middle"}[side]
+            self.text((point[0] + offset[0], point[1] + offset[1] - 0.08), label, anchor)
+
+    def text(self, point, text, anchor="middle", size=0.32, bold=False):
+        self.texts.append((point, text, anchor, size, bold))
+
+    def ground(self, point):
+        x, y = point
+        self.wire((x, y), (x, y - 0.25))
+        for i, half in enumerate((0.25, 0.16, 0.07)):
+            self.wire((x - half, y - 0.25 - i * 0.08), (x + half, y - 0.25 - i * 0.08))
+
+    # --- İki uçlu elemanlar ------------------------------------------------
+
+    def _frame(self, start, end, body):
+        """Elemanın gövdesini [start, end] ortasına yerleştirir; (yön, normal, gövde uçları) döndürür"""
+        (x1, y1), (x2, y2) = start, end
+        length = math.hypot(x2 - x1, y2 - y1)
+        ux, uy = (x2 - x1) / length, (y2 - y1) / length
+        nx, ny = -uy, ux
+        mid = ((x1 + x2) / 2, (y1 + y2) / 2)
+        a = (mid[0] - ux * body / 2, mid[1] - uy * body / 2)
+        b = (mid[0] + ux * body / 2, mid[1] + uy * body / 2)
+        self.wire(start, a)
+        self.wire(b, end)
+        return (ux, uy), (nx, ny), a, b, mid
+
+    def _label(self, start, end, label, side):
+        (x1, y1), (x2, y2) = start, end
+        mid = ((x1 + x2) / 2, (y1 + y2) / 2)
+        if abs(y2 - y1) < 1e-9:
+            dy = 0.4 if side == "above" else -0.6
+            self.text((mid[0], mid[1] + dy), label)
+        else:
+            dx = 0.35 if side == "right" else -0.35
+            self.text((mid[0] + dx, mid[1] - 0.1), label, "start" if side == "right" else "end")
+
+    def resistor(self, start, end, label=None, side=None):
+        (ux, uy), (nx, ny), a, _, _ = self._frame(start, end, 1.0)
+        points = [a]
+        for i in range(1, 7):
+            sign = 1 if i % 2 else -1
+            t = (i - 0.5) / 6
+            points.append((a[0] + ux * t + nx * 0.18 * sign, a[1] + uy * t + ny * 0.18 * sign))
+        points.append((a[0] + ux, a[1] + uy))
+        self.wire(*points)
+        if label:
+            self._label(start, end, label, side or ("above" if abs(uy) < 1e-9 else "right"))
+
+    def capacitor(self, start, end, label=None, side=None):
+        (ux, uy), (nx, ny), a, b, _ = self._frame(start, end, 0.2)
+        for px, py in (a, b):
+            self.wire((px + nx * 0.35, py + ny * 0.35), (px - nx * 0.35, py - ny * 0.35))
+        if label:
+            self._label(start, end, label, side or ("above" if abs(uy) < 1e-9 else "right"))
+
+    def source(self, start, end, label=None):
+        """Sinüs kaynağı (circuitikz sV)"""
+        _, _, _, _, (cx, cy) = self._frame(start, end, 0.8)
+        self.circles.append(((cx, cy), 0.4, False))
+        wave = [(cx - 0.25 + 0.5 * i / 12, cy + 0.15 * math.sin(2 * math.pi * i / 12)) for i in range(13)]
+        self.wire(*wave)
+        if label:
+            self.text((cx - 0.55, cy - 0.1), label, "end")
+
+    def opamp(self, center=(0.0, 0.0)):
+        """Op-amp üçgeni; (eksi, artı, çıkış) uç koordinatlarını döndürür"""
+        cx, cy = center
+        self.lines.append((((cx - 0.7, cy + 0.85), (cx - 0.7, cy - 0.85), (cx + 0.7, cy)), True))
+        minus = (cx + OPAMP_MINUS[0], cy + OPAMP_MINUS[1])
+        plus = (cx + OPAMP_PLUS[0], cy + OPAMP_PLUS[1])
+        out = (cx + OPAMP_OUT[0], cy + OPAMP_OUT[1])
+        self.wire(minus, (cx - 0.7, minus[1]))
+        self.wire(plus, (cx - 0.7, plus[1]))
+        self.wire((cx + 0.7, cy), out)
+        self.text((cx - 0.55, minus[1] - 0.12), "−", "start", 0.3)
+        self.text((cx - 0.55, plus[1] - 0.12), "+", "start", 0.3)
+        return minus, plus, out
+
+    def title(self, point, *lines):
+        x, y = point
+        for i, line in enumerate(lines):
+            self.text((x, y - i * 0.45), line, size=0.36 if i == 0 else 0.32, bold=i == 0)
+
+    # --- SVG çıktısı -------------------------------------------------------
+
+    def bounds(self):
+        xs, ys = [], []
+        for points, _ in self.lines:
+            xs.extend(p[0] for p in points)
+            ys.extend(p[1] for p in points)
+        for (x, y), r, _ in self.circles:
+            xs += [x - r, x + r]
+            ys += [y - r, y + r]
+        for (x, y), text, anchor, size, _ in self.texts:
+            width = len(text) * size * 0.55
+            left = {"start": x, "end": x - width, "middle": x - width / 2}[anchor]
+            xs += [left, left + width]
+            ys += [y - size * 0.3, y + size]
+        return min(xs) - MARGIN, min(ys) - MARGIN, max(xs) + MARGIN, max(ys) + MARGIN
+
+    def to_svg(self):
+        min_x, min_y, max_x, max_y = self.bounds()
+
+        def px(point):
+            return f"{(point[0] - min_x) * SCALE:.1f},{(max_y - point[1]) * SCALE:.1f}"
+
+        width, height = (max_x - min_x) * SCALE, (max_y - min_y) * SCALE
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+            f'viewBox="0 0 {width:.0f} {height:.0f}">',
+            '<rect width="100%" height="100%" fill="white"/>',
+            f'<g fill="none" stroke="black" stroke-width="{STROKE}" stroke-linejoin="round" stroke-linecap="round">',
+        ]
+        for points, closed in self.lines:
+            tag = "polygon" if closed else "polyline"
+            parts.append(f'<{tag} points="{" ".join(px(p) for p in points)}"/>')
+        for (x, y), r, filled in self.circles:
+            fill = ' fill="black"' if filled else ' fill="white"'
+            cx, cy = px((x, y)).split(",")
+            parts.append(f'<circle cx="{cx}" cy="{cy}" r="{r * SCALE:.1f}"{fill}/>')
+        parts.append("</g>")
+        parts.append(f'<g font-family="{FONT}" fill="black">')
+        for point, text, anchor, size, bold in self.texts:
+            x, y = px(point).split(",")
+            weight = ' font-weight="bold"' if bold else ""
+            parts.append(
+                f'<text x="{x}" y="{y}" font-size="{size * SCALE:.1f}" text-anchor="{anchor}"{weight}>'
+                f"{svg_text(text)}</text>"
+            )
+        parts.append("</g>")
+        parts.append("</svg>")
+        return "\n".join(parts) + "\n"
+
+
+def svg_text(text):
+    """'V_out' gibi alt indisleri tspan'a çevirir"""
+    escaped = escape(text)
+    return SUBSCRIPT_RE.sub(lambda m: f'<tspan baseline-shift="sub" font-size="75%">{m.group(1)}</tspan>', escaped)
+
+
+# --- Topolojiler (latex_codes/*.tex şablonlarıyla aynı yerleşim) --------------
+
+def _r(c, key, name=None):
+    return f"{name or key}: {format_resistance(c[key])}"
+
+
+def _c(c, key, name=None):
+    return f"{name or key}: {format_capacitance(c[key])}"
+
+
+def _inverting(s, c, t):
+    minus, plus, out = s.opamp()
+    s.resistor(minus, (-3, 0.5), _r(c, "R1"), "below")
+    s.dot((-3, 0.5))
+    s.wire((-3, 0.5), (-4, 0.5))
+    s.source((-4, 0.5), (-4, -1.5), "Giriş")
+    s.ground((-4, -1.5))
+    s.wire(minus, (-1.2, 2))
+    s.resistor((-1.2, 2), (1.2, 2), _r(c, "R2"))
+    s.wire((1.2, 2), out)
+    _output(s, out, (2, 0), "Çıkış")
+    s.wire(plus, (-1.2, -1))
+    s.ground((-1.2, -1))
+
+
+def _non_inverting(s, c, t):
+    minus, plus, out = s.opamp()
+    s.wire(plus, (-2.2, -0.5))
+    s.terminal((-2.2, -0.5), "Giriş", "left")
+    s.wire(minus, (-1.2, 1.5))
+    s.dot((-1.2, 1.5))
+    s.resistor((-1.2, 1.5), (-3.4, 1.5), _r(c, "R1"), "below")
+    s.ground((-3.4, 1.5))
+    s.resistor((-1.2, 1.5), (1.2, 1.5), _r(c, "R2"))
+    s.wire((1.2, 1.5), out)
+    _output(s, out, (2, 0), "Çıkış")
+
+
+def _rc_filter(first, second):
+    def draw(s, c, t):
+        minus, plus, out = s.opamp()
+        s.source((-4.2, -0.5), (-4.2, -2.5), "Giriş")
+        s.ground((-4.2, -2.5))
+        first(s, (-4.2, -0.5), (-1.8, -0.5), c)
+        s.dot((-1.8, -0.5))
+        s.wire((-1.8, -0.5), plus)
+        second(s, (-1.8, -0.5), (-1.8, -2.5), c)
+        s.ground((-1.8, -2.5))
+        s.wire(out, (1.2, 1.5), (-1.2, 1.5), minus)
+        _output(s, out, (2, 0), "Vo")
+    return draw
+
+
+def _series_r(s, start, end, c):
+    s.resistor(start, end, _r(c, "R", "R1"))
+
+
+def _series_c(s, start, end, c):
+    s.capacitor(start, end, _c(c, "C", "C1"))
+
+
+def _shunt_r(s, start, end, c):
+    s.resistor(start, end, _r(c, "R", "R1"), "right")
+
+
+def _shunt_c(s, start, end, c):
+    s.capacitor(start, end, _c(c, "C", "C1"), "right")
+
+
+def _summing(s, c, t):
+    minus, plus, out = s.opamp()
+    junction = (-1.8, 0.5)
+    s.wire(minus, junction)
+    s.dot(junction)
+    s.wire((-1.8, 1.2), (-1.8, -0.3))
+    s.resistor((-1.8, 1.2), (-4, 1.2), _r(c, "R1"))
+    s.terminal((-4, 1.2), "Giriş 1", "left")
+    s.resistor((-1.8, -0.3), (-4, -0.3), _r(c, "R2"), "below")
+    s.terminal((-4, -0.3), "Giriş 2", "left")
+    s.wire(minus, (-1.2, 2.2))
+    s.resistor((-1.2, 2.2), (1.2, 2.2), _r(c, "Rf"))
+    s.wire((1.2, 2.2), out)
+    s.wire(plus, (-1.2, -1))
+    s.ground((-1.2, -1))
+    _output(s, out, (2, 0), "Çıkış")
+
+
+def _schmitt(s, c, t):
+    # Tersleyen Schmitt tetikleyici: R1 çıkıştan + girişe, R2 + girişten toprağa.
+    # schmitt_trigger.tex'ten bilerek farklı: şablon R1'i + giriş ile toprak arasına,
+    # R2'yi çıkış ile toprak arasına çizer (geri besleme yok); burada design_schmitt'in
+    # Vut = Vcc·R2/(R1+R2) bağıntısına uyan gerilim bölücü çizilir.
+    minus, plus, out = s.opamp()
+    s.wire(minus, (-2.2, 0.5))
+    s.terminal((-2.2, 0.5), "Giriş", "left")
+    s.wire(plus, (-1.6, -0.5), (-1.6, -1.4))
+    s.dot((-1.6, -1.4))
+    s.resistor((-1.6, -1.4), (-1.6, -3.2), _r(c, "R2"), "left")
+    s.ground((-1.6, -3.2))
+    s.resistor((-1.6, -1.4), (1.8, -1.4), _r(c, "R1"), "below")
+    s.wire((1.8, -1.4), (1.8, 0))
+    s.dot((1.8, 0))
+    s.wire(out, (1.8, 0))
+    s.wire((1.8, 0), (2.4, 0))
+    s.terminal((2.4, 0), "Çıkış")
+
+
+def _follower(s, c, t):
+    minus, plus, out = s.opamp()
+    s.source((-3, -0.5), (-3, -2.5), "Giriş")
+    s.ground((-3, -2.5))
+    s.wire((-3, -0.5), plus)
+    s.dot(plus)
+    s.wire(out, (1.2, 1.5), (-1.2, 1.5), minus)
+    _output(s, out, (2.2, 0), "Vo")
+
+
+def _differentiator(s, c, t):
+    minus, plus, out = s.opamp()
+    s.capacitor(minus, (-3, 0.5), _c(c, "C"), "below")
+    s.terminal((-3, 0.5), "Giriş", "left")
+    s.wire(minus, (-1.2, 2))
+    s.resistor((-1.2, 2), (1.2, 2), _r(c, "R"))
+    s.wire((1.2, 2), out)
+    s.wire(plus, (-1.2, -1))
+    s.ground((-1.2, -1))
+    _output(s, out, (2, 0), "Çıkış")
+
+
+def _integrator(s, c, t):
+    minus, plus, out = s.opamp()
+    x = (-1.8, 0.5)
+    s.source((-4.4, 0.5), (-4.4, -1.5), "Giriş")
+    s.ground((-4.4, -1.5))
+    s.resistor((-4.4, 0.5), x, _r(c, "R"))
+    s.dot(x)
+    s.wire(x, minus)
+    s.wire(x, (-1.8, 3.2))
+    s.capacitor((-1.8, 2), (1.2, 2), _c(c, "C"))
+    s.dot((-1.8, 2))
+    if "Rf" in c:
+        s.resistor((-1.8, 3.2), (1.2, 3.2), _r(c, "Rf"))
+        s.wire((1.2, 3.2), (1.2, 2))
+        s.dot((1.2, 2))
+    s.wire((1.2, 2), out)
+    s.wire(plus, (-1.2, -1))
+    s.ground((-1.2, -1))
+    _output(s, out, (2.2, 0), "Vo")
+
+
+def _difference(s, c, t):
+    minus, plus, out = s.opamp()
+    s.wire(minus, (-1.7, 0.5))
+    s.resistor((-1.7, 0.5), (-3.9, 0.5), _r(c, "R1"))
+    s.terminal((-3.9, 0.5), "V_1", "left")
+    s.wire(plus, (-1.7, -0.5))
+    s.resistor((-1.7, -0.5), (-3.9, -0.5), _r(c, "R2"), "below")
+    s.terminal((-3.9, -0.5), "V_2", "left")
+    s.dot(plus)
+    s.wire(plus, (-1.2, -1.5))
+    s.resistor((-1.2, -1.5), (-1.2, -3.1), _r(c, "R4"), "right")
+    s.ground((-1.2, -3.1))
+    s.wire(minus, (-1.2, 1.7))
+    s.resistor((-1.2, 1.7), (1.2, 1.7), _r(c, "R3"))
+    s.wire((1.2, 1.7), out)
+    _output(s, out, (2.5, 0), "V_out")
+
+
+def _output(s, out, end, label):
+    s.dot(out)
+    s.wire(out, end)
+    s.terminal(end, label)
+
+
+LAYOUTS = {
+    "inverting": _inverting,
+    "non_inverting": _non_inverting,
+    "low_pass": _rc_filter(_series_r, _shunt_c),
+    "high_pass": _rc_filter(_series_c, _shunt_r),
+    "summing": _summing,
+    "schmitt": _schmitt,
+    "voltage_follower": _follower,
+    "differentiator": _differentiator,
+    "integrator": _integrator,
+    "difference": _difference,
+}
+
+TITLES = {
+    "low_pass": "Alçak Geçiren Filtre (Pozitif Girişli)",
+    "high_pass": "Yüksek Geçiren Filtre (Pozitif Girişli)",
+    "summing": "Toplayıcı Yükselteç",
+    "voltage_follower": "Gerilim İzleyici (Buffer)",
+    "differentiator": "Türev Alıcı Devre",
+    "integrator": "İntegral Alıcı Devresi",
+}
+
+
+def title_lines(result):
+    spec = SPECS_BY_KIND[result.kind]
+    targets = result.targets
+    lines = [TITLES.get(result.kind, result.circuit_type)]
+    if "cutoff" in targets:
+        lines.append(f"f_c = {targets['cutoff']:.2f} Hz")
+    elif "vut" in targets:
+        lines += [f"Üst Eşik: {targets['vut']:.2f} V", f"Alt Eşik: {targets['vlt']:.2f} V"]
+    elif "gain" in targets and spec.display_formula.startswith("A_v"):
+        lines.append(f"{spec.display_formula} = {targets['gain']:.2f}")
+    elif spec.display_formula:
+        lines.append(spec.display_formula)
+    return lines
+
+
+@lru_cache(maxsize=256)
+def render_svg(result):
+    """DesignResult'ı TeX gerektirmeden SVG devre şemasına çevirir (tasarım başına önbellekli)"""
+    layout = LAYOUTS.get(result.kind)
+    if layout is None:
+        raise ValueError(f"SVG yerleşimi tanımlı olmayan devre: {result.circuit_type}")
+    schematic = Schematic()
+    layout(schematic, result.components, result.targets)
+    top = max(p[1] for points, _ in schematic.lines for p in points)
+    schematic.title((0, top + 1.3), *title_lines(result))
+    return schematic.to_svg()
+
+
+# --- PDF dönüştürme ----------------------------------------------------------
+
+def pdf_converter():
+    """Kullanılabilir SVG→PDF dönüştürücünün adı (cairosvg, rsvg-convert) veya None"""
+    try:
+        import cairosvg  # noqa: F401
+        return "cairosvg"
+    except (ImportError, OSError):  # cairosvg kurulu ama libcairo yok
+        pass
+    if shutil.which("rsvg-convert"):
+        return "rsvg-convert"
+    return None
+
+
+def svg_to_pdf(svg_text, timeout=30.0):
+    """SVG metnini PDF baytlarına çevirir; dönüştürücü yoksa RuntimeError fırlatır"""
+    converter = pdf_converter()
+    if converter == "cairosvg":
+        import cairosvg
+        return cairosvg.svg2pdf(bytestring=svg_text.encode("utf-8"))
+    if converter == "rsvg-convert":
+        proc = subprocess.run(
+            ["rsvg-convert", "-f", "pdf"], input=svg_text.encode("utf-8"),
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.decode("utf-8", errors="replace").strip())
+        return proc.stdout
+    raise RuntimeError("SVG→PDF dönüştürücü bulunamadı (cairosvg veya rsvg-convert kurun)")
@@ -0,0 +1,312 @@
+import asyncio
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from async_compile import AsyncLatexCompiler, CompileResult
+
+PLACEHOLDER = re.compile(r"<<(\w+)>>")
+DOCUMENTCLASS = re.compile(r"\\documentclass(?:\[([^\]]*)\])?\{standalone\}")
+# Etiket katmanında gerekmeyen (ve yüklemesi pahalı) çizim paketleri
+DRAWING_PREAMBLE = ("\\usepackage{circuitikz}", "\\usepackage{tikz}", "\\usetikzlibrary", "\\ctikzset", "\\tikzset")
+
+# Kalibrasyon sayfasında etiket yerine konan kutunun boyutu (pt)
+CALIBRATION_WIDTH = 100
+CALIBRATION_HEIGHT = 10
+SP_PER_PT = 65536
+
+# Statik katman: her etiket yerine konumunu \pdfsavepos ile kaydeden boş bir kutu
+STATIC_MACROS = r"""\makeatletter
+\newwrite\dyn@out
+\immediate\openout\dyn@out=\jobname.pos
+\newif\ifdyncalibrate
+\newcommand\dynmark[1]{\pdfsavepos\write\dyn@out{\thepage\space#1\space\the\pdflastxpos\space\the\pdflastypos\space\number\pdfpagewidth\space\number\pdfpageheight}}
+\newcommand\dynlabel[1]{\hbox{\dynmark{#1}\ifdyncalibrate\phantom{\vrule width %dpt height %dpt depth 0pt}\fi}}
+\makeatother""" % (CALIBRATION_WIDTH, CALIBRATION_HEIGHT)
+
+# Etiket katmanı: kutu boyutu ölçülür, statik katmandaki çapa katsayılarıyla yerleştirilir
+LABEL_MACROS = r"""\newcommand\dynbox[1]{\hbox{#1}}
+\newcommand\dynlines[1]{\begin{tabular}[b]{@{}c@{}}#1\end{tabular}}
+\newcommand\placelabel[5]{\sbox0{#5}\dimen2=\ht0 \advance\dimen2 by \dp0
+  \put(0,0){\kern\dimexpr#1sp#3\wd0\relax\raisebox{\dimexpr#2sp#4\dimen2-\ht0\relax}{\usebox0}}}"""
+
+
+def template_digest(template_text):
+    return hashlib.sha256(template_text.encode("utf-8")).hexdigest()[:16]
+
+
+def _preceded_by_node(text, pos):
+    """pos'taki '{' bir TikZ düğüm metnini mi açıyor ('... ] {', '... ) {' veya 'node {')"""
+    before = text[:pos].rstrip()
+    return before.endswith((")", "]")) or before.endswith("node")
+
+
+def _option_end(text, pos):
+    depth = 0
+    for i in range(pos, len(text)):
+        ch = text[i]
+        if ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            if depth == 0:
+                return i
+            depth -= 1
+        elif ch == "," and depth == 0:
+            return i
+    raise ValueError("Kapanmamış seçenek listesi")
+
+
+def _group_end(text, start):
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == "{":
+            depth += 1
+        elif text[i] == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError("Kapanmamış süslü parantez")
+
+
+def _option_value_start(text, start, pos):
+    """Seçenek listesinde pos'u içeren anahtar=değer çiftinin değer başlangıcı"""
+    depth, key_start, value_start = 0, start, None
+    for i in range(start, pos):
+        ch = text[i]
+        if ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+        elif depth == 0 and ch == ",":
+            key_start, value_start = i + 1, None
+        elif depth == 0 and ch == "=" and value_start is None:
+            value_start = i + 1
+    return key_start if value_start is None else value_start
+
+
+def label_span(text, pos):
+    """pos'taki yer tutucuyu içeren etiketin (başlangıç, bitiş) aralığı.
+
+    Etiket, yer tutucunun bulunduğu seçenek değeri (ör. l=R1:<<R1>>) ya da düğüm
+    metnidir (ör. \\node at (0,3) {...}); komut argümanları etikete dahil edilir.
+    """
+    braces = brackets = 0
+    for i in range(pos - 1, -1, -1):
+        ch = text[i]
+        if ch == "}":
+            braces += 1
+        elif ch == "]":
+            brackets += 1
+        elif ch == "{":
+            if braces:
+                braces -= 1
+            elif brackets == 0 and _preceded_by_node(text, i):
+                return i + 1, _group_end(text, i)
+        elif ch == "[":
+            if brackets:
+                brackets -= 1
+            elif braces == 0:
+                return _option_value_start(text, i + 1, pos), _option_end(text, pos)
+    raise ValueError(f"Yer tutucu bir etiket ya da düğüm metni içinde değil: {text[pos:pos + 20]}")
+
+
+def split_template(template_text):
+    """Şablonu (önsöz, statik gövde, etiketler) olarak ayırır.
+
+    Yer tutucu içeren her etiket statik gövdede \\dynlabel{i} ile değiştirilir;
+    etiketler listesi yer tutuculu özgün metinleri sırasıyla tutar.
+    """
+    begin = template_text.find("\\begin{document}")
+    end = template_text.rfind("\\end{document}")
+    if begin < 0 or end < begin:
+        raise ValueError("Şablonda document ortamı bulunamadı")
+    preamble = template_text[:begin]
+    body = template_text[begin + len("\\begin{document}"):end]
+    if not DOCUMENTCLASS.search(preamble):
+        raise ValueError("Katmanlı çizim yalnızca standalone şablonlarını destekler")
+    if body.count("\\end{circuitikz}") != 1:
+        raise ValueError("Katmanlı çizim tek bir circuitikz ortamı gerektirir")
+
+    spans = []
+    for match in PLACEHOLDER.finditer(body):
+        span = label_span(body, match.start())
+        if not spans or span[0] >= spans[-1][1]:
+            spans.append(span)
+        elif span[1] > spans[-1][1]:
+            spans[-1] = (spans[-1][0], span[1])
+
+    labels, parts, last = [], [], 0
+    for index, (start, stop) in enumerate(spans):
+        content = body[start:stop]
+        labels.append(content.strip())
+        # Virgül ve köşeli parantezlerin seçenek ayrıştırıcısını bozmaması için gruplanır
+        parts += [body[last:start], f"{{\\dynlabel{{{index}}}}}"]
+        last = stop
+    parts.append(body[last:])
+    return preamble, "".join(parts), labels
+
+
+def static_document(preamble, static_body):
+    """Boş etiketli statik sayfa ve kalibrasyon sayfasından oluşan iki sayfalık belge"""
+    def add_multi(match):
+        options = [option for option in (match.group(1) or "").split(",") if option.strip()]
+        return "\\documentclass[%s]{standalone}" % ",".join(options + ["multi=circuitikz"])
+
+    origin = "\\node[overlay, inner sep=0pt] at (0,0) {\\hbox{\\dynmark{origin}}};\n\\end{circuitikz}"
+    body = static_body.replace("\\end{circuitikz}", origin)
+    return "".join([
+        DOCUMENTCLASS.sub(add_multi, preamble, count=1).rstrip(), "\n",
+        STATIC_MACROS, "\n",
+        "\\begin{document}\n\\dyncalibratefalse", body,
+        "\\dyncalibratetrue", body,
+        "\\end{document}\n",
+    ])
+
+
+def parse_positions(text):
+    """\\jobname.pos satırlarını {sayfa: {ad: (x, y, genişlik, yükseklik)}} olarak (sp) okur"""
+    pages = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) != 6:
+            continue
+        page, name, *values = fields
+        pages.setdefault(int(page), {})[name] = tuple(int(value) for value in values)
+    return pages
+
+
+@dataclass
+class LabelSlot:
+    """Bir etiketin statik sayfadaki boş kutu konumu ve çapa katsayıları.
+
+    Gerçek kutunun sol taban noktası: (x - beta*genişlik, y + alpha*(yükseklik+derinlik) - yükseklik)
+    """
+    content: str
+    x: int
+    y: int
+    beta: float
+    alpha: float
+
+
+@dataclass
+class TemplateLayers:
+    """Bir şablonun önbelleğe alınmış statik katmanı ve etiket yuvaları"""
+    digest: str
+    pdf_path: str
+    width: int
+    height: int
+    preamble: list = field(default_factory=list)
+    labels: list = field(default_factory=list)
+
+    def to_json(self):
+        return {**asdict(self), "labels": [asdict(label) for label in self.labels]}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(**{**data, "labels": [LabelSlot(**label) for label in data["labels"]]})
+
+
+def build_layers(digest, pdf_path, preamble, labels, positions):
+    """Statik ve kalibrasyon sayfalarındaki konumlardan etiket yuvalarını hesaplar"""
+    static, calibration = positions.get(1, {}), positions.get(2, {})
+    if "origin" not in static or "origin" not in calibration:
+        raise ValueError("Konum dosyasında başlangıç noktası yok")
+    ox0, oy0, width, height = static["origin"]
+    ox1, oy1 = calibration["origin"][:2]
+    slots = []
+    for index, content in enumerate(labels):
+        key = str(index)
+        if key not in static or key not in calibration:
+            raise ValueError(f"Etiket konumu kaydedilmedi: {content}")
+        x0, y0 = static[key][:2]
+        x1, y1 = calibration[key][:2]
+        beta = ((x0 - ox0) - (x1 - ox1)) / (CALIBRATION_WIDTH * SP_PER_PT)
+        alpha = ((y1 - oy1) - (y0 - oy0)) / (CALIBRATION_HEIGHT * SP_PER_PT) + 1
+        slots.append(LabelSlot(content, x0, y0, round(beta, 4), round(alpha, 4)))
+
+    label_preamble = [
+        line.strip() for line in preamble.splitlines()
+        if line.strip() and not line.lstrip().startswith(("\\documentclass", "%") + DRAWING_PREAMBLE)
+    ]
+    return TemplateLayers(digest, str(pdf_path), width, height, label_preamble, slots)
+
+
+def label_document(layers, parameters):
+    """Statik katmanı arka plan yapıp yalnızca etiketleri dizen hafif belge (TikZ yüklemez)"""
+    lines = [
+        "\\documentclass[border=0pt]{standalone}",
+        *layers.preamble,
+        "\\usepackage{graphicx}",
+        LABEL_MACROS,
+        "\\begin{document}",
+        "\\setlength{\\unitlength}{1sp}",
+        f"\\begin{{picture}}({layers.width},{layers.height})",
+        f"\\put(0,0){{\\includegraphics[page=1]{{{Path(layers.pdf_path).resolve().as_posix()}}}}}",
+    ]
+    for slot in layers.labels:
+        content = PLACEHOLDER.sub(lambda m: str(parameters.get(m.group(1), m.group(0))), slot.content)
+        box = "\\dynlines" if "\\\\" in content else "\\dynbox"
+        lines.append(f"\\placelabel{{{slot.x}}}{{{slot.y}}}{{{-slot.beta:+.4f}}}{{{slot.alpha:+.4f}}}{{{box}{{{content}}}}}")
+    lines += ["\\end{picture}", "\\end{document}"]
+    return "\n".join(lines) + "\n"
+
+
+class LayeredRenderer:
+    """Şablonun sabit çizimini bir kez derleyip önbelleğe alır, istek başına yalnızca etiketleri dizer.
+
+    Statik katman şablon metninin özetiyle adlandırılır; şablon değişince yeni katman derlenir.
+    """
+
+    def __init__(self, cache_dir, max_concurrent=4, timeout=30.0, command="pdflatex"):
+        self.cache_dir = Path(cache_dir)
+        self.compiler = AsyncLatexCompiler(cache_dir, max_concurrent=max_concurrent, timeout=timeout, command=command)
+        self.layers = {}
+        self.pending = {}
+
+    def load_cached(self, digest):
+        json_path = self.cache_dir / f"layer_{digest}.json"
+        if not json_path.exists():
+            return None
+        layers = TemplateLayers.from_json(json.loads(json_path.read_text(encoding="utf-8")))
+        return layers if Path(layers.pdf_path).exists() else None
+
+    async def build(self, template_text, digest):
+        preamble, static_body, labels = split_template(template_text)
+        name = f"layer_{digest}"
+        result = await self.compiler.compile(static_document(preamble, static_body), name)
+        if not result.success:
+            raise RuntimeError(f"Statik katman derlenemedi:\n{result.log_excerpt}")
+        pos_path = self.cache_dir / f"{name}.pos"
+        if not pos_path.exists():
+            raise RuntimeError("Statik katman konum dosyası üretilmedi (pdfTeX gerekli)")
+        positions = parse_positions(pos_path.read_text(encoding="utf-8"))
+        layers = build_layers(digest, result.pdf_path, preamble, labels, positions)
+        (self.cache_dir / f"{name}.json").write_text(json.dumps(layers.to_json(), ensure_ascii=False), encoding="utf-8")
+        return layers
+
+    async def static_layer(self, template_text):
+        """Şablonun statik katmanı: bellek, disk, yoksa tek (paylaşılan) derleme"""
+        digest = template_digest(template_text)
+        layers = self.layers.get(digest) or self.load_cached(digest)
+        if layers is not None:
+            self.layers[digest] = layers
+            return layers
+
+        future = self.pending.get(digest)
+        if future is None:
+            future = asyncio.ensure_future(self.build(template_text, digest))
+            self.pending[digest] = future
+            future.add_done_callback(lambda _: self.pending.pop(digest, None))
+        layers = await asyncio.shield(future)
+        self.layers[digest] = layers
+        return layers
+
+    async def compile(self, template_text, parameters, filename, compiler, output_dir=None):
+        """Etiket katmanını verilen derleyiciyle PDF'e derler (output_dir: derleyicinin klasörü yerine)"""
+        try:
+            layers = await self.static_layer(template_text)
+        except (RuntimeError, ValueError) as e:
+            return CompileResult(success=False, log_excerpt=str(e))
+        return await compiler.compile(label_document(layers, parameters), filename, output_dir=output_dir)
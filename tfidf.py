@@ -0,0 +1,151 @@
+import re
+import struct
+import zipfile
+from collections import Counter
+from dataclasses import dataclass
+from typing import NamedTuple
+
+import numpy as np
+
+# sklearn TfidfVectorizer varsayılanı: en az iki harfli kelimeler
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SparseVector(NamedTuple):
+    """L2 normalize seyrek vektör: sıralı sütunlar ve ağırlıkları"""
+    indices: np.ndarray
+    data: np.ndarray
+
+
+EMPTY = SparseVector(np.zeros(0, dtype=np.int32), np.zeros(0))
+
+
+@dataclass
+class Vectorizer:
+    """Sözlük ve idf dizisinden oluşan TF-IDF vektörleştirici.
+
+    Ağırlıklar sklearn TfidfVectorizer varsayılanlarıyla aynıdır (ham tf, yumuşatılmış
+    idf, L2 norm). Terimler sıralı tutulur; sütun numarası terimin sırasıdır, böylece
+    bellek eşlemeli bir diziden sözlük kurmadan ikili aramayla sorgulanabilir.
+    """
+    terms: np.ndarray
+    idf: np.ndarray
+
+    @classmethod
+    def fit(cls, texts):
+        document_frequency = Counter()
+        count = 0
+        for text in texts:
+            document_frequency.update(set(tokenize(text)))
+            count += 1
+        terms = sorted(document_frequency)
+        frequency = np.array([document_frequency[term] for term in terms], dtype=float)
+        idf = np.log((1 + count) / (1 + frequency)) + 1
+        return cls(np.array(terms, dtype=str) if terms else np.zeros(0, dtype="<U1"), idf)
+
+    @property
+    def size(self):
+        return len(self.terms)
+
+    def columns(self, tokens):
+        """Sözlükte bulunan token'ların sütun numaraları"""
+        if not tokens or not self.size:
+            return np.zeros(0, dtype=np.int32)
+        tokens = np.array(tokens, dtype=str)
+        positions = np.minimum(np.searchsorted(self.terms, tokens), self.size - 1)
+        return positions[self.terms[positions] == tokens].astype(np.int32)
+
+    def _weights(self, columns):
+        if not columns.size:
+            return EMPTY
+        columns, counts = np.unique(columns, return_counts=True)
+        data = counts * self.idf[columns]
+        return SparseVector(columns.astype(np.int32), data / np.sqrt(np.dot(data, data)))
+
+    def vectorize(self, text):
+        return self._weights(self.columns(tokenize(text)))
+
+    def transform(self, texts):
+        """Metin listesinin CSR dizileri (indptr, indices, data)"""
+        lookup = {term: column for column, term in enumerate(self.terms.tolist())}
+        indptr, indices, data = [0], [], []
+        for text in texts:
+            vector = self._weights(np.array(
+                [lookup[token] for token in tokenize(text) if token in lookup], dtype=np.int32
+            ))
+            indices.append(vector.indices)
+            data.append(vector.data)
+            indptr.append(indptr[-1] + len(vector.indices))
+        return (
+            np.array(indptr, dtype=np.int64),
+            np.concatenate(indices) if indices else EMPTY.indices,
+            np.concatenate(data) if data else EMPTY.data,
+        )
+
+
+def csr_to_csc(indptr, indices, data, columns):
+    """CSR satır matrisini sütun işaretçili (colptr, satırlar, değerler) biçime çevirir.
+
+    Sütun biçiminde bir sorgu yalnızca kendi terimlerinin geçtiği satırlara dokunur.
+    """
+    rows = np.repeat(np.arange(len(indptr) - 1, dtype=np.int32), np.diff(indptr))
+    order = np.argsort(indices, kind="stable")
+    colptr = np.zeros(columns + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=columns), out=colptr[1:])
+    return colptr, rows[order], np.asarray(data, dtype=np.float64)[order]
+
+
+def column_scores(query, colptr, rows, data, count):
+    """Sorgunun count satırlık bir CSC parçasıyla seyrek iç çarpımı (kosinüs benzerliği)"""
+    starts, stops = colptr[query.indices], colptr[query.indices + 1]
+    lengths = stops - starts
+    if not lengths.sum():
+        return np.zeros(count)
+    postings = np.concatenate([np.arange(start, stop) for start, stop in zip(starts, stops)])
+    weights = np.repeat(query.data, lengths) * data[postings]
+    return np.bincount(rows[postings], weights=weights, minlength=count)
+
+
+# --- Tek dosya serileştirme --------------------------------------------------
+
+def save_npz(path, arrays):
+    """Dizileri sıkıştırmasız tek bir .npz dosyasına yazar (load_npz ile bellek eşlenebilir)"""
+    with open(path, "wb") as f:
+        np.savez(f, **arrays)
+
+
+def load_npz(path, mmap=True):
+    """.npz içindeki dizileri ad → dizi olarak döndürür.
+
+    Sıkıştırmasız üyeler kopyalanmadan doğrudan dosya üzerinde bellek eşlenir;
+    sıkıştırılmış üyeler belleğe okunur.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if not mmap or info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype.hasobject:
+                raise ValueError(f"Nesne dizisi bellek eşlenemez: {info.filename}")
+            if not np.prod(shape):
+                arrays[name] = np.zeros(shape, dtype=dtype)
+                continue
+            arrays[name] = np.memmap(
+                path, dtype=dtype, mode="r", offset=f.tell(), shape=shape, order="F" if fortran_order else "C"
+            )
+    return arrays